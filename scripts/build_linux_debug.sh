@@ -9,6 +9,12 @@ PYTHONOPTIMIZE=2 pyinstaller \
     --hidden-import "pynput.keyboard._xorg" \
     --hidden-import "pynput.mouse._xorg" \
     --hidden-import "python-xlib" \
+    --hidden-import "bs4" \
+    --hidden-import "dateparser" \
+    --hidden-import "distro" \
+    --hidden-import "send2trash" \
+    --hidden-import "webdav4.client" \
+    --hidden-import "zstandard" \
     --clean \
     --noconsole \
     --noupx \
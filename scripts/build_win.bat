@@ -10,6 +10,12 @@ if exist "Blender Launcher.spec" del /Q "Blender Launcher.spec"
 python -OO -m PyInstaller ^
 --hidden-import "pynput.keyboard._win32" ^
 --hidden-import "pynput.mouse._win32" ^
+--hidden-import "bs4" ^
+--hidden-import "dateparser" ^
+--hidden-import "distro" ^
+--hidden-import "send2trash" ^
+--hidden-import "webdav4.client" ^
+--hidden-import "zstandard" ^
 --clean ^
 --noconsole ^
 --noupx ^
@@ -1,58 +1,88 @@
 from __future__ import annotations
 
-from datetime import timezone
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Callable
 
 from PyQt5.QtWidgets import QListWidgetItem
 
 if TYPE_CHECKING:
+    from modules.build_info import BuildInfo
     from semver import Version
     from widgets.base_list_widget import BaseListWidget
 
+# Stands in for a missing date in the sort keys, items without one go last
+MISSING_DATE = datetime.min.replace(tzinfo=timezone.utc)
 
-class BaseListWidgetItem(QListWidgetItem):
-    def __init__(self, date=None):
-        super().__init__()
-        self.date = date
-        self.listWidget: Callable[[], BaseListWidget | None]
 
-    def __lt__(self, other):
-        soring_type = self.listWidget().parent.sorting_type
+def date_sort_key(date: datetime | None) -> tuple:
+    if date is None:
+        return (False, MISSING_DATE)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return (True, date)
+
+
+def semver_sort_key(version: Version) -> tuple:
+    """Orders like Version.compare, but as plain tuples that are much faster to compare"""
+    if version.prerelease is None:
+        # A release comes after its prereleases
+        return (version.major, version.minor, version.patch, (1,))
+    # Numeric identifiers come before alphanumeric ones
+    parts = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in version.prerelease.split("."))
+    return (version.major, version.minor, version.patch, (0, parts))
 
-        if soring_type.name == "DATETIME":
-            return self.compare_datetime(other)
-        if soring_type.name == "VERSION":
-            return self.compare_version(other)
-        return False
 
-    def compare_datetime(self, other):
-        if (self.date is None) or (other.date is None):
-            return False
+def version_sort_key(version: Version | None, date: datetime | None) -> tuple:
+    # Equal versions fall back to the date
+    if version is None:
+        return (False, (), date_sort_key(date))
+    return (True, semver_sort_key(version), date_sort_key(date))
 
-        if self.date.tzinfo is None or other.date.tzinfo is None:
-            self.date = self.date.replace(tzinfo=timezone.utc)
-            other.date = other.date.replace(tzinfo=timezone.utc)
 
-        return self.date > other.date
+class BaseListWidgetItem(QListWidgetItem):
+    """
+    Sorting compares precomputed keys. They are updated when the build of the item changes,
+    and the key in use is switched by the list widget when its sorting type changes.
+    """
+
+    def __init__(self, date=None):
+        super().__init__()
+        self.listWidget: Callable[[], BaseListWidget | None]
+        self.sorting_type = "DATETIME"
+        self.version: Version | None = None
+        self._date: datetime | None = None
+        self.sort_key: tuple = ()
+        self.date = date
 
-    def compare_version(self, other):
-        list_widget = self.listWidget()
+    @property
+    def date(self) -> datetime | None:
+        return self._date
 
-        this_widget = list_widget.itemWidget(self)
-        other_widget = list_widget.itemWidget(other)
+    @date.setter
+    def date(self, date: datetime | None):
+        self._date = date
+        self.update_sort_key()
 
-        if (
-            this_widget is None
-            or other_widget is None
-            or this_widget.build_info is None
-            or other_widget.build_info is None
-        ):
-            return False
+    def set_version(self, version: Version | None):
+        self.version = version
+        self.update_sort_key()
 
-        this_version: Version = this_widget.build_info.semversion
-        other_version: Version = other_widget.build_info.semversion
+    def set_build_info(self, build_info: BuildInfo):
+        self.version = build_info.semversion
+        self.date = build_info.commit_time
 
-        if this_version == other_version:
-            return self.compare_datetime(other)
+    def set_sorting_type(self, sorting_type: str):
+        """`sorting_type` is the name of a SortingType"""
+        if sorting_type != self.sorting_type:
+            self.sorting_type = sorting_type
+            self.update_sort_key()
 
-        return this_version > other_version
+    def update_sort_key(self):
+        if self.sorting_type == "VERSION":
+            self.sort_key = version_sort_key(self.version, self._date)
+        else:
+            self.sort_key = date_sort_key(self._date)
+
+    def __lt__(self, other):
+        # Ascending order lists the newest builds first
+        return self.sort_key > other.sort_key
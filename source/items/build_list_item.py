@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from items.base_list_widget_item import date_sort_key, version_sort_key
+from widgets.datetime_widget import DATETIME_FORMAT
+from widgets.download_widget import DownloadState
+
+if TYPE_CHECKING:
+    from modules.build_info import BuildInfo
+    from widgets.base_build_widget import BaseBuildWidget
+    from widgets.build_list_view import BuildListView
+    from widgets.download_widget import DownloadWidget
+
+
+class BuildListItem:
+    """
+    A row of a BuildListView. It keeps what the DownloadWidget of the row shows while the row
+    has no widget, and stands in for that widget towards the rest of the launcher.
+    """
+
+    def __init__(self, view: BuildListView, build_info: BuildInfo, installed=None, show_new=False):
+        self.view = view
+        self.build_info = build_info
+        self.date = build_info.commit_time
+        # The build of a row never changes
+        self.date_key = date_sort_key(self.date)
+        self.version_key = version_sort_key(build_info.semversion, self.date)
+        self.time_text = build_info.commit_time.strftime(DATETIME_FORMAT)
+        self.widget: DownloadWidget | None = None
+        self._installed: BaseBuildWidget | None = None
+        self._show_new = show_new
+
+        if installed is not None:
+            self.setInstalled(installed)
+
+    def listWidget(self) -> BuildListView:
+        return self.view
+
+    @property
+    def installed(self) -> BaseBuildWidget | None:
+        if self.widget is not None:
+            return self.widget.installed
+        return self._installed
+
+    @property
+    def show_new(self) -> bool:
+        if self.widget is not None:
+            return self.widget.show_new
+        return self._show_new
+
+    @property
+    def state(self) -> DownloadState:
+        if self.widget is not None:
+            return self.widget.state
+        return DownloadState.IDLE
+
+    def setSelected(self, selected=True):
+        self.view.select(self, selected)
+
+    def setInstalled(self, build_widget: BaseBuildWidget):
+        if self.widget is not None:
+            self.widget.setInstalled(build_widget)
+            return
+        self._watch(build_widget)
+        self.view.row_changed(self)
+
+    def _watch(self, build_widget: BaseBuildWidget):
+        if build_widget is not self._installed:
+            self._installed = build_widget
+            build_widget.destroyed.connect(self.uninstalled)
+
+    def uninstalled(self):
+        self._installed = None
+        self.view.row_changed(self)
+
+    def attach_widget(self, widget: DownloadWidget):
+        self.widget = widget
+
+    def release_widget(self):
+        """Takes back the state of the widget before it is deleted"""
+        widget = self.widget
+        if widget is None:
+            return
+        self.widget = None
+        self._show_new = widget.show_new
+        if widget.installed is not None:
+            self._watch(widget.installed)
+        else:
+            self._installed = None
+
+    def destroy(self):
+        self.view.remove_item(self)
@@ -2,18 +2,24 @@ from __future__ import annotations
 
 import gettext
 import logging
+import multiprocessing
 import os
 import sys
 from argparse import ArgumentParser
 from pathlib import Path
 from typing import NoReturn
 
+# Imported before anything else, so that --import-times covers everything below
+import modules._import_times
 import modules._resources_rc
 from modules import argument_parsing as ap
+from modules._import_times import FLAG as IMPORT_TIMES_FLAG
+from modules._import_times import report as report_import_times
 from modules._platform import _popen, get_cache_path, get_cwd, get_launcher_name, get_platform, is_frozen
 from modules.cli_launching import cli_launch
 from modules.shortcut import register_windows_filetypes, unregister_windows_filetypes
 from modules.version_matcher import VALID_FULL_QUERIES, VALID_QUERIES, VERSION_SEARCH_SYNTAX
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from semver import Version
 from windows.dialog_window import DialogWindow
@@ -106,6 +112,11 @@ def main():
         help="Run the application offline. (Disables scraper threads and update checks)",
         action="store_true",
     )
+    parser.add_argument(
+        IMPORT_TIMES_FLAG,
+        help="Log the imports that took the longest once the application has started.",
+        action="store_true",
+    )
     parser.add_argument(
         "--instanced",
         "-instanced",
@@ -173,6 +184,10 @@ def main():
     app.setStyle("Fusion")
     app.setApplicationVersion(str(version))
 
+    if args.import_times:
+        # Runs once the first window is up, whichever one that is
+        QTimer.singleShot(0, report_import_times)
+
     set_lib_folder: Path | None = args.set_library_folder
     if set_lib_folder is not None:
         start_set_library_folder(app, str(set_lib_folder))
@@ -307,4 +322,6 @@ def check_for_instance():
 
 
 if __name__ == "__main__":
+    # Lets the extraction worker processes start from a frozen executable
+    multiprocessing.freeze_support()
     main()
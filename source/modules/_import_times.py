@@ -0,0 +1,80 @@
+"""
+Times every import made after this module, like `python -X importtime`, when the launcher is started
+with --import-times. main.py imports it before anything else so that its own imports are covered.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from time import perf_counter
+
+FLAG = "--import-times"
+
+logger = logging.getLogger()
+
+# name -> (self seconds, cumulative seconds)
+times: dict[str, tuple[float, float]] = {}
+_started = perf_counter()
+_stacks = threading.local()
+
+
+class _TimingLoader:
+    """Wraps the loader of a module to time its execution, and forwards everything else to it"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack: list[float] = _stacks.__dict__.setdefault("stack", [])
+        # Time spent importing the modules this one imports
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cumulative = perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            times[module.__name__] = (cumulative - nested, cumulative)
+
+
+class _TimingFinder:
+    """Lets the other finders find the module, and wraps the loader of what they found"""
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader)
+            return spec
+        return None
+
+
+def enabled() -> bool:
+    return any(isinstance(finder, _TimingFinder) for finder in sys.meta_path)
+
+
+def report(limit: int = 25):
+    """Logs the total time since timing started, and the imports that took the longest"""
+    logger.info(f"Started in {perf_counter() - _started:.3f}s, {len(times)} modules imported")
+    logger.info(f"{'self [ms]':>10} | {'cumulative [ms]':>15} | module")
+    slowest = sorted(times.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    for name, (self_time, cumulative) in slowest:
+        logger.info(f"{self_time * 1000:>10.1f} | {cumulative * 1000:>15.1f} | {name}")
+
+
+if FLAG in sys.argv and not enabled():
+    sys.meta_path.insert(0, _TimingFinder())
@@ -230,3 +230,27 @@ def stable_cache_path():
 
 def bfa_cache_path():
     return Path(get_cache_path(), "bforartists_builds.json")
+
+
+def decompression_stats_path():
+    return Path(get_cache_path(), "decompression_stats.json")
+
+
+def archive_cache_path():
+    return Path(get_cache_path(), "archives")
+
+
+def task_metrics_path():
+    return Path(get_cache_path(), "task_metrics.json")
+
+
+def install_journal_path():
+    return Path(get_config_path(), "install_journal.json")
+
+
+def process_telemetry_path():
+    return Path(get_cache_path(), "process_telemetry.jsonl")
+
+
+def startup_snapshot_path():
+    return Path(get_cache_path(), "startup_snapshot.json")
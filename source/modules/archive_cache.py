@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from modules.connection_manager import REQUEST_MANAGER
+
+logger = logging.getLogger()
+
+
+def link_or_copy(src: Path, dst: Path):
+    """Hardlinks `src` to `dst` if both are on the same filesystem, copies otherwise"""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def unshare(file: Path):
+    """Gives `file` its own copy of its data if it is hardlinked, so writing to it leaves the other links as they are"""
+    try:
+        if file.stat().st_nlink <= 1:
+            return
+    except FileNotFoundError:
+        return
+    tmp = file.with_name(f".{file.name}.unshared")
+    shutil.copy2(file, tmp)
+    tmp.replace(file)
+
+
+@dataclass
+class CacheEntry:
+    size: int
+    last_used: float
+
+
+class ArchiveCache:
+    """
+    A content-addressed store of downloaded build archives.
+
+    Archives are stored by their sha256 digest, and indexed by their file name so builds without a
+    published checksum can be found too. The least recently used archives are evicted once the
+    total size goes over `budget` bytes.
+    """
+
+    def __init__(self, root: Path, budget: int):
+        self.root = root
+        self.budget = budget
+        self.entries: dict[str, CacheEntry] = {}
+        self.names: dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def index_file(self) -> Path:
+        return self.root / "index.json"
+
+    def blob(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _load(self):
+        try:
+            with self.index_file.open(encoding="utf-8") as f:
+                dct = json.load(f)
+            self.entries = {digest: CacheEntry(**e) for digest, e in dct.get("entries", {}).items()}
+            self.names = dct.get("names", {})
+        except FileNotFoundError:
+            pass
+        except (json.decoder.JSONDecodeError, OSError, TypeError) as e:
+            logger.error(f"Failed to load archive cache index {self.index_file}: {e}")
+
+    def _save(self):
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.index_file.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "entries": {digest: vars(e) for digest, e in self.entries.items()},
+                        "names": self.names,
+                    },
+                    f,
+                )
+        except OSError as e:
+            logger.error(f"Failed to save archive cache index {self.index_file}: {e}")
+
+    @property
+    def size(self) -> int:
+        return sum(e.size for e in self.entries.values())
+
+    def lookup(self, name: str, checksum: str | None = None) -> Path | None:
+        """Returns the cached archive matching `checksum`, or `name` if no checksum is known"""
+        with self._lock:
+            digest = checksum.lower() if checksum is not None else self.names.get(name)
+            if digest is None or digest not in self.entries:
+                return None
+
+            blob = self.blob(digest)
+            if not blob.is_file():
+                self._forget(digest)
+                self._save()
+                return None
+
+            self.entries[digest].last_used = time.time()
+            self._save()
+            return blob
+
+    def store(self, file: Path, name: str, digest: str):
+        """Adds `file` to the cache. `file` itself is left in place"""
+        if self.budget <= 0:
+            return
+
+        size = file.stat().st_size
+        if size > self.budget:
+            return
+
+        with self._lock:
+            blob = self.blob(digest)
+            if digest not in self.entries or not blob.is_file():
+                try:
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    link_or_copy(file, blob)
+                except OSError as e:
+                    logger.error(f"Failed to cache {file}: {e}")
+                    return
+
+            self.entries[digest] = CacheEntry(size, time.time())
+            self.names[name] = digest
+            self._evict()
+            self._save()
+        logger.debug(f"Cached {name} as {digest}")
+
+    def set_budget(self, budget: int):
+        with self._lock:
+            self.budget = budget
+            self._evict()
+            self._save()
+
+    def _forget(self, digest: str):
+        self.entries.pop(digest, None)
+        for name in [name for name, d in self.names.items() if d == digest]:
+            del self.names[name]
+        with contextlib.suppress(OSError):
+            self.blob(digest).unlink()
+
+    def _evict(self):
+        total = self.size
+        for digest, entry in sorted(self.entries.items(), key=lambda item: item[1].last_used):
+            if total <= self.budget:
+                break
+            logger.debug(f"Evicting {digest} from the archive cache")
+            self._forget(digest)
+            total -= entry.size
+
+
+class ArchiveMirror:
+    """
+    A location checked for archives before the upstream servers. Either a (shared) directory,
+    or the base URL of an HTTP server serving archives by file name.
+    """
+
+    def __init__(self, location: str):
+        self.location = location.strip()
+
+    @property
+    def is_http(self) -> bool:
+        return self.location.startswith(("http://", "https://"))
+
+    def path(self, name: str) -> Path:
+        return Path(self.location) / name
+
+    def url(self, name: str) -> str:
+        return f"{self.location.rstrip('/')}/{name}"
+
+    def find(self, name: str) -> Path | None:
+        if self.is_http:
+            return None
+        p = self.path(name)
+        return p if p.is_file() else None
+
+    def request(self, manager: REQUEST_MANAGER, name: str):
+        """Requests `name` from an HTTP mirror. Returns the open response, or None if it is not there"""
+        try:
+            r = manager.request("GET", self.url(name), preload_content=False, timeout=5, retries=False)
+        except Exception as e:
+            logger.debug(f"Mirror {self.location} is unreachable: {e}")
+            return None
+
+        if r.status != 200:
+            r.release_conn()
+            return None
+        return r
+
+    def publish(self, file: Path, name: str):
+        """Copies a freshly downloaded archive to a directory mirror, so other machines can use it"""
+        if self.is_http:
+            return
+        dst = self.path(name)
+        if dst.exists():
+            return
+        tmp = dst.with_name(f".{name}.part")
+        try:
+            shutil.copy2(file, tmp)
+            tmp.replace(dst)
+        except OSError as e:
+            logger.debug(f"Could not publish {name} to mirror {self.location}: {e}")
+            with contextlib.suppress(OSError):
+                tmp.unlink()
@@ -8,7 +8,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import TYPE_CHECKING
 
-import zstandard
+from modules.lazy_import import lazy_import
 from semver import Version
 
 if TYPE_CHECKING:
@@ -16,6 +16,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger()
 
+zstandard = lazy_import("zstandard")
+
 
 # See https://docs.blender.org/manual/en/latest/files/blend/open_save.html#id8
 class CompressionType(Enum):
@@ -8,22 +8,26 @@ from dataclasses import dataclass
 from datetime import datetime
 from functools import cache
 from pathlib import Path
+from typing import Generic, TypeVar
 
-import dateparser
 from modules._platform import _check_output, _popen, get_platform
 from modules.bl_api_manager import lts_blender_version
+from modules.lazy_import import lazy_import
 from modules.settings import (
     get_bash_arguments,
     get_blender_startup_arguments,
     get_launch_blender_no_console,
     get_library_folder,
 )
-from modules.task import Task
+from modules.task import Task, TaskPriority
 from PyQt5.QtCore import pyqtSignal
 from semver import Version
 
 logger = logging.getLogger()
 
+# Only parses dates in formats the launcher no longer writes
+dateparser = lazy_import("dateparser")
+
 
 # TODO: Combine some of these
 matchers = tuple(
@@ -120,6 +124,8 @@ class BuildInfo:
     custom_name: str = ""
     is_favorite: bool = False
     custom_executable: str | None = None
+    # sha256 of the downloadable archive, when the server publishes one
+    checksum: str | None = None
 
     def __post_init__(self):
         if self.branch == "stable" and self.subversion.startswith(self.lts_tags):
@@ -217,6 +223,7 @@ class BuildInfo:
             blinfo["custom_name"],
             blinfo["is_favorite"],
             blinfo.get("custom_executable", ""),
+            blinfo.get("checksum"),
         )
 
     def to_dict(self):
@@ -231,6 +238,7 @@ class BuildInfo:
                     "custom_name": self.custom_name,
                     "is_favorite": self.is_favorite,
                     "custom_executable": self.custom_executable,
+                    "checksum": self.checksum,
                 }
             ],
         }
@@ -253,6 +261,91 @@ class BuildInfo:
         return sv < osv
 
 
+T = TypeVar("T")
+
+
+class BuildIndex(Generic[T]):
+    """
+    Finds what is stored for a build without comparing it to every other one.
+
+    BuildInfo has no single key: builds are the same when their hashes match, or when their
+    subversions match and one of them has no hash. So values are bucketed by hash, by subversion,
+    and by subversion among the builds without a hash, which answers the same question as
+    BuildInfo.__eq__ in constant time.
+    """
+
+    def __init__(self):
+        # id(value) -> (build, value), values do not have to be hashable
+        self.entries: dict[int, tuple[BuildInfo, T]] = {}
+        self.by_hash: dict[str, dict[int, T]] = {}
+        self.by_version: dict[str, dict[int, T]] = {}
+        self.unhashed_by_version: dict[str, dict[int, T]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, build_info: BuildInfo):
+        return self.find(build_info) is not None
+
+    def _buckets(self, build_info: BuildInfo) -> list[dict[int, T]]:
+        buckets = [self.by_version.setdefault(build_info.subversion, {})]
+        if build_info.build_hash is not None:
+            buckets.append(self.by_hash.setdefault(build_info.build_hash, {}))
+        else:
+            buckets.append(self.unhashed_by_version.setdefault(build_info.subversion, {}))
+        return buckets
+
+    def add(self, build_info: BuildInfo, value: T | None = None):
+        """Stores `value` for `build_info`, the build itself if no value is given"""
+        if value is None:
+            value = build_info  # type: ignore[assignment]
+        self.remove(value)
+        self.entries[id(value)] = (build_info, value)
+        for bucket in self._buckets(build_info):
+            bucket[id(value)] = value
+
+    def remove(self, value: T):
+        entry = self.entries.pop(id(value), None)
+        if entry is None:
+            return
+        build_info = entry[0]
+        keys = [(self.by_version, build_info.subversion)]
+        if build_info.build_hash is not None:
+            keys.append((self.by_hash, build_info.build_hash))
+        else:
+            keys.append((self.unhashed_by_version, build_info.subversion))
+        for buckets, key in keys:
+            bucket = buckets[key]
+            del bucket[id(value)]
+            if not bucket:
+                del buckets[key]
+
+    def clear(self):
+        self.entries.clear()
+        self.by_hash.clear()
+        self.by_version.clear()
+        self.unhashed_by_version.clear()
+
+    def find(self, build_info: BuildInfo | None) -> T | None:
+        """The first value stored for a build equal to `build_info`, or None"""
+        if build_info is None:
+            return None
+        if build_info.build_hash is None:
+            bucket = self.by_version.get(build_info.subversion)
+            return next(iter(bucket.values())) if bucket else None
+        for buckets, key in (
+            (self.by_hash, build_info.build_hash),
+            (self.unhashed_by_version, build_info.subversion),
+        ):
+            bucket = buckets.get(key)
+            if bucket:
+                return next(iter(bucket.values()))
+        return None
+
+    def values(self) -> list[T]:
+        return [value for _, value in self.entries.values()]
+
+
 def fill_blender_info(exe: Path, info: BuildInfo | None = None) -> tuple[datetime, str, str, str]:
     version = _check_output([exe.as_posix(), "-v"]).decode("UTF-8")
     build_hash = ""
@@ -354,12 +447,20 @@ def read_blender_version(
 
 @dataclass(frozen=True)
 class WriteBuildTask(Task):
+    priority = TaskPriority.INTERACTIVE
     written = pyqtSignal()
     error = pyqtSignal()
 
     path: Path
     build_info: BuildInfo
 
+    # Only the last write of a path matters
+    supersedes = True
+
+    @property
+    def key(self):
+        return ("write-build", self.path)
+
     def run(self):
         try:
             self.build_info.write_to(self.path)
@@ -408,6 +509,7 @@ def fill_build_info(
 
 @dataclass(frozen=True)
 class ReadBuildTask(Task):
+    priority = TaskPriority.INTERACTIVE
     path: Path
     info: BuildInfo | None = None
     archive_name: str | None = None
@@ -416,13 +518,20 @@ class ReadBuildTask(Task):
     finished = pyqtSignal(BuildInfo)
     failure = pyqtSignal(Exception)
 
+    @property
+    def key(self):
+        # Reads seeded with build info of their own are not interchangeable
+        if self.info is not None:
+            return None
+        return ("read-build", self.path, self.archive_name, self.auto_write)
+
     def run(self):
         try:
             build_info = fill_build_info(self.path, self.archive_name, self.info, self.auto_write)
-            self.finished.emit(build_info)
+            self.emit_replayable("finished", build_info)
 
         except Exception as e:
-            self.failure.emit(e)
+            self.emit_replayable("failure", e)
             raise
 
     def __str__(self):
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from modules.build_info import BuildInfo
+
+T = TypeVar("T")
+
+# Dots are kept, so that "4.2" matches the version 4.2.1
+TOKEN_SPLIT = re.compile(r"[\s\-+_/,:;()\[\]]+")
+
+
+def tokenize(text: str) -> set[str]:
+    return {token for token in TOKEN_SPLIT.split(text.lower()) if token}
+
+
+def build_tokens(build_info: BuildInfo) -> set[str]:
+    """What a build can be found by: its version, branch, hash and custom name"""
+    tokens = set()
+    for text in (
+        build_info.display_version,
+        build_info.subversion,
+        build_info.branch,
+        build_info.display_label,
+        build_info.build_hash,
+        build_info.custom_name,
+    ):
+        if text:
+            tokens |= tokenize(text)
+    return tokens
+
+
+class BuildSearchIndex(Generic[T]):
+    """
+    An inverted index from the tokens of builds to the values stored for them.
+
+    Every word of a query has to be the start of a token of a build for it to match, so
+    "4.2 alp" finds 4.2.0 Alpha. The tokens are kept sorted, a word is looked up by bisecting
+    to the range of tokens it starts. Values are added and removed one at a time, as the lists change.
+    """
+
+    def __init__(self):
+        self.postings: dict[str, set[T]] = {}
+        self.tokens: list[str] = []
+        self.entries: dict[T, set[str]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, value: T):
+        return value in self.entries
+
+    def add(self, build_info: BuildInfo, value: T):
+        self.remove(value)
+        tokens = build_tokens(build_info)
+        self.entries[value] = tokens
+        for token in tokens:
+            values = self.postings.get(token)
+            if values is None:
+                values = self.postings[token] = set()
+                insort(self.tokens, token)
+            values.add(value)
+
+    def remove(self, value: T):
+        tokens = self.entries.pop(value, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            values = self.postings[token]
+            values.discard(value)
+            if not values:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def clear(self):
+        self.postings.clear()
+        self.tokens.clear()
+        self.entries.clear()
+
+    def matches(self, value: T, query: str) -> bool:
+        """Whether `value` is found by `query`, without searching the whole index"""
+        tokens = self.entries.get(value)
+        if tokens is None:
+            return False
+        return all(any(token.startswith(word) for token in tokens) for word in tokenize(query))
+
+    def _prefixed(self, word: str) -> set[T]:
+        values: set[T] = set()
+        i = bisect_left(self.tokens, word)
+        while i < len(self.tokens) and self.tokens[i].startswith(word):
+            values |= self.postings[self.tokens[i]]
+            i += 1
+        return values
+
+    def search(self, query: str) -> set[T] | None:
+        """The values matching every word of `query`, or None if it has no words and everything matches"""
+        words = tokenize(query)
+        if not words:
+            return None
+
+        matches: set[T] | None = None
+        # Longer words match fewer tokens, start with them to keep the intersection small
+        for word in sorted(words, key=len, reverse=True):
+            values = self._prefixed(word)
+            matches = values if matches is None else matches & values
+            if not matches:
+                return set()
+        return matches
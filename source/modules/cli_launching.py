@@ -8,15 +8,23 @@ import sys
 from pathlib import Path
 from typing import NoReturn
 
+from modules._platform import process_telemetry_path
 from modules.blendfile_reader import read_blendfile_header
 from modules.build_info import BuildInfo, LaunchMode, LaunchOpenLast, LaunchWithBlendFile, get_args
-from modules.settings import get_favorite_path, get_version_specific_queries
+from modules.process_telemetry import ProcessTelemetry, build_record_info
+from modules.settings import get_favorite_path, get_record_process_telemetry, get_version_specific_queries
 from modules.version_matcher import BasicBuildInfo, BInfoMatcher, VersionSearchQuery
 from threads.library_drawer import get_blender_builds
 
 logger = logging.getLogger()
 
 
+def wait_for_build(proc: subprocess.Popen, info: BuildInfo) -> int:
+    """Waits for the launched build to exit, recording its resource usage if enabled"""
+    telemetry = ProcessTelemetry(process_telemetry_path(), enabled=get_record_process_telemetry())
+    return telemetry.wait(proc, info.link, build_record_info(info))
+
+
 def cli_launch(
     file: Path | None = None, version_query: VersionSearchQuery | None = None, open_last: bool = False
 ) -> NoReturn:
@@ -44,7 +52,7 @@ def cli_launch(
                 args = get_args(build, launch_mode=launch_mode, linux_nohup=False)
                 logger.info(f"Launching build with args: {args}")
                 proc = subprocess.Popen(args, shell=True)
-                sys.exit(proc.wait())
+                sys.exit(wait_for_build(proc, build))
 
     basics = {BasicBuildInfo.from_buildinfo(b): b for b in builds}
 
@@ -107,4 +115,4 @@ def cli_launch(
     logger.info(f"With args: {args}")
     proc = subprocess.Popen(args, shell=True)
 
-    sys.exit(proc.wait())
+    sys.exit(wait_for_build(proc, build_info))
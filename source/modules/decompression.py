@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import threading
+import time
+import zipfile
+from abc import abstractmethod
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, ClassVar
+
+from modules._platform import _check_call, decompression_stats_path, get_platform
+from modules.task import TaskCancelledError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+logger = logging.getLogger()
+
+# Size of the blocks fed to external decoders
+PIPE_BUFSIZE = 1024 * 1024
+
+
+def archive_suffix(source: Path) -> str:
+    """Returns the archive type of `source`, ex. '.tar.xz', '.zip' or '.dmg'"""
+    suffixes = source.suffixes
+    if len(suffixes) >= 2 and suffixes[-2] == ".tar":
+        return "".join(suffixes[-2:])
+    return suffixes[-1] if suffixes else ""
+
+
+def tar_root_folder(source: Path, fileobj=None) -> str:
+    """Reads only the first header of a tarball to find the name of its top-level folder"""
+    with tarfile.open(source, "r|*", fileobj=fileobj) as tar:
+        member = tar.next()
+        if member is None:
+            raise tarfile.ReadError(f"{source} is empty")
+        return member.name.split("/")[0]
+
+
+def archive_root_folder(source: Path) -> str | None:
+    """Name of the folder extracting `source` creates, or None if it cannot be told without unpacking it"""
+    suffix = archive_suffix(source)
+    try:
+        if suffix == ".zip":
+            with zipfile.ZipFile(source) as zf:
+                return zf.namelist()[0].split("/")[0]
+        if suffix == ".dmg":
+            return source.stem
+        if suffix == ".tar.zst":
+            if not ZstdBackend.is_available():
+                return None
+            import zstandard
+
+            with source.open("rb") as fh, zstandard.ZstdDecompressor().stream_reader(fh) as reader:
+                return tar_root_folder(source, fileobj=reader)
+        if suffix.startswith(".tar"):
+            return tar_root_folder(source)
+    except (OSError, IndexError, tarfile.TarError, zipfile.BadZipFile) as e:
+        logger.debug(f"Could not read the root folder of {source}: {e}")
+    return None
+
+
+class DecompressionBackend:
+    """Base class of every way the launcher knows to unpack a build archive"""
+
+    name: ClassVar[str] = ""
+    # Used to order backends that do not have any recorded throughput yet
+    priority: ClassVar[int] = 0
+    suffixes: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    @classmethod
+    def supports(cls, source: Path) -> bool:
+        return archive_suffix(source) in cls.suffixes
+
+    @abstractmethod
+    def extract(self, source: Path, destination: Path, progress_callback: Callable[[int, int], None]) -> Path | None:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name})"
+
+
+class StdlibBackend(DecompressionBackend):
+    """tarfile/zipfile based extraction. Always available, but decompresses on a single core"""
+
+    name = "stdlib"
+    priority = 0
+    suffixes = (".zip", ".tar.gz", ".tar.bz2", ".tar.xz", ".dmg")
+
+    def extract(self, source: Path, destination: Path, progress_callback: Callable[[int, int], None]) -> Path | None:
+        progress_callback(0, 0)
+        suffixes = source.suffixes
+        if suffixes[-1] == ".zip":
+            with zipfile.ZipFile(source) as zf:
+                infolist = zf.infolist()
+                folder = infolist[0].filename.split("/")[0]
+                uncompress_size = sum(member.file_size for member in infolist)
+                progress_callback(0, uncompress_size)
+                extracted_size = 0
+
+                for member in infolist:
+                    zf.extract(member, destination)
+                    extracted_size += member.file_size
+                    progress_callback(extracted_size, uncompress_size)
+            return destination / folder
+
+        if suffixes[-2] == ".tar":
+            with tarfile.open(source) as tar:
+                folder = tar.getnames()[0].split("/")[0]
+                members = tar.getmembers()
+                uncompress_size = sum(member.size for member in members)
+                progress_callback(0, uncompress_size)
+                extracted_size = 0
+
+                for member in members:
+                    tar.extract(member, path=destination)
+                    extracted_size += member.size
+                    progress_callback(extracted_size, uncompress_size)
+            return destination / folder
+
+        if suffixes[-1] == ".dmg":
+            _check_call(["hdiutil", "mount", source.as_posix()])
+            dist = destination / source.stem
+
+            if not dist.is_dir():
+                dist.mkdir()
+
+            if "bforartists" in source.stem.lower():
+                app_name = "Bforartists"
+            else:
+                app_name = "Blender"
+
+            _check_call(["cp", "-R", f"/Volumes/{app_name}", dist.as_posix()])
+            _check_call(["hdiutil", "unmount", f"/Volumes/{app_name}"])
+
+            return dist
+        return None
+
+
+class ZstdBackend(DecompressionBackend):
+    """Streams .tar.zst archives through zstandard, which decodes outside of the GIL"""
+
+    name = "zstandard"
+    priority = 10
+    suffixes = (".tar.zst",)
+
+    @classmethod
+    @cache
+    def is_available(cls) -> bool:
+        try:
+            import zstandard
+        except ImportError:
+            return False
+        return True
+
+    def extract(self, source: Path, destination: Path, progress_callback: Callable[[int, int], None]) -> Path | None:
+        import zstandard
+
+        total = source.stat().st_size
+        progress_callback(0, total)
+        dctx = zstandard.ZstdDecompressor()
+        folder = None
+        with source.open("rb") as fh, dctx.stream_reader(fh) as reader, tarfile.open(fileobj=reader, mode="r|") as tar:
+            for member in tar:
+                if folder is None:
+                    folder = member.name.split("/")[0]
+                tar.extract(member, path=destination)
+                progress_callback(fh.tell(), total)
+
+        if folder is None:
+            return None
+        return destination / folder
+
+
+class SystemTarBackend(DecompressionBackend):
+    """Pipes the archive through the system `tar` and a multithreaded decoder (xz -T0 / zstd -T0)"""
+
+    name = "system-tar"
+    priority = 20
+    suffixes = (".tar.xz", ".tar.zst")
+
+    decoders: ClassVar[dict[str, str]] = {
+        ".tar.xz": "xz",
+        ".tar.zst": "zstd",
+    }
+
+    @classmethod
+    @cache
+    def is_available(cls) -> bool:
+        # Windows' bsdtar does not accept --use-compress-program reliably
+        return get_platform() != "Windows" and shutil.which("tar") is not None
+
+    @classmethod
+    def supports(cls, source: Path) -> bool:
+        decoder = cls.decoders.get(archive_suffix(source))
+        return decoder is not None and shutil.which(decoder) is not None
+
+    @staticmethod
+    def root_folder(source: Path, decoder: str) -> str:
+        folder = archive_root_folder(source)
+        if folder is not None:
+            return folder
+        # zstandard is not installed, let tar list the first member instead
+        args = ["tar", "-t", "-f", source.as_posix(), f"--use-compress-program={decoder}"]
+        with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+            assert proc.stdout is not None
+            first = proc.stdout.readline()
+            proc.kill()
+        if not first.strip():
+            raise tarfile.ReadError(f"Could not list {source}")
+        return first.strip().split("/")[0]
+
+    def extract(self, source: Path, destination: Path, progress_callback: Callable[[int, int], None]) -> Path | None:
+        decoder = self.decoders[archive_suffix(source)]
+        folder = self.root_folder(source, decoder)
+        total = source.stat().st_size
+        progress_callback(0, total)
+
+        destination.mkdir(parents=True, exist_ok=True)
+        args = ["tar", "-x", "-f", "-", "-C", destination.as_posix(), f"--use-compress-program={decoder} -T0"]
+        with subprocess.Popen(args, stdin=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            assert proc.stdin is not None
+            written = 0
+            try:
+                with source.open("rb") as fh:
+                    while buf := fh.read(PIPE_BUFSIZE):
+                        proc.stdin.write(buf)
+                        written += len(buf)
+                        progress_callback(written, total)
+            except BrokenPipeError:
+                pass
+            except BaseException:
+                # Cancelled from the progress callback, do not wait for tar to chew on a truncated stream
+                proc.kill()
+                raise
+            finally:
+                with contextlib.suppress(BrokenPipeError):
+                    proc.stdin.close()
+
+            assert proc.stderr is not None
+            err = proc.stderr.read()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, args, stderr=err)
+
+        return destination / folder
+
+
+BACKENDS: tuple[type[DecompressionBackend], ...] = (
+    SystemTarBackend,
+    ZstdBackend,
+    StdlibBackend,
+)
+
+
+@dataclass
+class BackendStats:
+    nbytes: int = 0
+    seconds: float = 0.0
+    # Extractions that failed since the last one that worked
+    failures: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Archive bytes consumed per second"""
+        if self.seconds <= 0:
+            return 0.0
+        return self.nbytes / self.seconds
+
+
+class DecompressionStats:
+    """Per-backend throughput measurements, persisted in the cache folder"""
+
+    def __init__(self, file: Path | None = None):
+        self.file = file
+        self.backends: dict[str, BackendStats] = {}
+        self._lock = threading.Lock()
+        if file is not None:
+            self.load()
+
+    def load(self):
+        assert self.file is not None
+        try:
+            with self.file.open(encoding="utf-8") as f:
+                dct = json.load(f)
+            self.backends = {name: BackendStats(**v) for name, v in dct.items()}
+        except FileNotFoundError:
+            pass
+        except (json.decoder.JSONDecodeError, OSError, TypeError) as e:
+            logger.error(f"Failed to load decompression stats {self.file}: {e}")
+
+    def save(self):
+        if self.file is None:
+            return
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with self.file.open("w", encoding="utf-8") as f:
+                json.dump({name: vars(s) for name, s in self.backends.items()}, f)
+        except OSError as e:
+            logger.error(f"Failed to save decompression stats {self.file}: {e}")
+
+    def record(self, name: str, nbytes: int, seconds: float):
+        with self._lock:
+            stats = self.backends.setdefault(name, BackendStats())
+            stats.nbytes += nbytes
+            stats.seconds += seconds
+            stats.failures = 0
+            self.save()
+        logger.debug(f"{name} decompressed {nbytes} bytes in {seconds:.2f}s")
+
+    def record_failure(self, name: str):
+        with self._lock:
+            self.backends.setdefault(name, BackendStats()).failures += 1
+            self.save()
+
+    def failed(self, name: str) -> bool:
+        with self._lock:
+            stats = self.backends.get(name)
+            return stats is not None and stats.failures > 0
+
+    def throughput(self, name: str) -> float:
+        with self._lock:
+            stats = self.backends.get(name)
+            return stats.throughput if stats is not None else 0.0
+
+
+@cache
+def get_decompression_stats() -> DecompressionStats:
+    return DecompressionStats(decompression_stats_path())
+
+
+def get_backend(name: str) -> type[DecompressionBackend] | None:
+    for backend in BACKENDS:
+        if backend.name == name:
+            return backend
+    return None
+
+
+def candidate_backends(source: Path) -> list[type[DecompressionBackend]]:
+    """Returns the backends able to unpack `source` on this machine, fastest first.
+
+    Backends that were never measured come first, ordered by their priority, so a newly
+    available fast backend is tried once and then ranked by its real throughput. Backends
+    that failed last time they were used come last, until they work again."""
+    stats = get_decompression_stats()
+    candidates = [b for b in BACKENDS if b.is_available() and b.supports(source)]
+    return sorted(
+        candidates,
+        key=lambda b: (
+            stats.failed(b.name),
+            stats.throughput(b.name) != 0,
+            -stats.throughput(b.name),
+            -b.priority,
+        ),
+    )
+
+
+def run_backends(
+    source: Path,
+    destination: Path,
+    backend: str | None,
+    progress_callback: Callable[[int, int], None],
+) -> tuple[Path | None, str | None, float, list[str]]:
+    """Extracts `source` into `destination` using the fastest working backend, without recording anything.
+
+    If `backend` is given and can unpack `source`, it is tried first. Failing backends fall through to the next
+    candidate, after what they unpacked is removed. Returns the extracted folder, the name of the backend used,
+    how long it took and the names of the backends that failed. This is what runs in the process pool, the
+    measurements are recorded by the caller."""
+    candidates = candidate_backends(source)
+    if backend is not None and (preferred := get_backend(backend)) in candidates:
+        candidates = [preferred, *(b for b in candidates if b is not preferred)]
+
+    root = archive_root_folder(source)
+    partial = destination / root if root is not None else None
+    if partial is not None and partial.exists():
+        # Extracting over an existing folder, which is not ours to remove
+        partial = None
+
+    failed: list[str] = []
+    for i, backend_cls in enumerate(candidates):
+        start = time.monotonic()
+        try:
+            result = backend_cls().extract(source, destination, progress_callback)
+        except TaskCancelledError:
+            raise
+        except Exception as e:
+            if i == len(candidates) - 1:
+                raise
+            logger.warning(f"{backend_cls.name} failed to extract {source}, trying the next backend: {e}")
+            failed.append(backend_cls.name)
+            if partial is not None:
+                shutil.rmtree(partial, ignore_errors=True)
+            continue
+
+        return result, backend_cls.name, time.monotonic() - start, failed
+    return None, None, 0.0, failed
+
+
+def record_extraction(source: Path, name: str | None, seconds: float, failed: list[str]):
+    """Records what run_backends measured"""
+    stats = get_decompression_stats()
+    for failed_name in failed:
+        stats.record_failure(failed_name)
+    if name is not None:
+        stats.record(name, os.stat(source).st_size, seconds)
+
+
+def decompress(
+    source: Path,
+    destination: Path,
+    progress_callback: Callable[[int, int], None],
+    backend: str | None = None,
+) -> Path | None:
+    """Extracts `source` into `destination` using the fastest working backend, and records its throughput"""
+    result, name, seconds, failed = run_backends(source, destination, backend, progress_callback)
+    record_extraction(source, name, seconds, failed)
+    return result
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject
+
+if TYPE_CHECKING:
+    from modules.tasks import TaskQueue
+    from threads.downloader import DownloadTask
+
+logger = logging.getLogger()
+
+
+class TokenBucket:
+    """
+    A blocking token bucket. `consume` sleeps until enough tokens (bytes) are available.
+    A rate <= 0 means unlimited.
+    """
+
+    def __init__(self, rate: float = 0, burst: float = 1.0):
+        self._lock = threading.Lock()
+        self.burst = burst  # seconds worth of tokens that can be saved up
+        self.rate = rate
+        self.tokens = 0.0
+        self.last = time.monotonic()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.tokens = min(self.tokens, self.capacity)
+
+    @property
+    def capacity(self) -> float:
+        return self.rate * self.burst
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self.tokens = min(self.tokens + (now - self.last) * self.rate, self.capacity)
+        self.last = now
+
+    def consume(self, n: int):
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    return
+                self._refill()
+                # Blocks bigger than the bucket are let through once the bucket is full, and paid for afterwards
+                if self.tokens >= min(n, self.capacity):
+                    self.tokens -= n
+                    return
+                wait = (min(n, self.capacity) - self.tokens) / self.rate
+            time.sleep(min(wait, 0.5))
+
+
+class DownloadGovernor(QObject):
+    """
+    Limits how many downloads run at once and how much bandwidth they use.
+
+    Downloads are submitted here instead of directly to the TaskQueue. Only `max_concurrent`
+    of them are handed to the queue at a time, the rest wait in a FIFO without occupying a worker.
+    The bandwidth limit is split evenly between the active transfers, and rebalanced whenever
+    one starts or stops.
+    """
+
+    def __init__(self, task_queue: TaskQueue, max_concurrent: int = 2, bandwidth_limit: int = 0, parent=None):
+        super().__init__(parent)
+        self.task_queue = task_queue
+        self.max_concurrent = max(max_concurrent, 1)
+        self.bandwidth_limit = bandwidth_limit  # bytes per second, 0 is unlimited
+        # Tasks are told apart by identity, two downloads of the same link compare equal
+        self.pending: deque[DownloadTask] = deque()
+        self.active: dict[int, TokenBucket] = {}
+        self._lock = threading.RLock()
+
+    def submit(self, task: DownloadTask):
+        # Emitted however run ends, so a download raising anything still gives its slot back
+        task.completed.connect(lambda _error, _seconds, task=task: self.release(task))
+        with self._lock:
+            self.pending.append(task)
+        self._dispatch()
+
+    def cancel(self, task: DownloadTask) -> bool:
+        """
+        Withdraws `task` if it has not started yet, and returns True. A running download keeps its slot
+        until it actually stops, so it is left for the caller to cancel and False is returned.
+        """
+        with self._lock:
+            i = self._pending_index(task)
+            if i is not None:
+                del self.pending[i]
+                return True
+
+        with self.task_queue.lock:
+            queued = any(queued is task for queued in self.task_queue)
+            if queued:
+                self.task_queue.remove(task)
+        if queued:
+            # It never runs, so it never completes and releases its slot itself
+            self.release(task)
+        return queued
+
+    def release(self, task: DownloadTask):
+        with self._lock:
+            if self.active.pop(id(task), None) is None:
+                return
+            self._rebalance()
+        self._dispatch()
+
+    def is_pending(self, task: DownloadTask) -> bool:
+        with self._lock:
+            return self._pending_index(task) is not None
+
+    def throttle(self, task: DownloadTask, nbytes: int):
+        """Called from the download loop with the size of each block. Blocks to respect the bandwidth limit"""
+        with self._lock:
+            bucket = self.active.get(id(task))
+        if bucket is not None:
+            bucket.consume(nbytes)
+
+    def set_max_concurrent(self, n: int):
+        with self._lock:
+            self.max_concurrent = max(n, 1)
+        self._dispatch()
+
+    def set_bandwidth_limit(self, limit: int):
+        with self._lock:
+            self.bandwidth_limit = limit
+            self._rebalance()
+
+    def _rebalance(self):
+        if not self.active:
+            return
+        share = self.bandwidth_limit / len(self.active) if self.bandwidth_limit > 0 else 0
+        for bucket in self.active.values():
+            bucket.set_rate(share)
+
+    def _dispatch(self):
+        with self._lock:
+            while self.pending and len(self.active) < self.max_concurrent:
+                task = self.pending.popleft()
+                self.active[id(task)] = TokenBucket()
+                self._rebalance()
+                logger.debug(f"Starting {task} ({len(self.active)} active, {len(self.pending)} pending)")
+                self.task_queue.append(task)
+
+    def _pending_index(self, task: DownloadTask) -> int | None:
+        for i, pending in enumerate(self.pending):
+            if pending is task:
+                return i
+        return None
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger()
+
+
+@dataclass
+class JournalEntry:
+    """Where an install got to, enough to pick it up again after the launcher stopped"""
+
+    link: str
+    # BuildInfo.to_dict()["blinfo"][0] of the build being installed
+    build_info: dict
+    # Pipeline stages that finished
+    done: list[str] = field(default_factory=list)
+    archive: str | None = None
+    # Bytes of the archive on disk at the last checkpoint, and its expected size (0 if unknown)
+    offset: int = 0
+    size: int = 0
+    # Folder the extraction creates, and the build folder once extracted
+    extract_root: str | None = None
+    build_dir: str | None = None
+    started: float = field(default_factory=time.time)
+
+
+class InstallJournal:
+    """
+    A persistent record of the installs in progress. Every change is written to disk
+    atomically, so a crash leaves either the previous or the new state behind.
+    """
+
+    def __init__(self, file: Path):
+        self.file = file
+        self.entries: dict[str, JournalEntry] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with self.file.open(encoding="utf-8") as f:
+                dct = json.load(f)
+            self.entries = {link: JournalEntry(**e) for link, e in dct.items()}
+        except FileNotFoundError:
+            pass
+        except (json.decoder.JSONDecodeError, OSError, TypeError) as e:
+            logger.error(f"Failed to load install journal {self.file}: {e}")
+
+    def save(self):
+        tmp = self.file.with_name(f"{self.file.name}.tmp")
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump({link: asdict(e) for link, e in self.entries.items()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(self.file)
+        except OSError as e:
+            logger.error(f"Failed to save install journal {self.file}: {e}")
+
+    def begin(self, link: str, build_info: dict) -> JournalEntry:
+        with self._lock:
+            entry = self.entries[link] = JournalEntry(link, build_info)
+            self.save()
+        return entry
+
+    def update(self, link: str, stage: str | None = None, **fields):
+        """Records changes to an install, and `stage` as finished if given"""
+        with self._lock:
+            entry = self.entries.get(link)
+            if entry is None:
+                return
+            for name, value in fields.items():
+                setattr(entry, name, value)
+            if stage is not None and stage not in entry.done:
+                entry.done.append(stage)
+            self.save()
+
+    def finish(self, link: str):
+        with self._lock:
+            if self.entries.pop(link, None) is not None:
+                self.save()
+
+    def claims(self, path: Path) -> bool:
+        """Whether `path` is a build folder an unfinished install is still working on"""
+        with self._lock:
+            return any(
+                p is not None and Path(p) == path for e in self.entries.values() for p in (e.build_dir, e.extract_root)
+            )
+
+    def pending(self) -> list[JournalEntry]:
+        with self._lock:
+            return list(self.entries.values())
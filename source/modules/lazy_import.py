@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    Stands in for a module until one of its attributes is used, then imports it.
+
+    For dependencies that are slow to import and only needed by some features, like the scraper,
+    so that starting the launcher, or launching a build from the command line, does not pay for them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            # Scraper and task threads can get here at the same time
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns `name` if it is already imported, or a LazyModule importing it on first use.
+
+    PyInstaller cannot see these imports, so `name` also has to be a --hidden-import of the build scripts.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
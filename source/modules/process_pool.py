@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger()
+
+# Minimum time between two progress messages sent by a worker process
+PROGRESS_INTERVAL = 0.05
+
+_pools: weakref.WeakSet[ProcessPool] = weakref.WeakSet()
+
+
+class WorkerProcessError(Exception):
+    """A job failed in a way that could not be sent back, or its process died"""
+
+
+def _worker_main(conn: Connection):
+    """Entry point of the pool processes: runs jobs sent over `conn` and streams their progress back"""
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        fn, args = job
+        last = 0.0
+
+        def progress(obtained: int, total: int):
+            nonlocal last
+            now = time.monotonic()
+            if now - last >= PROGRESS_INTERVAL or obtained >= total:
+                last = now
+                conn.send(("progress", obtained, total))
+
+        try:
+            result = fn(*args, progress)
+        except BaseException as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # The exception itself could not be pickled
+                conn.send(("error", WorkerProcessError(repr(e))))
+        else:
+            conn.send(("done", result))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process: BaseProcess = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        with contextlib.suppress(OSError):
+            self.conn.send(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessPool:
+    """
+    A few long lived worker processes for CPU heavy task bodies, so they do not hold the GIL
+    of the GUI process. Jobs are module level functions taking a progress callback as their last
+    argument, and their progress is sent back over the process pipe while they run.
+
+    Processes are started on first use, and one is killed and replaced when its job is cancelled.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(size, 1)
+        # Forking a process running Qt and several threads is not safe
+        self.ctx = multiprocessing.get_context("spawn")
+        self.idle: list[_Worker] = []
+        # Every live worker, idle or running a job
+        self.workers: set[_Worker] = set()
+        self.count = 0
+        self._cond = threading.Condition()
+        self.closed = False
+        _pools.add(self)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while not self.idle and self.count >= self.size and not self.closed:
+                self._cond.wait()
+            if self.closed:
+                raise WorkerProcessError("The process pool is closed")
+            if self.idle:
+                return self.idle.pop()
+            self.count += 1
+
+        try:
+            worker = _Worker(self.ctx)
+        except Exception:
+            with self._cond:
+                self.count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.workers.add(worker)
+        return worker
+
+    def pids(self) -> list[int]:
+        with self._cond:
+            return [w.process.pid for w in self.workers if w.process.pid is not None]
+
+    def _release(self, worker: _Worker | None):
+        with self._cond:
+            if worker is None or self.closed:
+                self.count -= 1
+            else:
+                self.idle.append(worker)
+            self._cond.notify()
+        if worker is not None and self.closed:
+            with self._cond:
+                self.workers.discard(worker)
+            worker.stop()
+
+    def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        progress_callback: Callable[[int, int], None] | None = None,
+        check: Callable[[], None] | None = None,
+    ) -> Any:
+        """
+        Runs `fn(*args, progress)` in a worker process and returns its result, relaying
+        progress to `progress_callback`. `check` is called regularly, and may raise to
+        abandon the job, in which case its process is killed.
+        """
+        worker: _Worker | None = self._acquire()
+        assert worker is not None
+        remote_error = False
+        try:
+            worker.conn.send((fn, args))
+            while True:
+                if check is not None:
+                    check()
+                if not worker.conn.poll(0.1):
+                    if not worker.process.is_alive():
+                        raise WorkerProcessError(f"Worker process exited with code {worker.process.exitcode}")
+                    continue
+
+                kind, *payload = worker.conn.recv()
+                if kind == "progress":
+                    if progress_callback is not None:
+                        progress_callback(*payload)
+                elif kind == "done":
+                    return payload[0]
+                else:
+                    remote_error = True
+                    raise payload[0]
+        except BaseException:
+            # A job that failed in the process leaves it usable, anything else leaves it in an unknown state
+            if not remote_error:
+                logger.debug(f"Killing worker process {worker.process.pid}")
+                worker.kill()
+                with self._cond:
+                    self.workers.discard(worker)
+                self._release(None)
+                worker = None
+            raise
+        finally:
+            if worker is not None:
+                self._release(worker)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.count -= len(idle)
+            self.workers.difference_update(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+
+
+def worker_pids() -> list[int]:
+    """Processes of every pool started so far, without starting one"""
+    return [pid for pool in list(_pools) for pid in pool.pids()]
+
+
+@cache
+def get_process_pool() -> ProcessPool:
+    return ProcessPool(max((os.cpu_count() or 2) // 2, 1))
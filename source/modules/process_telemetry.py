@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from subprocess import TimeoutExpired
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from subprocess import Popen
+
+    from modules.build_info import BuildInfo
+
+logger = logging.getLogger()
+
+# Seconds between two samples of the launched processes
+SAMPLE_INTERVAL = 2.0
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+@dataclass
+class ProcessSample:
+    """Resource usage of a launched process and everything it started"""
+
+    cpu_seconds: float = 0.0
+    rss: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    processes: int = 0
+
+
+def _proc_children(pid: int) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _sample_proc(pid: int) -> ProcessSample | None:
+    """Reads a process tree from /proc. Launched builds go through a shell, so its children are included"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    sample = ProcessSample()
+    pending = [pid]
+    while pending:
+        p = pending.pop()
+        try:
+            with open(f"/proc/{p}/stat", encoding="ascii", errors="replace") as f:
+                # The name in field 2 may contain spaces, the rest follows its closing parenthesis
+                fields = f.read().rpartition(")")[2].split()
+        except OSError:
+            if p == pid:
+                return None
+            continue
+
+        # utime, stime, cutime, cstime and rss, counted from the state field
+        utime, stime, cutime, cstime = (int(v) for v in fields[11:15])
+        sample.cpu_seconds += (utime + stime + cutime + cstime) / ticks
+        sample.rss += int(fields[21]) * page_size
+        sample.processes += 1
+
+        with contextlib.suppress(OSError, ValueError), open(f"/proc/{p}/io", encoding="ascii") as f:
+            io = dict(line.split(": ") for line in f.read().splitlines())
+            sample.read_bytes += int(io["read_bytes"])
+            sample.write_bytes += int(io["write_bytes"])
+
+        pending.extend(_proc_children(p))
+    return sample
+
+
+def _add_psutil_sample(sample: ProcessSample, proc: psutil.Process):
+    """Adds the usage of `proc` to `sample`, unless it exited or cannot be read"""
+    assert psutil is not None
+    try:
+        with proc.oneshot():
+            cpu = proc.cpu_times()
+            sample.cpu_seconds += cpu.user + cpu.system + cpu.children_user + cpu.children_system
+            sample.rss += proc.memory_info().rss
+            with contextlib.suppress(psutil.Error, AttributeError):
+                io = proc.io_counters()
+                sample.read_bytes += io.read_bytes
+                sample.write_bytes += io.write_bytes
+    except psutil.Error:
+        return
+    sample.processes += 1
+
+
+def _sample_psutil(pid: int) -> ProcessSample | None:
+    assert psutil is not None
+    try:
+        root = psutil.Process(pid)
+        procs = [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return None
+
+    sample = ProcessSample()
+    for proc in procs:
+        _add_psutil_sample(sample, proc)
+    return sample
+
+
+def can_sample_processes() -> bool:
+    """Whether sample_process_tree can read processes on this machine"""
+    return psutil is not None or os.path.isdir("/proc")
+
+
+def sample_process_tree(pid: int) -> ProcessSample | None:
+    """Returns the current usage of `pid` and its children, or None if it is gone or cannot be read"""
+    if psutil is not None:
+        return _sample_psutil(pid)
+    if os.path.isdir("/proc"):
+        return _sample_proc(pid)
+    return None
+
+
+def build_record_info(info: BuildInfo) -> dict:
+    """What tells builds apart in the telemetry log"""
+    return {
+        "version": str(info.full_semversion),
+        "branch": info.branch,
+        "build_hash": info.build_hash,
+        "commit_time": info.commit_time.isoformat(),
+    }
+
+
+def format_usage(usage: dict) -> str:
+    mib = 1024 * 1024
+    uptime = int(usage["uptime"])
+    return (
+        f"CPU {usage['cpu_percent']:.0f}%, RAM {usage['rss'] / mib:.0f} MB (peak {usage['peak_rss'] / mib:.0f} MB)\n"
+        f"Read {usage['read_bytes'] / mib:.1f} MB, written {usage['write_bytes'] / mib:.1f} MB\n"
+        f"Running for {uptime // 3600}:{uptime // 60 % 60:02}:{uptime % 60:02}"
+    )
+
+
+@dataclass
+class ProcessStats:
+    """Usage of one launched build over its lifetime"""
+
+    pid: int
+    build: str
+    info: dict
+    started: float = field(default_factory=time.time)
+    started_mono: float = field(default_factory=time.monotonic)
+    last: ProcessSample | None = None
+    last_time: float = 0.0
+    cpu_percent: float = 0.0
+    peak_cpu_percent: float = 0.0
+    peak_rss: int = 0
+    rss_total: int = 0
+    samples: int = 0
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_mono
+
+    def update(self, sample: ProcessSample, now: float):
+        if self.last is not None and now > self.last_time:
+            # Can go over 100% on several cores, like top
+            self.cpu_percent = max(sample.cpu_seconds - self.last.cpu_seconds, 0.0) / (now - self.last_time) * 100
+            self.peak_cpu_percent = max(self.peak_cpu_percent, self.cpu_percent)
+        self.last = sample
+        self.last_time = now
+        self.peak_rss = max(self.peak_rss, sample.rss)
+        self.rss_total += sample.rss
+        self.samples += 1
+
+    def record(self, returncode: int | None = None) -> dict:
+        last = self.last or ProcessSample()
+        return {
+            "build": self.build,
+            **self.info,
+            "pid": self.pid,
+            "started": self.started,
+            "uptime": round(self.uptime, 3),
+            "returncode": returncode,
+            "cpu_seconds": round(last.cpu_seconds, 3),
+            "mean_cpu_percent": round(last.cpu_seconds / self.uptime * 100, 1) if self.uptime > 0 else 0.0,
+            "peak_cpu_percent": round(self.peak_cpu_percent, 1),
+            "mean_rss": self.rss_total // self.samples if self.samples else 0,
+            "peak_rss": self.peak_rss,
+            "read_bytes": last.read_bytes,
+            "write_bytes": last.write_bytes,
+            "samples": self.samples,
+        }
+
+
+def usage_summary(stats: list[ProcessStats]) -> dict:
+    """Current usage of the running processes of one build"""
+    return {
+        "count": len(stats),
+        "cpu_percent": sum(s.cpu_percent for s in stats),
+        "rss": sum(s.last.rss for s in stats if s.last is not None),
+        "peak_rss": max((s.peak_rss for s in stats), default=0),
+        "read_bytes": sum(s.last.read_bytes for s in stats if s.last is not None),
+        "write_bytes": sum(s.last.write_bytes for s in stats if s.last is not None),
+        "uptime": max((s.uptime for s in stats), default=0.0),
+    }
+
+
+class ProcessTelemetry:
+    """
+    Samples the CPU, memory and I/O of launched builds every `interval` seconds, through psutil
+    if it is installed, or /proc otherwise. When a process exits, a summary of its run is appended
+    to a JSON lines log, so builds can be compared over many sessions.
+    """
+
+    def __init__(self, log_file: Path | None, interval: float = SAMPLE_INTERVAL, enabled: bool = True):
+        self.log_file = log_file
+        self.interval = interval
+        # Only affects processes tracked from now on
+        self.enabled = enabled
+        self.stats: dict[int, ProcessStats] = {}
+        self.next_sample = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return psutil is not None or os.path.isdir("/proc")
+
+    @property
+    def tracking(self) -> bool:
+        """Whether any process is sampled. Nothing is while telemetry is disabled"""
+        with self._lock:
+            return bool(self.stats)
+
+    def track(self, pid: int, build: str, info: dict | None = None):
+        if not self.enabled or not self.available:
+            return
+        soon = time.monotonic() + 0.5
+        with self._lock:
+            self.stats[pid] = ProcessStats(pid, build, info or {})
+            # Get a first sample in soon, the CPU usage needs two of them
+            if not self.next_sample or self.next_sample > soon:
+                self.next_sample = soon
+
+    def due(self, now: float) -> float:
+        """Seconds left until the next sample"""
+        return max(self.next_sample - now, 0.0)
+
+    def sample(self):
+        now = time.monotonic()
+        with self._lock:
+            self.next_sample = now + self.interval
+            pids = list(self.stats)
+        for pid in pids:
+            sample = sample_process_tree(pid)
+            with self._lock:
+                stats = self.stats.get(pid)
+                if sample is not None and stats is not None:
+                    stats.update(sample, now)
+
+    def usage(self, pids: list[int]) -> dict:
+        with self._lock:
+            return usage_summary([self.stats[pid] for pid in pids if pid in self.stats])
+
+    def finish(self, pid: int, returncode: int | None = None):
+        with self._lock:
+            stats = self.stats.pop(pid, None)
+        if stats is None or self.log_file is None:
+            return
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.log_file.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(stats.record(returncode)) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write process telemetry to {self.log_file}: {e}")
+
+    def wait(self, proc: Popen, build: str, info: dict | None = None) -> int:
+        """Waits for `proc` while sampling it, for callers that block on the launched build"""
+        self.track(proc.pid, build, info)
+        returncode = None
+        try:
+            while returncode is None:
+                if self.stats:
+                    self.sample()
+                with contextlib.suppress(TimeoutExpired):
+                    returncode = proc.wait(self.interval)
+            return returncode
+        finally:
+            self.finish(proc.pid, returncode)
+
+
+def read_telemetry_log(log_file: Path) -> list[dict]:
+    records = []
+    try:
+        with log_file.open(encoding="utf-8") as f:
+            for line in f:
+                with contextlib.suppress(json.decoder.JSONDecodeError):
+                    records.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def export_telemetry_csv(log_file: Path, destination: Path) -> int:
+    """Writes the telemetry log as a CSV file, one row per session. Returns the number of rows"""
+    records = read_telemetry_log(log_file)
+    columns: list[str] = []
+    for record in records:
+        columns.extend(key for key in record if key not in columns)
+    with destination.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(records)
+    return len(records)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import deque
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class ProgressReporter:
+    """
+    Coalesces progress updates from tight copy/extraction loops.
+
+    Every call is cheap, but the wrapped callback (usually a cross-thread Qt signal)
+    only fires when at least `min_interval` seconds have passed and the progress moved by
+    `min_delta` of the total, or `max_interval` seconds have passed. The first update,
+    a change of total and completion are always forwarded.
+    This bounds the amount of events to 1 / `min_interval` per second regardless of block or member size.
+
+    Parameters
+    ----------
+    callback : Callable[[int, int], None]
+        receives (obtained, total)
+    rate_callback : Callable[[float, float], None] | None
+        receives (bytes per second, estimated seconds left). The ETA is -1 when unknown
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[int, int], None],
+        rate_callback: Callable[[float, float], None] | None = None,
+        min_interval: float = 0.1,
+        max_interval: float = 1.0,
+        min_delta: float = 0.005,
+        window: float = 5.0,
+    ):
+        self.callback = callback
+        self.rate_callback = rate_callback
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_delta = min_delta
+        self.window = window
+
+        self.obtained = 0
+        self.total = 0
+        self.rate = 0.0
+        self.eta = -1.0
+
+        self._last_time: float | None = None
+        self._last_obtained = 0
+        self._last_total = -1
+        self._samples: deque[tuple[float, int]] = deque()
+
+    def __call__(self, obtained: int, total: int):
+        self.obtained = obtained
+        self.total = total
+        now = monotonic()
+
+        if self._last_time is not None and total == self._last_total and not (total and obtained >= total):
+            elapsed = now - self._last_time
+            if elapsed < self.min_interval:
+                return
+            if elapsed < self.max_interval and total and (obtained - self._last_obtained) / total < self.min_delta:
+                return
+
+        self._emit(now)
+
+    def flush(self):
+        """Forwards the latest progress, even if it would have been throttled"""
+        if self._last_time is None or self.obtained != self._last_obtained or self.total != self._last_total:
+            self._emit(monotonic())
+
+    def _emit(self, now: float):
+        self._last_time = now
+        self._last_obtained = self.obtained
+        self._last_total = self.total
+
+        samples = self._samples
+        if samples and self.obtained < samples[-1][1]:  # restarted
+            samples.clear()
+        samples.append((now, self.obtained))
+        while len(samples) > 2 and now - samples[0][0] > self.window:
+            samples.popleft()
+
+        first_time, first_obtained = samples[0]
+        if now > first_time:
+            self.rate = (self.obtained - first_obtained) / (now - first_time)
+        if self.rate > 0 and self.total:
+            self.eta = max(self.total - self.obtained, 0) / self.rate
+        else:
+            self.eta = -1.0
+
+        self.callback(self.obtained, self.total)
+        if self.rate_callback is not None:
+            self.rate_callback(self.rate, self.eta)
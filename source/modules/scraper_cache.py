@@ -36,18 +36,22 @@ STABLE_FOLDER_TEMPLATE = """<a href="../">../</a><a href="blender-4.0.0-linux-x6
 class StableFolder:
     assets: list[BuildInfo]
     modified_date: datetime
+    # Whether the .sha256 files of this folder were read. Older caches have to be rescraped once
+    checksums_scraped: bool = False
 
     @classmethod
     def from_dict(cls, dct: dict):
         return cls(
             assets=[BuildInfo.from_dict(link, build["blinfo"][0]) for link, build in dct["assets"]],
             modified_date=datetime.fromisoformat(dct["modified_date"]),
+            checksums_scraped=dct.get("checksums_scraped", False),
         )
 
     def to_dict(self):
         return {
             "assets": [(build.link, build.to_dict()) for build in self.assets],
             "modified_date": self.modified_date.isoformat(),
+            "checksums_scraped": self.checksums_scraped,
         }
 
 
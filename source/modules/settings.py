@@ -533,6 +533,58 @@ def set_worker_thread_count(v: int):
     get_settings().setValue("worker_thread_count", v)
 
 
+def get_max_concurrent_downloads() -> int:
+    return get_settings().value("max_concurrent_downloads", defaultValue=2, type=int)
+
+
+def set_max_concurrent_downloads(v: int):
+    get_settings().setValue("max_concurrent_downloads", v)
+
+
+def get_download_bandwidth_limit() -> int:
+    """Download bandwidth limit in KiB/s, 0 is unlimited"""
+    return get_settings().value("download_bandwidth_limit", defaultValue=0, type=int)
+
+
+def set_download_bandwidth_limit(v: int):
+    get_settings().setValue("download_bandwidth_limit", v)
+
+
+def get_archive_cache_size() -> int:
+    """Size budget of the downloaded archive cache in MiB, 0 disables it"""
+    return get_settings().value("archive_cache_size", defaultValue=2048, type=int)
+
+
+def set_archive_cache_size(v: int):
+    get_settings().setValue("archive_cache_size", v)
+
+
+def get_archive_mirror() -> str:
+    """A directory or HTTP URL checked for archives before downloading them, empty if unused"""
+    return get_settings().value("archive_mirror", defaultValue="", type=str).strip()
+
+
+def set_archive_mirror(location: str):
+    get_settings().setValue("archive_mirror", location.strip())
+
+
+def get_extract_in_process() -> bool:
+    return get_settings().value("extract_in_process", defaultValue=True, type=bool)
+
+
+def set_extract_in_process(b: bool):
+    get_settings().setValue("extract_in_process", b)
+
+
+def get_record_process_telemetry() -> bool:
+    """Whether the CPU, memory and I/O usage of launched builds is sampled and logged"""
+    return get_settings().value("record_process_telemetry", defaultValue=True, type=bool)
+
+
+def set_record_process_telemetry(b: bool):
+    get_settings().setValue("record_process_telemetry", b)
+
+
 def get_use_pre_release_builds():
     return get_settings().value("use_pre_release_builds", defaultValue=False, type=bool)
 
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from modules.build_info import BuildInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+logger = logging.getLogger()
+
+
+@dataclass
+class StartupSnapshot:
+    """
+    The library and the downloads pages as they were when the launcher quit. The next start draws them
+    right away, and replaces them with what reading the library and scraping find once they are done.
+    """
+
+    library_folder: str
+    # Snapshots of other versions of the build info are not drawn, the builds would be rewritten anyway
+    file_version: str = BuildInfo.file_version
+    # Build folder -> BuildInfo.to_dict()["blinfo"][0]
+    library: dict[str, dict] = field(default_factory=dict)
+    # Download link -> BuildInfo.to_dict()["blinfo"][0]
+    downloads: dict[str, dict] = field(default_factory=dict)
+
+    def add_library_build(self, path: Path, build_info: BuildInfo):
+        self.library[Path(path).as_posix()] = build_info.to_dict()["blinfo"][0]
+
+    def add_download(self, build_info: BuildInfo):
+        self.downloads[build_info.link] = build_info.to_dict()["blinfo"][0]
+
+    def library_builds(self) -> Iterator[tuple[Path, BuildInfo]]:
+        for path, blinfo in self.library.items():
+            build_info = _parse_build(path, blinfo)
+            if build_info is not None:
+                yield Path(path), build_info
+
+    def download_builds(self) -> Iterator[BuildInfo]:
+        for link, blinfo in self.downloads.items():
+            build_info = _parse_build(link, blinfo)
+            if build_info is not None:
+                yield build_info
+
+
+def _parse_build(link: str, blinfo: dict) -> BuildInfo | None:
+    try:
+        return BuildInfo.from_dict(link, blinfo)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug(f"Skipping {link} from the startup snapshot: {e}")
+        return None
+
+
+def read_snapshot(file: Path) -> StartupSnapshot | None:
+    try:
+        with file.open(encoding="utf-8") as f:
+            snapshot = StartupSnapshot(**json.load(f))
+    except FileNotFoundError:
+        return None
+    except (json.decoder.JSONDecodeError, OSError, TypeError) as e:
+        logger.error(f"Failed to load startup snapshot {file}: {e}")
+        return None
+
+    if snapshot.file_version != BuildInfo.file_version:
+        return None
+    return snapshot
+
+
+def write_snapshot(file: Path, snapshot: StartupSnapshot):
+    tmp = file.with_name(f"{file.name}.tmp")
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(snapshot), f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(file)
+    except OSError as e:
+        logger.error(f"Failed to save startup snapshot {file}: {e}")
@@ -1,14 +1,123 @@
+from __future__ import annotations
+
+import threading
 from abc import abstractmethod
+from enum import Enum, IntEnum
+from typing import TYPE_CHECKING
 
 from modules.enums import MessageType
 from PyQt5.QtCore import QObject, pyqtSignal
 
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+
+class TaskPriority(IntEnum):
+    """Scheduling classes of the TaskQueue. Lower values are picked first"""
+
+    INTERACTIVE = 0  # short tasks a user is directly waiting on (reading/writing build info, renaming)
+    METADATA = 1  # scanning the library
+    BULK_IO = 2  # downloads, extraction, copying templates
+    BACKGROUND = 3  # cleanup
+
+
+class TaskResource(Enum):
+    """What a task mostly spends its time on. The TaskQueue only runs as many CPU tasks as the machine can take"""
+
+    IO = 1  # waiting on the network, the disk or other processes
+    CPU = 2  # decompressing, hashing
+
+
+class TaskCancelledError(Exception):
+    """Raised from inside Task.run once the task has been cancelled"""
+
+
+def forward_signals(src: Task, dst: Task):
+    """Re-emits every signal declared by `src`'s task classes from `dst`, so the listeners of `dst` follow `src`"""
+    names = {
+        name
+        for cls in type(src).__mro__
+        if issubclass(cls, Task)
+        for name, attr in vars(cls).items()
+        if isinstance(attr, pyqtSignal)
+    }
+    for name in names:
+        getattr(src, name).connect(getattr(dst, name))
+
 
 class Task(QObject):
     message = pyqtSignal(str, MessageType)
+    cancelled = pyqtSignal()
+    # Emitted by the worker once run returns: (the exception it raised or None, seconds spent running)
+    completed = pyqtSignal(object, float)
+    priority = TaskPriority.METADATA
+    resource = TaskResource.IO
+    # If set, a queued task with the same key is replaced by a newer one instead of absorbing it
+    supersedes = False
 
     def __post_init__(self):
         super().__init__()
+        # Tasks are mostly frozen dataclasses, so these are set around their __setattr__
+        object.__setattr__(self, "_cancel_event", threading.Event())
+        object.__setattr__(self, "_bytes_processed", 0)
+        object.__setattr__(self, "_suspended", False)
+        # What emit_replayable sent, for duplicates joining while this runs
+        object.__setattr__(self, "_replay_lock", threading.Lock())
+        object.__setattr__(self, "_emitted", [])
+
+    @property
+    def key(self) -> Hashable | None:
+        """Identifies tasks doing the same work, so the TaskQueue can coalesce them. None opts out"""
+        return None
+
+    def emit_replayable(self, signal: str, *args):
+        """
+        Emits `signal` and keeps it, so that a duplicate joining this task while it runs receives it too.
+        Tasks with a key emit their results this way.
+        """
+        with self._replay_lock:
+            self._emitted.append((signal, args))
+            getattr(self, signal).emit(*args)
+
+    def join(self, task: Task, attach=True):
+        """
+        Called by the TaskQueue when `task` is dropped in favor of this running duplicate. Replays what was
+        emitted so far to the listeners of `task`, and if `attach` is set makes them follow this task from now on.
+        """
+        with self._replay_lock:
+            if attach:
+                forward_signals(self, task)
+            for signal, args in self._emitted:
+                getattr(task, signal).emit(*args)
+
+    def report_bytes(self, n: int):
+        """Adds to the bytes this task read or wrote, collected by the queue metrics"""
+        object.__setattr__(self, "_bytes_processed", self._bytes_processed + n)
+
+    @property
+    def bytes_processed(self) -> int:
+        return self._bytes_processed
+
+    def cancel(self, suspend: bool = False):
+        """
+        Asks the task to stop. Long running tasks poll this in their loops and clean up after themselves,
+        unless `suspend` is set: the launcher is going away, and partial work is kept to be resumed later.
+        """
+        if suspend:
+            object.__setattr__(self, "_suspended", True)
+        self._cancel_event.set()
+
+    @property
+    def is_suspended(self) -> bool:
+        return self._suspended
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelledError(str(self))
 
     @abstractmethod
     def run(self):
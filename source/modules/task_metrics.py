@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from modules.task import Task
+
+logger = logging.getLogger()
+
+# Upper bounds of the histogram buckets, doubling every time
+SECONDS_BUCKETS = tuple(0.001 * 2**i for i in range(22))  # 1ms to about 35 minutes
+COUNT_BUCKETS = tuple(2**i for i in range(11))  # 1 to 1024
+RATE_BUCKETS = tuple(1024 * 2**i for i in range(23))  # 1 KiB/s to 4 GiB/s
+
+
+class RollingHistogram:
+    """Keeps the samples of the last `window` seconds (at most `maxlen` of them) and bins them on demand"""
+
+    def __init__(self, bounds: tuple[float, ...] = SECONDS_BUCKETS, window: float = 3600.0, maxlen: int = 2048):
+        self.bounds = bounds
+        self.window = window
+        self.samples: deque[tuple[float, float]] = deque(maxlen=maxlen)
+
+    def add(self, value: float, now: float | None = None):
+        self.samples.append((time.monotonic() if now is None else now, value))
+
+    def values(self, now: float | None = None) -> list[float]:
+        now = time.monotonic() if now is None else now
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+        return [v for _, v in self.samples]
+
+    def summary(self) -> dict:
+        values = sorted(self.values())
+        if not values:
+            return {"count": 0}
+
+        def percentile(p: float) -> float:
+            return values[min(int(p * len(values)), len(values) - 1)]
+
+        buckets = [0] * (len(self.bounds) + 1)
+        for v in values:
+            buckets[bisect_left(self.bounds, v)] += 1
+
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "max": values[-1],
+            # upper bound -> count, the last bucket is everything above the largest bound
+            "buckets": {f"{bound:g}": n for bound, n in zip((*self.bounds, float("inf")), buckets) if n},
+        }
+
+
+@dataclass
+class TaskTimes:
+    name: str
+    enqueued: float
+    started: float | None = None
+
+
+class TaskTypeStats:
+    def __init__(self):
+        self.wait = RollingHistogram()
+        self.run = RollingHistogram()
+        self.throughput = RollingHistogram(RATE_BUCKETS)  # bytes per second of run time, for tasks reporting bytes
+        self.count = 0
+        self.failures = 0
+        self.cancellations = 0
+        self.bytes = 0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "cancellations": self.cancellations,
+            "bytes": self.bytes,
+            "wait": self.wait.summary(),
+            "run": self.run.summary(),
+            "throughput": self.throughput.summary(),
+        }
+
+
+class TaskMetrics:
+    """
+    Instrumentation of a TaskQueue. Records when each task is queued, started and finished,
+    and how many bytes it processed, aggregated per Task subclass.
+
+    A long `wait` means the queue is the bottleneck, while the `throughput` of downloads
+    against extraction and template tasks tells the network apart from the disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending: dict[int, TaskTimes] = {}
+        self.types: dict[str, TaskTypeStats] = {}
+        self.depth = RollingHistogram(COUNT_BUCKETS)
+        self.created = time.time()
+
+    def _stats(self, name: str) -> TaskTypeStats:
+        stats = self.types.get(name)
+        if stats is None:
+            stats = self.types[name] = TaskTypeStats()
+        return stats
+
+    def enqueued(self, task: Task, depth: int):
+        with self._lock:
+            self.pending[id(task)] = TaskTimes(type(task).__name__, time.monotonic())
+            self.depth.add(depth)
+
+    def started(self, task: Task):
+        with self._lock:
+            times = self.pending.get(id(task))
+            if times is None:
+                # Ran without going through `enqueued`
+                times = self.pending[id(task)] = TaskTimes(type(task).__name__, time.monotonic())
+            times.started = time.monotonic()
+            self._stats(times.name).wait.add(times.started - times.enqueued)
+
+    def discarded(self, task: Task):
+        with self._lock:
+            self.pending.pop(id(task), None)
+
+    def finished(self, task: Task, error: Exception | None = None, cancelled: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            times = self.pending.pop(id(task), None)
+            if times is None or times.started is None:
+                return
+            stats = self._stats(times.name)
+            stats.count += 1
+            if cancelled:
+                stats.cancellations += 1
+            elif error is not None:
+                stats.failures += 1
+
+            seconds = now - times.started
+            stats.run.add(seconds)
+            nbytes = task.bytes_processed
+            if nbytes:
+                stats.bytes += nbytes
+                if seconds > 0:
+                    stats.throughput.add(nbytes / seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "since": self.created,
+                "queue_depth": self.depth.summary(),
+                "in_flight": len(self.pending),
+                "tasks": {name: stats.summary() for name, stats in sorted(self.types.items())},
+            }
+
+    def dump(self, file: Path):
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with file.open("w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+        except OSError as e:
+            logger.error(f"Failed to dump task metrics to {file}: {e}")
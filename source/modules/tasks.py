@@ -1,18 +1,91 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
+import time
 from collections import deque
+from dataclasses import dataclass
+from enum import Enum
 from typing import TYPE_CHECKING, Any
 
 from modules.enums import MessageType
-from modules.task import Task
-from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot
+from modules.process_pool import worker_pids
+from modules.process_telemetry import can_sample_processes, sample_process_tree
+from modules.task import Task, TaskCancelledError, TaskPriority, TaskResource, forward_signals
+from modules.task_metrics import TaskMetrics
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator
 
 
-class TaskQueue(deque[Task]):
+def default_reserved_workers(worker_count: int) -> dict[TaskPriority, int]:
+    """Workers that lower priority classes can never occupy, per class"""
+    return {
+        TaskPriority.INTERACTIVE: max(worker_count // 4, 1),
+        TaskPriority.METADATA: worker_count // 4,
+    }
+
+
+class CpuMonitor:
+    """Samples the share of the machine's CPU time used by the launcher, its process pool workers and the processes
+    it waited on"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.cpu_count = os.cpu_count() or 1
+        # Without psutil or /proc, the pool workers are invisible and their load has to be estimated by the caller
+        self.sees_workers = can_sample_processes()
+        self.last_wall = time.monotonic()
+        self.last_cpu = self._cpu_time()
+        self.utilization = 0.0
+
+    @staticmethod
+    def _cpu_time() -> float:
+        t = os.times()
+        # Children are the external decoders and the pool workers, counted once they exit
+        cpu = t.user + t.system + t.children_user + t.children_system
+        # The pool workers live on, so they are read while they run, with the decoders they started
+        for pid in worker_pids():
+            sample = sample_process_tree(pid)
+            if sample is not None:
+                cpu += sample.cpu_seconds
+        return cpu
+
+    def sample(self) -> float:
+        now = time.monotonic()
+        if now - self.last_wall >= self.interval:
+            cpu = self._cpu_time()
+            # A worker that was just replaced drops out before it is counted as an exited child
+            self.utilization = min(max(cpu - self.last_cpu, 0.0) / ((now - self.last_wall) * self.cpu_count), 1.0)
+            self.last_wall, self.last_cpu = now, cpu
+        return self.utilization
+
+
+class TaskQueue:
+    """
+    A queue of tasks, split in priority classes (see TaskPriority).
+
+    Workers always take the oldest task of the most urgent class. Each class can reserve
+    workers: a task may only start if, after starting, the tasks of its class and less urgent
+    classes still leave the reserved workers of every more urgent class free. This keeps
+    interactive tasks from waiting behind long transfers.
+
+    Idle workers block on a condition variable instead of polling. Appending a task wakes one
+    of them, and so does a finished task, since it may unblock a task held back by its class limit.
+
+    The pool starts with `min_workers` threads and grows up to `worker_count` when a task could start
+    but no worker is idle. Threads idle for `idle_timeout` seconds are retired down to `min_workers`.
+    CPU bound tasks (see TaskResource) are not started beyond the CPU count, nor while the measured
+    CPU utilization is above `cpu_threshold`, so they leave room to downloads and the UI.
+
+    Tasks with a key (see Task.key) are coalesced with the queued task of the same key: the
+    new task is dropped and its listeners follow the queued one, or, for tasks that supersede,
+    the new task takes the place of the queued one and inherits its listeners. A task with the key of
+    a running one joins it instead (see Task.join), unless it supersedes, since its work is newer.
+    """
+
     message = pyqtSignal(str, MessageType)
 
     def __init__(
@@ -22,18 +95,186 @@ class TaskQueue(deque[Task]):
         maxlen=None,
         new_workers_on_crash=True,
         on_spawn: Callable[[TaskWorker], Any] | None = None,
+        reserved: dict[TaskPriority, int] | None = None,
+        min_workers: int | None = None,
+        idle_timeout: float = 30.0,
+        cpu_threshold: float = 0.85,
     ):
-        if maxlen:
-            super().__init__(maxlen=maxlen)
-        else:
-            super().__init__()
+        self.queues: dict[TaskPriority, deque[Task]] = {p: deque(maxlen=maxlen) for p in TaskPriority}
+        self.running: dict[TaskWorker, Task] = {}
+        self.lock = threading.RLock()
+        self.cond = threading.Condition(self.lock)
+        self.stopping = False
+        self.started = False
+        self.metrics = TaskMetrics()
+        self.cpu = CpuMonitor()
+        self.cpu_threshold = cpu_threshold
+
+        self.max_workers = max(worker_count, 1)
+        self.min_workers = self.max_workers if min_workers is None else min(max(min_workers, 1), self.max_workers)
+        self.idle_timeout = idle_timeout
+        self.size = 0  # workers alive, not counting retired ones
+        self.idle = 0  # workers waiting for a task
+        self.retired: set[TaskWorker] = set()
+        self.new_workers_on_crash = new_workers_on_crash
+        self._spawned = 0
+
+        if reserved is None:
+            reserved = default_reserved_workers(worker_count)
+        self.limits: dict[TaskPriority, int] = {
+            p: max(worker_count - sum(reserved.get(q, 0) for q in TaskPriority if q < p), 1) for p in TaskPriority
+        }
+
         self.parent = parent
         self.workers: dict[TaskWorker, Task | None] = {}
         self.on_spawn: Callable[[TaskWorker], Any] | None = on_spawn
-        for i in range(worker_count):
-            self.spawn_new_worker(readd_on_crash=new_workers_on_crash, name=str(i))
+        for _ in range(self.min_workers):
+            self.spawn_new_worker(readd_on_crash=new_workers_on_crash)
+
+    def append(self, task: Task, front=False, attach=True) -> Task:
+        """
+        Queues `task` behind the others of its class, or ahead of them if `front` is set.
+        Returns the task that will do the work, which differs from `task` if it was coalesced.
+        `attach` may be unset when the listeners of `task` are the same as those of any duplicate.
+        """
+        with self.cond:
+            key = task.key
+            if key is not None and not task.supersedes:
+                for running in self.running.values():
+                    if type(running) is type(task) and running.key == key:
+                        running.join(task, attach)
+                        logging.debug(f"{task} joined its running duplicate")
+                        return running
+
+            if key is not None:
+                queue = self.queues[task.priority]
+                for i, pending in enumerate(queue):
+                    if type(pending) is not type(task) or pending.key != key:
+                        continue
+                    if task.supersedes:
+                        queue[i] = task
+                        self.metrics.discarded(pending)
+                        self.metrics.enqueued(task, len(self))
+                        forward_signals(task, pending)
+                        logging.debug(f"{task} supersedes a queued duplicate")
+                        return task
+                    if attach:
+                        forward_signals(pending, task)
+                    logging.debug(f"{task} coalesced with a queued duplicate")
+                    return pending
+
+            if front:
+                self.queues[task.priority].appendleft(task)
+            else:
+                self.queues[task.priority].append(task)
+            self.metrics.enqueued(task, len(self))
+            self.cond.notify()
+            self._grow()
+        return task
+
+    def _grow(self):
+        # Workers are QObjects parented to the window, so they are only created from the GUI thread
+        if not self.started or self.stopping or threading.current_thread() is not threading.main_thread():
+            return
+        # Woken workers only leave `idle` once they run again, so compare against everything queued
+        if len(self) > self.idle and self.size < self.max_workers and self._runnable():
+            self.spawn_new_worker(start=True, readd_on_crash=self.new_workers_on_crash)
+
+    def remove(self, task: Task):
+        with self.lock:
+            self.queues[task.priority].remove(task)
+            self.metrics.discarded(task)
+
+    def __contains__(self, task: Task) -> bool:
+        with self.lock:
+            return task in self.queues[task.priority]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(q) for q in self.queues.values())
+
+    def __iter__(self) -> Iterator[Task]:
+        with self.lock:
+            return iter([task for p in TaskPriority for task in self.queues[p]])
+
+    def _can_start(self, priority: TaskPriority) -> bool:
+        # Starting a task of this priority takes a worker from every class at least as urgent
+        for p in TaskPriority:
+            if p > priority:
+                break
+            if sum(1 for task in self.running.values() if task.priority >= p) >= self.limits[p]:
+                return False
+        return True
+
+    def _cpu_available(self) -> bool:
+        running = sum(1 for task in self.running.values() if task.resource == TaskResource.CPU)
+        if running == 0:
+            return True
+        if running >= self.cpu.cpu_count:
+            return False
+        utilization = self.cpu.sample()
+        if not self.cpu.sees_workers:
+            # Count every running CPU task as a busy core instead
+            utilization = max(utilization, running / self.cpu.cpu_count)
+        return utilization < self.cpu_threshold
+
+    def _runnable(self) -> Task | None:
+        """Returns the next task allowed to start, without taking it"""
+        cpu_available: bool | None = None
+        for p in TaskPriority:
+            queue = self.queues[p]
+            if not queue or not self._can_start(p):
+                continue
+            for task in queue:
+                if task.resource == TaskResource.CPU:
+                    if cpu_available is None:
+                        cpu_available = self._cpu_available()
+                    if not cpu_available:
+                        continue
+                return task
+        return None
+
+    def _pop_runnable(self, worker: TaskWorker) -> Task | None:
+        task = self._runnable()
+        if task is not None:
+            self.queues[task.priority].remove(task)
+            self.running[worker] = task
+            self.metrics.started(task)
+        return task
+
+    def take(self, worker: TaskWorker, block=True) -> Task | None:
+        """
+        Pops the next task `worker` is allowed to run. If there is none, waits for one
+        when `block` is set, or returns None otherwise. Also returns None once the queue is stopping.
+        """
+        with self.cond:
+            timed_out = False
+            while not self.stopping:
+                task = self._pop_runnable(worker)
+                if task is not None or not block:
+                    return task
+                if timed_out and self.size > self.min_workers:
+                    # Idle for too long, let the thread exit
+                    self.size -= 1
+                    self.retired.add(worker)
+                    return None
+
+                self.idle += 1
+                try:
+                    timed_out = not self.cond.wait(self.idle_timeout if self.size > self.min_workers else None)
+                finally:
+                    self.idle -= 1
+        return None
+
+    def task_done(self, worker: TaskWorker):
+        with self.cond:
+            if self.running.pop(worker, None) is not None:
+                self.cond.notify()
 
     def spawn_new_worker(self, start=False, readd_on_crash=False, name: str | None = None):
+        if name is None:
+            name = str(self._spawned)
+        self._spawned += 1
         w = TaskWorker(queue=self, parent=self.parent)
         if self.on_spawn is not None:
             self.on_spawn(w)
@@ -43,16 +284,24 @@ class TaskQueue(deque[Task]):
             logging.debug(f"{w}: {item!r}")
 
         w.item_changed.connect(update_listener_dct)
-        if readd_on_crash:
 
-            def remake_worker():
-                self.workers.pop(w)
-                self.spawn_new_worker(start, readd_on_crash, name)
+        def remake_worker():
+            self.workers.pop(w, None)
+            self.task_done(w)
+            with self.lock:
+                if w in self.retired:
+                    self.retired.discard(w)
+                    logging.debug(f"Retired idle {w}")
+                    return
+                self.size -= 1
+            if readd_on_crash and not self.stopping:
+                self.spawn_new_worker(self.started, readd_on_crash, name)
 
-            w.finished.connect(remake_worker)
+        w.finished.connect(remake_worker)
 
-        if name is not None:
-            w.setObjectName(name)
+        w.setObjectName(name)
+        with self.lock:
+            self.size += 1
         self.workers[w] = None
         if start:
             w.start()
@@ -67,12 +316,37 @@ class TaskQueue(deque[Task]):
         return {worker: item for worker, item in self.workers.items() if item is not None}
 
     def start(self):
+        self.started = True
         for worker in self.workers:
             worker.start()
 
-    def fullstop(self):
+    def stop(self):
+        """Wakes every idle worker and lets them exit. Running tasks are left to finish"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+
+    def cancel(self, task: Task) -> bool:
+        """Removes `task` if it is still queued, or asks it to stop if it is running. Returns False if it is neither"""
+        with self.cond:
+            if task in self:
+                self.remove(task)
+                return True
+            if task in self.running.values():
+                task.cancel()
+                return True
+        return False
+
+    def fullstop(self, timeout: float = 2.0):
+        self.stop()
+        with self.cond:
+            for task in self.running.values():
+                task.cancel(suspend=True)
+
+        deadline = time.monotonic() + timeout
         for worker, item in list(self.workers.items()):
-            if worker.isRunning():
+            if not worker.wait(max(int((deadline - time.monotonic()) * 1000), 0)):
+                # Last resort for tasks blocked outside of their cancellation points
                 worker.fullstop()
                 logging.debug(f"Stopped {worker} {item}")
 
@@ -88,27 +362,34 @@ class TaskWorker(QThread):
         self.item: Task | None = None
 
     def run(self):
-        empty = False
         while True:
-            try:
-                self.item = self.queue.popleft()
-            except IndexError:
-                if empty:
-                    QThread.msleep(500)
-                else:
-                    self.item_changed.emit(None)
-                    empty = True
-                continue
+            self.item = self.queue.take(self, block=False)
+            if self.item is None:
+                self.item_changed.emit(None)
+                self.item = self.queue.take(self)
+                if self.item is None:  # the queue is stopping
+                    return
 
-            empty = False
             self.item_changed.emit(self.item)
 
             self.item.message.connect(self.send_message)
+            error: Exception | None = None
+            start = time.monotonic()
             try:
+                self.item.check_cancelled()
                 self.item.run()
+            except TaskCancelledError as e:
+                error = e
+                logging.info(f"{self}: cancelled {self.item}")
+                self.item.cancelled.emit()
             except Exception as e:
+                error = e
                 logging.exception(e)
                 self.error.emit(e)
+            finally:
+                self.queue.task_done(self)
+                self.queue.metrics.finished(self.item, error, isinstance(error, TaskCancelledError))
+            self.item.completed.emit(error, time.monotonic() - start)
             self.item.message.disconnect(self.send_message)
 
     @pyqtSlot(str, MessageType)
@@ -121,3 +402,225 @@ class TaskWorker(QThread):
 
     def __repr__(self):
         return f"{self.__class__.__name__}[{self.objectName()}]"
+
+
+@dataclass
+class Stage:
+    """One step of a Pipeline"""
+
+    name: str
+    # Builds the task of this stage from the results of the finished stages. Returning None skips the stage
+    make: Callable[[dict[str, Any]], Task | None]
+    # Name of the task signal carrying the result of the stage, stored under `name`
+    result: str | None = "finished"
+    # Stages that have to be done before this one is started. None means the previous stage
+    after: tuple[str, ...] | None = None
+    # How many times the stage is restarted with a fresh task after a failure
+    retries: int = 0
+    # Builds a task undoing the stage, queued once a later stage fails or the pipeline is cancelled
+    rollback: Callable[[dict[str, Any]], Task | None] | None = None
+    # Schedules the task somewhere else than at the front of its class in the queue
+    submit: Callable[[Task], Any] | None = None
+    # Takes back a task handed to `submit` that is not running yet. Returns True if it did
+    withdraw: Callable[[Task], bool] | None = None
+
+
+class PipelineState(Enum):
+    IDLE = 1
+    RUNNING = 2
+    FINISHED = 3
+    FAILED = 4
+    CANCELLED = 5
+
+
+class Pipeline(QObject):
+    """
+    Runs a DAG of stages as one unit on a TaskQueue.
+
+    Each stage is a regular task, started as soon as the stages it depends on are done. Stages
+    following another one are queued at the front of their priority class, so a started pipeline
+    is not held up by the work queued after it, while the stages of different pipelines still
+    overlap according to their classes. Failed stages are retried, and if a stage ultimately fails,
+    or the pipeline is cancelled, the stages already done are rolled back in reverse order.
+    """
+
+    stage_started = pyqtSignal(str)
+    # name, seconds spent running
+    stage_finished = pyqtSignal(str, float)
+    finished = pyqtSignal(dict)
+    # name of the stage, error
+    failed = pyqtSignal(str, Exception)
+    cancelled = pyqtSignal()
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        stages: list[Stage],
+        name: str = "",
+        parent=None,
+        completed: dict[str, Any] | None = None,
+    ):
+        super().__init__(parent)
+        self.queue = queue
+        self.name = name
+        self.stages: dict[str, Stage] = {}
+        self.dependencies: dict[str, tuple[str, ...]] = {}
+        previous: str | None = None
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage {stage.name!r}")
+            after = stage.after if stage.after is not None else ((previous,) if previous is not None else ())
+            for dep in after:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+            self.stages[stage.name] = stage
+            self.dependencies[stage.name] = after
+            previous = stage.name
+
+        self.state = PipelineState.IDLE
+        self.results: dict[str, Any] = {}
+        self.done: list[str] = []
+        self.running: dict[str, Task] = {}
+        self.attempts: dict[str, int] = {}
+        self.submitted_at: dict[str, float] = {}
+        # name -> (seconds spent waiting, seconds spent running)
+        self.timings: dict[str, tuple[float, float]] = {}
+
+        # Results of the stages already done by an earlier run, these are not run again
+        for name, result in (completed or {}).items():
+            if name not in self.stages:
+                raise ValueError(f"Unknown completed stage {name!r}")
+            self.results[name] = result
+            self.done.append(name)
+
+    def start(self):
+        if self.state != PipelineState.IDLE:
+            return
+        self.state = PipelineState.RUNNING
+        self.started_at = time.monotonic()
+        self._advance()
+
+    def cancel(self):
+        if self.state != PipelineState.RUNNING:
+            return
+        self.state = PipelineState.CANCELLED
+        for name, task in list(self.running.items()):
+            if self._withdraw(self.stages[name], task):
+                del self.running[name]
+            else:
+                task.cancel()
+        self._rollback()
+        self.cancelled.emit()
+
+    def _withdraw(self, stage: Stage, task: Task) -> bool:
+        if stage.withdraw is not None and stage.withdraw(task):
+            return True
+        with self.queue.lock:
+            if task in self.queue:
+                self.queue.remove(task)
+                return True
+        return False
+
+    def _advance(self):
+        if self.state != PipelineState.RUNNING:
+            return
+
+        if len(self.done) == len(self.stages):
+            self.state = PipelineState.FINISHED
+            total = time.monotonic() - self.started_at
+            summary = ", ".join(f"{name} {waited:.2f}s+{ran:.2f}s" for name, (waited, ran) in self.timings.items())
+            logging.debug(f"Pipeline {self.name} finished in {total:.2f}s (waited+ran: {summary})")
+            self.finished.emit(self.results)
+            return
+
+        for name, stage in self.stages.items():
+            if self.state != PipelineState.RUNNING:
+                return
+            if name in self.done or name in self.running:
+                continue
+            if all(dep in self.done for dep in self.dependencies[name]):
+                self._submit(stage)
+
+    def _submit(self, stage: Stage):
+        try:
+            task = stage.make(self.results)
+        except Exception as e:
+            logging.exception(e)
+            self._fail(stage, e)
+            return
+
+        if task is None:
+            self.results[stage.name] = None
+            self.done.append(stage.name)
+            self._advance()
+            return
+
+        if stage.result is not None:
+            getattr(task, stage.result).connect(lambda value, name=stage.name: self.results.__setitem__(name, value))
+        task.completed.connect(
+            lambda error, seconds, stage=stage, task=task: self._completed(stage, task, error, seconds)
+        )
+
+        self.running[stage.name] = task
+        self.submitted_at[stage.name] = time.monotonic()
+        self.stage_started.emit(stage.name)
+        if stage.submit is not None:
+            stage.submit(task)
+        else:
+            self.queue.append(task, front=bool(self.dependencies[stage.name]))
+
+    def _completed(self, stage: Stage, task: Task, error: Exception | None, seconds: float):
+        if self.running.get(stage.name) is not task:
+            return
+        del self.running[stage.name]
+
+        if self.state != PipelineState.RUNNING:
+            # Finished while the pipeline was being torn down, undo it on its own
+            if error is None:
+                self._rollback_stage(stage)
+            return
+
+        if error is None:
+            waited = time.monotonic() - self.submitted_at[stage.name] - seconds
+            self.timings[stage.name] = (max(waited, 0.0), seconds)
+            self.done.append(stage.name)
+            self.stage_finished.emit(stage.name, seconds)
+            self._advance()
+        elif isinstance(error, TaskCancelledError):
+            if task.is_suspended:
+                # The launcher is quitting, leave everything in place to be resumed
+                return
+            self.cancel()
+        elif self.attempts.get(stage.name, 0) < stage.retries:
+            self.attempts[stage.name] = self.attempts.get(stage.name, 0) + 1
+            logging.warning(f"Pipeline {self.name}: retrying {stage.name} after {error!r}")
+            self._submit(stage)
+        else:
+            self._fail(stage, error)
+
+    def _fail(self, stage: Stage, error: Exception):
+        self.state = PipelineState.FAILED
+        for name, task in list(self.running.items()):
+            if self._withdraw(self.stages[name], task):
+                del self.running[name]
+            else:
+                task.cancel()
+        self._rollback()
+        self.failed.emit(stage.name, error)
+
+    def _rollback(self):
+        for name in reversed(self.done):
+            self._rollback_stage(self.stages[name])
+        self.done.clear()
+
+    def _rollback_stage(self, stage: Stage):
+        if stage.rollback is None:
+            return
+        try:
+            task = stage.rollback(self.results)
+        except Exception as e:
+            logging.exception(e)
+            return
+        if task is not None:
+            logging.debug(f"Pipeline {self.name}: rolling back {stage.name}")
+            self.queue.append(task)
@@ -3,8 +3,10 @@ from __future__ import annotations
 import contextlib
 import datetime
 import re
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from functools import cache
+from itertools import chain
 from operator import attrgetter
 from typing import TYPE_CHECKING
 
@@ -60,7 +62,16 @@ class BasicBuildInfo:
 # -   | match the smallest/oldest item in that column
 # <n> | match an item in that column
 
-VERSION_SEARCH_SYNTAX = "<major_num>.<minor>.<patch>[-<branch>][+<build_hash>][@<commit time>]"
+# A query can end with bounds in brackets, separated by commas. They narrow the builds down before anything else:
+# <op><version>         | compare major.minor.patch, missing parts are 0 (>=4.1 is >=4.1.0)
+# @<op><time>           | compare the commit time with an isoformat date or time (UTC if it has no offset)
+# @<op>now-<n><unit>    | compare the commit time with some minutes (m), hours (h), days (d) or weeks (w) ago
+# where <op> is one of <, <=, >, >=
+
+VERSION_SEARCH_SYNTAX = (
+    "<major_num>.<minor>.<patch>[-<branch>][+<build_hash>][@<commit time>][[<bound>,...]]"
+    " where a bound is <op><version>, @<op><time> or @<op>now-<n>(m|h|d|w), and <op> is <, <=, > or >="
+)
 
 # Valid examples of version search queries are:
 # *.*.*
@@ -68,15 +79,18 @@ VERSION_SEARCH_SYNTAX = "<major_num>.<minor>.<patch>[-<branch>][+<build_hash>][@
 # 4.^.^-stable@^
 # 4.3.^+cb886aba06d5@^
 # 4.3.^@2024-07-31T23:53:51+00:00
+# 4.^.^[>=4.1,<4.3]
+# *.*.*-daily@*[@>=now-7d]
 # And of course, a full example:
 # 4.3.^-stable+cb886aba06d5@2024-07-31T23:53:51+00:00
 
 VERSION_SEARCH_REGEX = re.compile(
     r"""^
     ([\^\-\*]|\d+)\.([\^\-\*]|\d+)\.([\^\-\*]|\d+)
-    (?:\-([^\@\s\+]+))?
+    (?:\-([^\@\s\+\[]+))?
     (?:\+([\d\w]+))?
     (?:\@([\^\-\*]|[\dT\+\:Z\ \^\-]+))?
+    (?:\[([^\]]*)\])?
     $""",
     flags=re.X,
 )
@@ -84,9 +98,10 @@ VERSION_SEARCH_REGEX = re.compile(
 # Regex breakdown:
 # ^                                     -- start of string
 # ([\^\-\*]|\d+)                     x3 -- major, minor, and patch (required)
-# (?:\-([^\@\s\+]+))?                   -- branch (optional)
+# (?:\-([^\@\s\+\[]+))?                 -- branch (optional)
 # (?:\+([\d\w]+))?                      -- build hash (optional)
 # (?:\@([\dT\+\:Z\ \^\*\-]+))?            -- commit time (saved as ^|*|- or an isoformat) (optional)
+# (?:\[([^\]]*)\])?                      -- bounds (optional)
 # $                                     -- end of string
 
 
@@ -96,18 +111,92 @@ VALID_QUERIES = """^.^.*
 ^.*.*
 -.*.^
 4.2.^
-4.^.^"""
+4.^.^
+4.^.^[>=4.1,<4.3]"""
 VALID_FULL_QUERIES = """*.*.*
 1.2.3-master
 4.^,^-stable@^
 4.3.^+cb886aba06d5@^
 4.3.^@2024-07-31T23:53:51+00:00
 4.3.^-stable+cb886aba06d5@2024-07-31T23:53:51+00:00
+4.^.^[>=4.1,<4.3]
+*.*.*-daily@*[@>=now-7d]
 """
 
+BOUND_REGEX = re.compile(r"^(@?)(<=|>=|<|>)(.+)$")
+BOUND_VERSION_REGEX = re.compile(r"^(\d+)(?:\.(\d+))?(?:\.(\d+))?$")
+BOUND_RELATIVE_TIME_REGEX = re.compile(r"^now-(\d+)([mhdw])$")
+TIME_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+@dataclass(frozen=True)
+class QueryBound:
+    """Keeps the builds whose version, or commit time, compares to `value` with `op`"""
+
+    place: str
+    "Either version or commit_time"
+
+    op: str
+    "One of <, <=, >, >="
+
+    value: tuple[int, int, int] | datetime.datetime | datetime.timedelta
+    "A (major, minor, patch) version, a commit time, or how long before now a commit time is"
+
+    @classmethod
+    def parse(cls, s: str):
+        match = BOUND_REGEX.match(s.strip())
+        if not match:
+            raise ValueError(f"Invalid bound: {s}")
+        at, op, value = match.groups()
+        value = value.strip()
+
+        if not at:
+            version = BOUND_VERSION_REGEX.match(value)
+            if not version:
+                raise ValueError(f"Invalid version in bound: {s}")
+            major, minor, patch = (int(n) if n is not None else 0 for n in version.groups())
+            return cls("version", op, (major, minor, patch))
+
+        if relative := BOUND_RELATIVE_TIME_REGEX.match(value):
+            amount, unit = relative.groups()
+            return cls("commit_time", op, datetime.timedelta(**{TIME_UNITS[unit]: int(amount)}))
+
+        try:
+            time = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid time in bound: {s}") from None
+        if time.tzinfo is None:
+            time = time.replace(tzinfo=utc)
+        return cls("commit_time", op, time)
+
+    def resolve(self) -> tuple[int, int, int] | datetime.datetime:
+        """The value builds are compared to, relative times are taken from now"""
+        if isinstance(self.value, datetime.timedelta):
+            return datetime.datetime.now(tz=utc) - self.value
+        return self.value
+
+    def __str__(self) -> str:
+        if self.place == "version":
+            return f"{self.op}{'.'.join(map(str, self.value))}"
+        if isinstance(self.value, datetime.timedelta):
+            seconds = int(self.value.total_seconds())
+            for unit, length in (("w", 604800), ("d", 86400), ("h", 3600)):
+                if seconds % length == 0:
+                    return f"@{self.op}now-{seconds // length}{unit}"
+            return f"@{self.op}now-{seconds // 60}m"
+        return f"@{self.op}{self.value.isoformat()}"
+
+
+def parse_bounds(s: str | None) -> tuple[QueryBound, ...]:
+    if not s or not s.strip():
+        return ()
+    return tuple(QueryBound.parse(bound) for bound in s.split(","))
+
 
 @cache
-def _parse(s: str) -> tuple[int | str, int | str, int | str, str | None, str | None, datetime.datetime | str]:
+def _parse(
+    s: str,
+) -> tuple[int | str, int | str, int | str, str | None, str | None, datetime.datetime | str, tuple[QueryBound, ...]]:
     """Parse a query from a string. does not support branch and commit_time"""
     match = VERSION_SEARCH_REGEX.match(s)
     if not match:
@@ -119,6 +208,7 @@ def _parse(s: str) -> tuple[int | str, int | str, int | str, str | None, str | N
     branch = match.group(4)
     build_hash = match.group(5)
     commit_time = match.group(6)
+    bounds = parse_bounds(match.group(7))
     if commit_time is None:
         commit_time = "^"
 
@@ -134,7 +224,7 @@ def _parse(s: str) -> tuple[int | str, int | str, int | str, str | None, str | N
         with contextlib.suppress(ValueError):
             commit_time = datetime.datetime.fromisoformat(commit_time)
 
-    return major, minor, patch, branch, build_hash, commit_time
+    return major, minor, patch, branch, build_hash, commit_time, bounds
 
 
 @dataclass(frozen=True)
@@ -159,6 +249,9 @@ class VersionSearchQuery:
     commit_time: datetime.datetime | str = "^"
     "When the build was made (in UTC)"
 
+    bounds: tuple[QueryBound, ...] = ()
+    "Ranges of versions and commit times the builds are narrowed down to first"
+
     def __post_init__(self):
         for pos in (self.major, self.minor, self.patch, self.commit_time):
             if isinstance(pos, str) and pos not in ["^", "*", "-"]:
@@ -187,8 +280,19 @@ class VersionSearchQuery:
             s += f"+{self.build_hash}"
         if self.commit_time:
             s += f"@{self.commit_time}"
+        s += self.bounds_str()
         return s
 
+    @property
+    def is_relative(self) -> bool:
+        """Whether a bound is relative to now"""
+        return any(isinstance(bound.value, datetime.timedelta) for bound in self.bounds)
+
+    def bounds_str(self) -> str:
+        if not self.bounds:
+            return ""
+        return f"[{','.join(map(str, self.bounds))}]"
+
     def with_branch(self, branch: str | None = None):
         return self.__class__(
             major=self.major,
@@ -197,6 +301,7 @@ class VersionSearchQuery:
             branch=branch,
             build_hash=self.build_hash,
             commit_time=self.commit_time,
+            bounds=self.bounds,
         )
 
     def with_build_hash(self, build_hash: str | None = None):
@@ -207,6 +312,7 @@ class VersionSearchQuery:
             branch=self.branch,
             build_hash=build_hash,
             commit_time=self.commit_time,
+            bounds=self.bounds,
         )
 
     def with_commit_time(self, commit_time: datetime.datetime | str):
@@ -217,6 +323,7 @@ class VersionSearchQuery:
             branch=self.branch,
             build_hash=self.build_hash,
             commit_time=commit_time,
+            bounds=self.bounds,
         )
 
 
@@ -226,35 +333,181 @@ class VersionSearchQuery:
 # VersionSearchQuery("^", "*", "*"): Match any version in the latest major release
 
 
+# The components of a query, in the order they narrow down the builds
+MATCH_ORDER = ("build_hash", "major", "minor", "patch", "branch", "commit_time")
+
+
+def match_linearly(
+    versions: Sequence[BasicBuildInfo], s: VersionSearchQuery, places: Sequence[str] = MATCH_ORDER
+) -> tuple[BasicBuildInfo, ...]:
+    """Narrows `versions` down with one pass over them for every component of `s` in `places`"""
+    for place in places:
+        getter = attrgetter(place)
+        p: str | int | datetime.datetime | None = getter(s)
+        if p == "^":
+            # get the max number for `place` in version
+            max_p = max(getter(v) for v in versions)
+
+            versions = [v for v in versions if getter(v) == max_p]
+        elif p == "*" or p is None:
+            continue  # all versions match
+        elif p == "-":
+            # get the min number for `place` in version
+            min_p = min(getter(v) for v in versions)
+
+            versions = [v for v in versions if getter(v) == min_p]
+        else:
+            versions = [v for v in versions if getter(v) == p]
+
+        if not versions:
+            return ()
+
+    return tuple(versions)
+
+
+@dataclass
+class _Bucket:
+    """The builds sharing the components above it, by their next component"""
+
+    # component -> _Bucket, or the positions of the builds in the last level
+    children: dict = field(default_factory=dict)
+    # the components of `children`, sorted
+    keys: list = field(default_factory=list)
+    # positions in `versions` of every build under the bucket, in order
+    positions: list[int] = field(default_factory=list)
+
+    def finalize(self):
+        self.keys = sorted(self.children)
+        for child in self.children.values():
+            if isinstance(child, _Bucket):
+                child.finalize()
+
+
 @dataclass(frozen=True)
 class BInfoMatcher:
+    """
+    Matches queries against an index of `versions` built once: nested buckets going
+    major -> minor -> patch -> branch -> commit_time with their components sorted, and the builds by hash.
+
+    A component of a query picks buckets of the level it belongs to, with dict lookups, or the first or
+    last of the sorted components for "-" and "^". Like matching linearly, "^" and "-" pick the largest
+    and smallest component among all builds left at that point. Matches keep the order of `versions`.
+    """
+
     versions: tuple[BasicBuildInfo, ...]
+    _tree: _Bucket = field(init=False, repr=False, compare=False)
+    _by_hash: dict[str, list[int]] = field(init=False, repr=False, compare=False)
+    # place of a bound -> (sorted components, positions of the builds in that order), made on first use
+    _ordered: dict[str, tuple[list, list[int]]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        tree = _Bucket()
+        by_hash: dict[str, list[int]] = {}
+        for i, v in enumerate(self.versions):
+            bucket = tree
+            for key in (v.major, v.minor, v.patch, v.branch):
+                child = bucket.children.get(key)
+                if child is None:
+                    child = bucket.children[key] = _Bucket()
+                child.positions.append(i)
+                bucket = child
+            bucket.children.setdefault(v.commit_time, []).append(i)
+            by_hash.setdefault(v.build_hash, []).append(i)
+        tree.finalize()
+
+        object.__setattr__(self, "_tree", tree)
+        object.__setattr__(self, "_by_hash", by_hash)
+        object.__setattr__(self, "_ordered", {})
+
+    def _order(self, place: str) -> tuple[list, list[int]]:
+        ordered = self._ordered.get(place)
+        if ordered is None:
+            if place == "version":
+                keys = [(v.major, v.minor, v.patch) for v in self.versions]
+            else:
+                keys = [v.commit_time for v in self.versions]
+            positions = sorted(range(len(keys)), key=keys.__getitem__)
+            ordered = self._ordered[place] = ([keys[i] for i in positions], positions)
+        return ordered
+
+    def bounded(self, bounds: Sequence[QueryBound]) -> list[int]:
+        """The positions of the builds within every bound, in order"""
+        allowed: set[int] | None = None
+        for place in {bound.place for bound in bounds}:
+            keys, positions = self._order(place)
+            lo, hi = 0, len(keys)
+            for bound in bounds:
+                if bound.place != place:
+                    continue
+                value = bound.resolve()
+                if bound.op == ">=":
+                    lo = max(lo, bisect_left(keys, value))
+                elif bound.op == ">":
+                    lo = max(lo, bisect_right(keys, value))
+                elif bound.op == "<=":
+                    hi = min(hi, bisect_right(keys, value))
+                elif bound.op == "<":
+                    hi = min(hi, bisect_left(keys, value))
+
+            if lo >= hi:
+                return []
+            if (lo, hi) != (0, len(keys)):
+                within = set(positions[lo:hi])
+                allowed = within if allowed is None else allowed & within
+
+        if allowed is None:
+            return list(range(len(self.versions)))
+        return sorted(allowed)
 
     def match(self, s: VersionSearchQuery) -> tuple[BasicBuildInfo, ...]:
-        versions = self.versions
+        if not self.versions:
+            return ()
 
-        for place in ("build_hash", "major", "minor", "patch", "branch", "commit_time"):
-            getter = attrgetter(place)
-            p: str | int | datetime.datetime | None = getter(s)
-            if p == "^":
-                # get the max number for `place` in version
-                max_p = max(getter(v) for v in versions)
+        if s.bounds:
+            # The bounds come first, the rest of the query picks among the builds within them
+            positions = self.bounded(s.bounds)
+            if not positions:
+                return ()
+            return match_linearly([self.versions[i] for i in positions], s)
 
-                versions = [v for v in versions if getter(v) == max_p]
+        if s.build_hash is not None and s.build_hash != "*":
+            # Few builds share a hash, the rest is narrowed down among them
+            if s.build_hash in ("^", "-"):
+                hashes = sorted(self._by_hash)
+                positions = self._by_hash[hashes[-1] if s.build_hash == "^" else hashes[0]]
+            else:
+                positions = self._by_hash.get(s.build_hash, [])
+            if not positions:
+                return ()
+            return match_linearly([self.versions[i] for i in positions], s, MATCH_ORDER[1:])
+
+        components = [getattr(s, place) for place in MATCH_ORDER[1:]]
+        # Past the last component that narrows anything down, all builds under the buckets match
+        narrowing = [i for i, p in enumerate(components) if p != "*" and p is not None]
+        if not narrowing:
+            return self.versions
+
+        buckets: list = [self._tree]
+        for p in components[: narrowing[-1] + 1]:
+            if p == "^":
+                key = max(bucket.keys[-1] for bucket in buckets)
+                buckets = [bucket.children[key] for bucket in buckets if key in bucket.children]
             elif p == "*" or p is None:
-                continue  # all versions match
+                buckets = [child for bucket in buckets for child in bucket.children.values()]
             elif p == "-":
-                # get the min number for `place` in version
-                min_p = min(getter(v) for v in versions)
-
-                versions = [v for v in versions if getter(v) == min_p]
+                key = min(bucket.keys[0] for bucket in buckets)
+                buckets = [bucket.children[key] for bucket in buckets if key in bucket.children]
             else:
-                versions = [v for v in versions if getter(v) == p]
+                buckets = [bucket.children[p] for bucket in buckets if p in bucket.children]
 
-            if not versions:
+            if not buckets:
                 return ()
 
-        return tuple(versions)
+        # The last level holds the positions of the builds
+        positions = [bucket if isinstance(bucket, list) else bucket.positions for bucket in buckets]
+        if len(positions) == 1:
+            return tuple(self.versions[i] for i in positions[0])
+        return tuple(self.versions[i] for i in sorted(chain.from_iterable(positions)))
 
 
 if __name__ == "__main__":  # Test BInfoMatcher
@@ -274,7 +527,7 @@ if __name__ == "__main__":  # Test BInfoMatcher
 
     def test_binfo_matcher():
         # find the latest minor builds with any patch number
-        results = matcher.match(VersionSearchQuery("^", "^", "*"))
+        results = matcher.match(VersionSearchQuery("^", "^", "*", commit_time="*"))
         assert results == (
             BasicBuildInfo(Version.parse("4.3.0"), "daily", "", datetime.datetime(2024, 7, 30, tzinfo=utc)),
             BasicBuildInfo(Version.parse("4.3.0"), "daily", "", datetime.datetime(2024, 7, 28, tzinfo=utc)),
@@ -319,6 +572,8 @@ if __name__ == "__main__":  # Test BInfoMatcher
             VersionSearchQuery(4, 0, 0),
             VersionSearchQuery(4, "*", "*"),
             VersionSearchQuery("^", "^", "*", branch="stable", commit_time=datetime.datetime(2020, 5, 4, tzinfo=utc)),
+            VersionSearchQuery.parse("^.^.^[>=1.2.2,<4]"),
+            VersionSearchQuery.parse("*.*.*-daily@*[@>=2024-07-01,@<now-1w]"),
         ):
             result_before_serialization = matcher.match(query)
 
@@ -347,15 +602,108 @@ if __name__ == "__main__":  # Test BInfoMatcher
         assert VersionSearchQuery.parse("*.*.*@2024-07-31 23:53:51+00:00") == VersionSearchQuery(
             "*", "*", "*", commit_time=datetime.datetime(2024, 7, 31, 23, 53, 51, tzinfo=utc)
         )
+        assert VersionSearchQuery.parse("4.^.^[>=4.1,<4.3]") == VersionSearchQuery(
+            4, "^", "^", bounds=(QueryBound("version", ">=", (4, 1, 0)), QueryBound("version", "<", (4, 3, 0)))
+        )
+        assert VersionSearchQuery.parse("*.*.*-daily@*[@>=now-7d]") == VersionSearchQuery(
+            "*",
+            "*",
+            "*",
+            branch="daily",
+            commit_time="*",
+            bounds=(QueryBound("commit_time", ">=", datetime.timedelta(days=7)),),
+        )
+        assert str(VersionSearchQuery.parse("*.*.*[@>now-36h,<=2]")) == "*.*.*@^[@>now-36h,<=2.0.0]"
+
         # Test parsing of search query strings that are not valid
-        try:
-            VersionSearchQuery.parse("abc")
-            raise AssertionError("Expected ValueError to be raised")
-        except ValueError:
-            pass
+        def is_valid(s: str) -> bool:
+            try:
+                VersionSearchQuery.parse(s)
+            except ValueError:
+                return False
+            return True
+
+        for invalid in ("abc", "4.^.^[=4.1]", "4.^.^[>=4.x]", "4.^.^[@<yesterday]"):
+            assert not is_valid(invalid), f"Expected ValueError to be raised for {invalid!r}"
 
         print("test_search_query_parser successful!")
 
+    def test_bounds():
+        # the newest 1.x at or above 1.2.2, but below 1.2.4
+        results = matcher.match(VersionSearchQuery.parse("1.^.^[>=1.2.2,<1.2.4]"))
+        assert results == (
+            BasicBuildInfo(Version.parse("1.2.3"), "stable", "", datetime.datetime(2020, 5, 4, tzinfo=utc)),
+        )
+
+        # daily builds committed in July 2024
+        results = matcher.match(VersionSearchQuery.parse("*.*.*-daily@*[@>=2024-07-01,@<2024-08-01]"))
+        assert results == (
+            BasicBuildInfo(Version.parse("4.3.0"), "daily", "", datetime.datetime(2024, 7, 30, tzinfo=utc)),
+            BasicBuildInfo(Version.parse("4.3.0"), "daily", "", datetime.datetime(2024, 7, 28, tzinfo=utc)),
+            BasicBuildInfo(Version.parse("4.3.1"), "daily", "", datetime.datetime(2024, 7, 20, tzinfo=utc)),
+        )
+
+        # nothing was built in the last week
+        assert matcher.match(VersionSearchQuery.parse("*.*.*@*[@>=now-7d]")) == ()
+
+        # the bounds narrow the builds down before ^ picks the newest
+        results = matcher.match(VersionSearchQuery.parse("^.^.^[<4]"))
+        assert results == (
+            BasicBuildInfo(Version.parse("3.6.14"), "lts", "", datetime.datetime(2024, 7, 16, tzinfo=utc)),
+        )
+
+        print("test_bounds successful!")
+
+    def benchmark_binfo_matcher():
+        # Compares the index against matching linearly over synthetic build sets
+        import random
+        import timeit
+
+        rng = random.Random(49)
+        start = datetime.datetime(2018, 1, 1, tzinfo=utc)
+        queries = (
+            VersionSearchQuery("^", "^", "^"),
+            VersionSearchQuery("^", "^", "*", commit_time="*"),
+            VersionSearchQuery(4, "*", "*", branch="daily"),
+            VersionSearchQuery(4, 2, "^", commit_time="-"),
+            VersionSearchQuery("-", "*", "^"),
+            VersionSearchQuery("*", "*", "*", commit_time="*"),
+            VersionSearchQuery("*", "*", "*", build_hash="0000002a"),
+        )
+
+        for size in (10, 1_000, 100_000):
+            versions = tuple(
+                BasicBuildInfo(
+                    Version(rng.randint(2, 5), rng.randint(0, 9), rng.randint(0, 20)),
+                    rng.choice(("stable", "lts", "daily", "experimental", "patch")),
+                    f"{rng.randrange(size):08x}",
+                    start + datetime.timedelta(minutes=rng.randrange(3_000_000)),
+                )
+                for _ in range(size)
+            )
+            build_time = timeit.timeit(lambda versions=versions: BInfoMatcher(versions), number=1)
+            matcher = BInfoMatcher(versions)
+            print(f"{size} builds, index built in {build_time * 1000:.2f}ms")
+
+            for query in queries:
+                assert matcher.match(query) == match_linearly(versions, query)
+                number = max(1, 10_000 // size)
+                linear = (
+                    timeit.timeit(lambda q=query, versions=versions: match_linearly(versions, q), number=number)
+                    / number
+                )
+                indexed = timeit.timeit(lambda q=query, matcher=matcher: matcher.match(q), number=number) / number
+                print(
+                    f"  {query!s:<28} linear {linear * 1000:9.3f}ms  indexed {indexed * 1000:9.3f}ms"
+                    f"  ({linear / indexed:.1f}x)"
+                )
+
     test_binfo_matcher()
     test_vsq_serialization()
     test_search_query_parser()
+    test_bounds()
+    import sys
+
+    # Builds an index of 100k builds, so only on request
+    if "--benchmark" in sys.argv:
+        benchmark_binfo_matcher()
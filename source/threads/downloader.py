@@ -1,44 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import io
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from modules._copyfileobj import copyfileobj
-from modules.connection_manager import REQUEST_MANAGER
+from modules.archive_cache import link_or_copy, unshare
 from modules.enums import MessageType
+from modules.progress import ProgressReporter
 from modules.settings import get_library_folder
-from modules.task import Task
+from modules.task import Task, TaskCancelledError, TaskPriority
 from PyQt5.QtCore import pyqtSignal
 from urllib3.exceptions import MaxRetryError
 
+if TYPE_CHECKING:
+    from modules.archive_cache import ArchiveCache, ArchiveMirror
+    from modules.connection_manager import REQUEST_MANAGER
+    from modules.download_governor import DownloadGovernor
+
+
+class ChecksumMismatchError(Exception):
+    def __init__(self, file: Path, expected: str, actual: str):
+        super().__init__(f"Checksum mismatch for {file.name}: expected {expected}, got {actual}")
+        self.file = file
+        self.expected = expected
+        self.actual = actual
+
 
 @dataclass(frozen=True)
 class DownloadTask(Task):
+    priority = TaskPriority.BULK_IO
     manager: REQUEST_MANAGER
     link: str
+    # Expected sha256 hex digest of the file, verification is skipped if None
+    checksum: str | None = None
+    # Bandwidth limiting is skipped if None
+    governor: DownloadGovernor | None = field(default=None, compare=False)
+    # Checked before going upstream, and filled with what is downloaded
+    cache: ArchiveCache | None = field(default=None, compare=False)
+    mirror: ArchiveMirror | None = field(default=None, compare=False)
+    # Continue a partial archive left in .temp by an interrupted install, instead of starting over
+    resume: bool = False
+    started = pyqtSignal()
     progress = pyqtSignal(int, int)
+    rate = pyqtSignal(float, float)  # bytes per second, seconds left
     finished = pyqtSignal(Path)
+    failure = pyqtSignal(Exception)
 
     def run(self):
+        self.started.emit()
         self.progress.emit(0, 0)
         temp_folder = Path(get_library_folder()) / ".temp"
         temp_folder.mkdir(exist_ok=True)
-        dist = temp_folder / Path(self.link).name
+        name = Path(self.link).name
+        dist = temp_folder / name
 
         try:
-            with self.manager.request("GET", self.link, preload_content=False, timeout=10) as r:
-                self._download(r, dist)
-        except MaxRetryError as e:
-            logging.error(e)
-            self.message.emit("Requesting is taking longer than usual! see debug logs for more.", MessageType.ERROR)
-            with self.manager.request("GET", self.link, preload_content=False) as r:
-                self._download(r, dist)
+            self._run(name, dist)
+        except TaskCancelledError:
+            # Never leave a partial archive behind for the cache or the extractor to pick up,
+            # unless the launcher is quitting and the install is going to be resumed
+            if not self.is_suspended:
+                dist.unlink(missing_ok=True)
+            raise
+
+    def _run(self, name: str, dist: Path):
+        if self.cache is not None and (cached := self.cache.lookup(name, self.checksum)) is not None:
+            logging.info(f"Using cached archive {cached} for {name}")
+            link_or_copy(cached, dist)
+            size = dist.stat().st_size
+            self.progress.emit(size, size)
+            self.finished.emit(dist)
+            return
+
+        fetched, digest = False, None
+        if self.mirror is not None:
+            fetched, digest = self._fetch_from_mirror(self.mirror, name, dist)
+            if fetched and self.checksum is not None and digest != self.checksum.lower():
+                logging.warning(f"Mirror copy of {name} does not match its checksum, downloading it again")
+                fetched = False
+
+        if not fetched:
+            offset = dist.stat().st_size if self.resume and dist.is_file() else 0
+            headers = None
+            if offset:
+                logging.info(f"Resuming download of {name} at {offset} bytes")
+                # Passing headers replaces the defaults of the manager, so keep them
+                headers = {**self.manager.headers, "Range": f"bytes={offset}-"}
+            try:
+                with self.manager.request("GET", self.link, headers=headers, preload_content=False, timeout=10) as r:
+                    digest = self._download(r, dist, offset)
+            except MaxRetryError as e:
+                logging.error(e)
+                self.message.emit("Requesting is taking longer than usual! see debug logs for more.", MessageType.ERROR)
+                with self.manager.request("GET", self.link, headers=headers, preload_content=False) as r:
+                    digest = self._download(r, dist, offset)
+
+        if self.checksum is not None and digest != self.checksum.lower():
+            assert digest is not None
+            dist.unlink(missing_ok=True)
+            e = ChecksumMismatchError(dist, self.checksum, digest)
+            self.failure.emit(e)
+            raise e
+
+        if self.cache is not None and digest is not None:
+            self.cache.store(dist, name, digest)
+        if not fetched and self.mirror is not None:
+            self.mirror.publish(dist, name)
 
         self.finished.emit(dist)
 
-    def _download(self, r, dist: Path):
+    def _fetch_from_mirror(self, mirror: ArchiveMirror, name: str, dist: Path) -> tuple[bool, str | None]:
+        if mirror.is_http:
+            r = mirror.request(self.manager, name)
+            if r is None:
+                return False, None
+            with r:
+                return True, self._download(r, dist)
+
+        src = mirror.find(name)
+        if src is None:
+            return False, None
+        logging.info(f"Copying {name} from mirror {mirror.location}")
+        with src.open("rb") as f:
+            return True, self._copy(f, dist, src.stat().st_size, throttled=False)
+
+    def _download(self, r, dist: Path, offset: int = 0) -> str | None:
+        if offset and r.status == 416:
+            # The partial archive was already complete
+            return self._copy(io.BytesIO(), dist, offset, offset=offset)
         size = int(r.headers["Content-Length"])
-        with dist.open("wb") as f:
-            copyfileobj(r, f, lambda x: self.progress.emit(x, size))
+        if offset and r.status == 206:
+            return self._copy(r, dist, offset + size, offset=offset)
+        # The server ignored the range, start over
+        return self._copy(r, dist, size)
+
+    def _copy(self, fsrc, dist: Path, size: int, throttled=True, offset: int = 0) -> str | None:
+        # The archive may be hardlinked to the cache, writing to it in place would change the cached one too
+        if offset:
+            unshare(dist)
+        else:
+            dist.unlink(missing_ok=True)
+        reporter = ProgressReporter(self.progress.emit, self.rate.emit)
+        # Hash the stream while it is written, so verifying needs no second pass over the archive
+        hasher = hashlib.sha256() if self.checksum is not None or self.cache is not None else None
+        if hasher is not None and offset:
+            with dist.open("rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    hasher.update(chunk)
+        last = 0
+
+        def callback(copied: int):
+            nonlocal last
+            self.check_cancelled()
+            if throttled and self.governor is not None:
+                self.governor.throttle(self, copied - last)
+                last = copied
+            reporter(offset + copied, size)
+
+        with dist.open("ab" if offset else "wb") as f:
+            copyfileobj(fsrc, f, callback, hasher=hasher)
+        reporter.flush()
+        self.report_bytes(dist.stat().st_size - offset)
+        return hasher.hexdigest() if hasher is not None else None
 
     def __str__(self):
         return f"Download {self.link}"
@@ -1,74 +1,101 @@
-import tarfile
-import zipfile
-from collections.abc import Callable
+from __future__ import annotations
+
 from dataclasses import dataclass
 from pathlib import Path
-
-from modules._platform import _check_call
-from modules.task import Task
+from shutil import rmtree
+from typing import TYPE_CHECKING
+
+from modules.decompression import (
+    archive_root_folder,
+    candidate_backends,
+    decompress,
+    record_extraction,
+    run_backends,
+)
+from modules.process_pool import get_process_pool
+from modules.progress import ProgressReporter
+from modules.task import Task, TaskCancelledError, TaskPriority, TaskResource
 from PyQt5.QtCore import pyqtSignal
 
-
-def extract(source: Path, destination: Path, progress_callback: Callable[[int, int], None]):
-    progress_callback(0, 0)
-    suffixes = source.suffixes
-    if suffixes[-1] == ".zip":
-        with zipfile.ZipFile(source) as zf:
-            infolist = zf.infolist()
-            folder = infolist[0].filename.split("/")[0]
-            uncompress_size = sum(member.file_size for member in infolist)
-            progress_callback(0, uncompress_size)
-            extracted_size = 0
-
-            for member in infolist:
-                zf.extract(member, destination)
-                extracted_size += member.file_size
-                progress_callback(extracted_size, uncompress_size)
-        return destination / folder
-
-    if suffixes[-2] == ".tar":
-        with tarfile.open(source) as tar:
-            folder = tar.getnames()[0].split("/")[0]
-            members = tar.getmembers()
-            uncompress_size = sum(member.size for member in members)
-            progress_callback(0, uncompress_size)
-            extracted_size = 0
-
-            for member in members:
-                tar.extract(member, path=destination)
-                extracted_size += member.size
-                progress_callback(extracted_size, uncompress_size)
-        return destination / folder
-
-    if suffixes[-1] == ".dmg":
-        _check_call(["hdiutil", "mount", source.as_posix()])
-        dist = destination / source.stem
-
-        if not dist.is_dir():
-            dist.mkdir()
-
-        if "bforartists" in source.stem.lower():
-            app_name = "Bforartists"
-        else:
-            app_name = "Blender"
-
-        _check_call(["cp", "-R", f"/Volumes/{app_name}", dist.as_posix()])
-        _check_call(["hdiutil", "unmount", f"/Volumes/{app_name}"])
-
-        return dist
-    return None
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def extract(
+    source: Path,
+    destination: Path,
+    progress_callback: Callable[[int, int], None],
+    backend: str | None = None,
+    in_process: bool = False,
+    check: Callable[[], None] | None = None,
+):
+    if not in_process:
+        return decompress(source, destination, progress_callback, backend=backend)
+
+    # The pool processes have their own copy of the stats, so pick the backend and record its speed here
+    if backend is None:
+        backend = next((b.name for b in candidate_backends(source)), None)
+    result, name, seconds, failed = get_process_pool().run(
+        run_backends,
+        source,
+        destination,
+        backend,
+        progress_callback=progress_callback,
+        check=check,
+    )
+    record_extraction(source, name, seconds, failed)
+    return result
 
 
 @dataclass(frozen=True)
 class ExtractTask(Task):
+    priority = TaskPriority.BULK_IO
+    resource = TaskResource.CPU
     file: Path
     destination: Path
+    # Name of the preferred decompression backend, None picks the fastest available one
+    backend: str | None = None
+    # Decompress in the process pool, keeping the GIL of the GUI process free
+    in_process: bool = False
 
     progress = pyqtSignal(int, int)
+    rate = pyqtSignal(float, float)  # bytes per second, seconds left
     finished = pyqtSignal(Path)
 
     def run(self):
-        result = extract(self.file, self.destination, self.progress.emit)
+        reporter = ProgressReporter(self.progress.emit, self.rate.emit)
+
+        def progress(obtained: int, total: int):
+            self.check_cancelled()
+            reporter(obtained, total)
+
+        # The destination is shared with other builds, so cancelling only removes the folder this archive creates
+        root = archive_root_folder(self.file)
+        unpacked = self.destination / root if root else None
+        if unpacked is not None and unpacked.exists():
+            unpacked = None
+        try:
+            result = extract(
+                self.file,
+                self.destination,
+                progress,
+                backend=self.backend,
+                in_process=self.in_process,
+                check=self.check_cancelled,
+            )
+        except TaskCancelledError:
+            if self.is_suspended:
+                # Extracting again over it finishes the job
+                raise
+            # Remove whatever was unpacked so far, the archive is left for a retry
+            if unpacked is not None:
+                if unpacked.is_dir() and not unpacked.is_symlink():
+                    rmtree(unpacked, ignore_errors=True)
+                else:
+                    unpacked.unlink(missing_ok=True)
+            raise
+        reporter.flush()
+        self.report_bytes(self.file.stat().st_size)
         if result is not None:
             self.finished.emit(result)
 
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from modules.archive_cache import ArchiveMirror
+from modules.build_info import BuildInfo, ReadBuildTask, parse_blender_ver
+from modules.decompression import archive_root_folder
+from modules.enums import MessageType
+from modules.settings import get_archive_mirror, get_extract_in_process, get_install_template, get_library_folder
+from modules.tasks import Pipeline, Stage
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from semver import Version
+from threads.downloader import DownloadTask
+from threads.extractor import ExtractTask
+from threads.remover import RemovalTask
+from threads.renamer import RenameTask
+from threads.template_installer import TemplateTask
+
+if TYPE_CHECKING:
+    from modules.install_journal import JournalEntry
+    from windows.main_window import BlenderLauncher
+
+# Minimum time between two journal checkpoints of the download offset
+CHECKPOINT_INTERVAL = 2.0
+
+
+def library_subfolder(branch: str) -> str:
+    if branch in ("stable", "lts"):
+        return "stable"
+    if branch in ("daily", "bforartists"):
+        return branch
+    return "experimental"
+
+
+class BuildInstaller(QObject):
+    """
+    Downloads a build and installs it into the library.
+
+    The stages are checkpointed in the install journal as they finish, along with the files they
+    leave behind, so an install interrupted by a crash or by quitting is picked up where it stopped
+    on the next start. Installers live on the main window, widgets only attach to them for display.
+    """
+
+    download_started = pyqtSignal()
+    progress = pyqtSignal(int, int)
+    rate = pyqtSignal(float, float)
+    stage_started = pyqtSignal(str)
+    stage_finished = pyqtSignal(str, float)
+    # The library widget of the installed build
+    installed = pyqtSignal(object)
+    failed = pyqtSignal(str, Exception)
+    cancelled = pyqtSignal()
+
+    def __init__(self, launcher: BlenderLauncher, build_info: BuildInfo, entry: JournalEntry | None = None):
+        super().__init__(launcher)
+        self.launcher = launcher
+        self.build_info = build_info
+        self.link = build_info.link
+        self.journal = launcher.install_journal
+        self.entry = entry
+        self.source_file: Path | None = None
+        self.build_dir: Path | None = None
+        self.stage: str | None = None
+        self.transferring = False
+        self.last_checkpoint = 0.0
+
+        # Left by an extraction the launcher stopped in the middle of, extracting again overwrites it
+        self.stale_root: Path | None = None
+
+        completed = {}
+        if entry is not None:
+            if "download" in entry.done and entry.archive is not None:
+                self.source_file = completed["download"] = Path(entry.archive)
+            if "extract" in entry.done and entry.build_dir is not None:
+                self.build_dir = completed["extract"] = Path(entry.build_dir)
+                if "template" in entry.done:
+                    completed["template"] = None
+            elif entry.extract_root is not None and Path(entry.extract_root).exists():
+                self.stale_root = Path(entry.extract_root)
+
+        governor = launcher.download_governor
+        self.pipeline = Pipeline(
+            launcher.task_queue,
+            [
+                # The governor hands the download to the queue once a download slot is free
+                Stage(
+                    "download",
+                    self.make_download_task,
+                    retries=2,
+                    rollback=self.remove_archive,
+                    submit=governor.submit,
+                    withdraw=governor.cancel,
+                ),
+                Stage("extract", self.make_extract_task, rollback=self.remove_build),
+                Stage("template", self.make_template_task, result=None),
+                Stage("probe", self.make_read_task),
+                Stage("rename", self.make_rename_task),
+            ],
+            name=Path(self.link).name,
+            parent=self,
+            completed=completed,
+        )
+        self.pipeline.stage_started.connect(self._stage_started)
+        self.pipeline.stage_finished.connect(self._stage_finished)
+        self.pipeline.finished.connect(self._finished)
+        self.pipeline.failed.connect(self._failed)
+        self.pipeline.cancelled.connect(self._cancelled)
+
+    @classmethod
+    def resume(cls, launcher: BlenderLauncher, entry: JournalEntry) -> BuildInstaller | None:
+        """
+        Continues an install found in the journal at startup, from its last finished stage.
+        Installs that cannot be continued are rolled back instead, and None is returned.
+        """
+        archive = Path(entry.archive) if entry.archive is not None else None
+        build_dir = Path(entry.build_dir) if entry.build_dir is not None else None
+
+        if "extract" in entry.done:
+            # Gone if it was renamed right before the launcher stopped, then the install is actually complete
+            resumable = build_dir is not None and build_dir.is_dir()
+        elif "download" in entry.done:
+            resumable = archive is not None and archive.is_file()
+        else:
+            resumable = launcher.manager is not None and not launcher.offline
+
+        try:
+            build_info = BuildInfo.from_dict(entry.link, entry.build_info)
+        except Exception as e:
+            logging.error(f"Invalid install journal entry for {entry.link}: {e}")
+            resumable = False
+
+        if not resumable:
+            cls.discard(launcher, entry)
+            return None
+
+        logging.info(f"Resuming install of {entry.link} after {', '.join(entry.done) or 'nothing'}")
+        return cls(launcher, build_info, entry)
+
+    @staticmethod
+    def discard(launcher: BlenderLauncher, entry: JournalEntry):
+        """Removes what an unfinished install left behind, and forgets about it"""
+        logging.info(f"Rolling back unfinished install of {entry.link}")
+        if entry.archive is not None and Path(entry.archive).exists():
+            launcher.task_queue.append(RemovalTask(Path(entry.archive), trash=False))
+        if "extract" not in entry.done and entry.extract_root is not None and Path(entry.extract_root).exists():
+            # Half extracted
+            launcher.task_queue.append(RemovalTask(Path(entry.extract_root), trash=False))
+        launcher.install_journal.finish(entry.link)
+
+    def start(self):
+        if self.entry is None:
+            self.entry = self.journal.begin(self.link, self.build_info.to_dict()["blinfo"][0])
+        self.launcher.installers[self.link] = self
+        self.pipeline.start()
+
+    def cancel(self):
+        # Stops the running stage and undoes the finished ones
+        self.pipeline.cancel()
+
+    def make_download_task(self, _results):
+        assert self.launcher.manager is not None
+        archive = Path(get_library_folder()) / ".temp" / Path(self.link).name
+        # Only a partial archive this install wrote itself is continued
+        resume = self.entry is not None and self.entry.archive == str(archive)
+        self.journal.update(self.link, archive=str(archive))
+
+        mirror = get_archive_mirror()
+        task = DownloadTask(
+            manager=self.launcher.manager,
+            link=self.link,
+            checksum=self.build_info.checksum,
+            governor=self.launcher.download_governor,
+            cache=self.launcher.archive_cache,
+            mirror=ArchiveMirror(mirror) if mirror else None,
+            resume=resume,
+        )
+        task.started.connect(self._download_started)
+        task.progress.connect(self._download_progress)
+        task.rate.connect(self.rate)
+        return task
+
+    def make_extract_task(self, results):
+        dist = Path(get_library_folder()) / library_subfolder(self.build_info.branch)
+
+        self.source_file = results["download"]
+        assert self.source_file is not None
+        root = archive_root_folder(self.source_file)
+        if root is not None:
+            self.journal.update(self.link, extract_root=str(dist / root))
+
+        a = ExtractTask(file=self.source_file, destination=dist, in_process=get_extract_in_process())
+        a.progress.connect(self.progress)
+        a.rate.connect(self.rate)
+        return a
+
+    def make_template_task(self, results):
+        self.build_dir = results.get("extract")
+        if self.build_dir is None:
+            raise RuntimeError(f"No build was extracted from {self.source_file}")
+
+        if not get_install_template():
+            return None
+
+        t = TemplateTask(destination=self.build_dir)
+        t.progress.connect(self.progress)
+        t.rate.connect(self.rate)
+        return t
+
+    def make_read_task(self, _results):
+        if self.launcher.platform == "Linux":
+            archive_name = Path(self.link).with_suffix("").stem
+        else:
+            archive_name = Path(self.link).stem
+
+        assert self.build_dir is not None
+
+        # If the returned version from the executable is invalid it might break loading.
+        ver_ = parse_blender_ver(self.build_dir.name, search=True)
+        ver = Version(
+            ver_.major,
+            ver_.minor,
+            ver_.patch,
+            prerelease=ver_.prerelease,
+        )
+
+        return ReadBuildTask(
+            self.build_dir,
+            info=BuildInfo(
+                str(self.build_dir),
+                subversion=str(ver),
+                build_hash=None,
+                commit_time=self.build_info.commit_time,
+                branch=self.build_info.branch,
+                custom_executable=self.build_info.custom_executable,
+            ),
+            archive_name=archive_name,
+        )
+
+    def make_rename_task(self, results):
+        build_info: BuildInfo = results["probe"]
+        new_name = f"blender-{build_info.full_semversion}"
+        assert self.build_dir is not None
+        return RenameTask(
+            src=self.build_dir,
+            dst_name=new_name,
+        )
+
+    def remove_archive(self, results):
+        if (source := results.get("download")) is not None:
+            return RemovalTask(source, trash=False)
+        return None
+
+    def remove_build(self, results):
+        if (build_dir := results.get("extract")) is not None:
+            return RemovalTask(build_dir, trash=False)
+        return None
+
+    @pyqtSlot()
+    def _download_started(self):
+        self.transferring = True
+        self.download_started.emit()
+
+    @pyqtSlot(int, int)
+    def _download_progress(self, obtained: int, total: int):
+        self.progress.emit(obtained, total)
+        now = time.monotonic()
+        if now - self.last_checkpoint >= CHECKPOINT_INTERVAL:
+            self.last_checkpoint = now
+            # Only informative, a resumed download continues from the size of the file on disk
+            self.journal.update(self.link, offset=obtained, size=total)
+
+    @pyqtSlot(str)
+    def _stage_started(self, stage: str):
+        self.stage = stage
+        self.stage_started.emit(stage)
+
+    @pyqtSlot(str, float)
+    def _stage_finished(self, stage: str, seconds: float):
+        results = self.pipeline.results
+        if stage == "download":
+            self.transferring = False
+            archive = results["download"]
+            size = archive.stat().st_size
+            self.journal.update(self.link, stage, archive=str(archive), offset=size, size=size)
+        elif stage == "extract":
+            self.stale_root = None
+            self.journal.update(self.link, stage, build_dir=str(results["extract"]))
+        elif stage != "rename":
+            self.journal.update(self.link, stage)
+        self.stage_finished.emit(stage, seconds)
+
+    @pyqtSlot(dict)
+    def _finished(self, results: dict):
+        self.journal.finish(self.link)
+        self.launcher.installers.pop(self.link, None)
+
+        path = results.get("rename")
+        if path is None:
+            path = self.build_dir
+
+        widget = None
+        if path is not None:
+            widget = self.launcher.draw_to_library(path, True)
+
+            assert self.source_file is not None
+            self.launcher.clear_temp(self.source_file)
+
+            if self.build_info.branch == "bforartists":
+                message = f"Bforartists {self.build_info.display_version} {self.build_info.commit_time}"
+            else:
+                name = (
+                    f"{self.build_info.display_version} {self.build_info.display_label} {self.build_info.commit_time}"
+                )
+                message = f"Blender {name}"
+            message += " download finished!"
+
+            self.launcher.show_message(
+                message,
+                message_type=MessageType.DOWNLOADFINISHED,
+            )
+        self.installed.emit(widget)
+
+    def _remove_stale_root(self):
+        # The pipeline rollback only knows about complete extractions
+        if self.stale_root is not None and self.stale_root.exists():
+            self.launcher.task_queue.append(RemovalTask(self.stale_root, trash=False))
+
+    @pyqtSlot(str, Exception)
+    def _failed(self, stage: str, error: Exception):
+        # The pipeline rolled back what was done
+        self._remove_stale_root()
+        self.journal.finish(self.link)
+        self.launcher.installers.pop(self.link, None)
+        self.failed.emit(stage, error)
+
+    @pyqtSlot()
+    def _cancelled(self):
+        self._remove_stale_root()
+        self.journal.finish(self.link)
+        self.launcher.installers.pop(self.link, None)
+        self.cancelled.emit()
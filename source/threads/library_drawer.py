@@ -54,14 +54,18 @@ class DrawLibraryTask(Task):
     unrecognized = pyqtSignal(Path)
     finished = pyqtSignal()
 
+    @property
+    def key(self):
+        return ("draw-library", tuple(str(folder) for folder in self.folders))
+
     def run(self):
         for build, recognized in get_blender_builds(folders=self.folders):
             if recognized:
-                self.found.emit(build)
+                self.emit_replayable("found", build)
             else:
-                self.unrecognized.emit(build)
+                self.emit_replayable("unrecognized", build)
 
-        self.finished.emit()
+        self.emit_replayable("finished")
 
     def __str__(self):
         return f"Draw libraries {self.folders}"
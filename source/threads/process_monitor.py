@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import selectors
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+if TYPE_CHECKING:
+    from subprocess import Popen
+
+    from modules.process_telemetry import ProcessTelemetry
+
+# How often processes that cannot be waited on through a pidfd are polled
+POLL_INTERVAL = 0.25
+
+
+class ProcessGroup(QObject):
+    """The processes launched from one build. Its signals are emitted from the monitor thread"""
+
+    started = pyqtSignal()
+    count_changed = pyqtSignal(int)
+    # pid, return code
+    exited = pyqtSignal(int, int)
+    finished = pyqtSignal()
+    # usage_summary() of the running processes, emitted after every telemetry sample
+    usage_changed = pyqtSignal(dict)
+
+
+class ProcessMonitor(QThread):
+    """
+    One thread watching every process the launcher started.
+
+    On Linux every child gets a pidfd, and the thread sleeps in a selector until one of them exits.
+    Elsewhere, or if pidfds are not supported by the kernel, the children are polled from the same
+    thread. New processes and stop requests wake the selector through a socket pair.
+
+    The same thread samples the resource usage of the processes when `telemetry` is given.
+    """
+
+    def __init__(self, telemetry: ProcessTelemetry | None = None, parent=None):
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._added: list[tuple[Popen, ProcessGroup]] = []
+        self._stopping = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+
+        # Only touched from the monitor thread
+        self.groups: dict[ProcessGroup, set[Popen]] = {}
+        self.owners: dict[Popen, ProcessGroup] = {}
+        self.polled: set[Popen] = set()
+
+    def watch(self, proc: Popen, group: ProcessGroup, build: str = "", info: dict | None = None):
+        """Reports the exit of `proc` to `group`. `build` and `info` identify it in the telemetry log"""
+        if self.telemetry is not None:
+            self.telemetry.track(proc.pid, build, info)
+        with self._lock:
+            self._added.append((proc, group))
+        if not self.isRunning():
+            self.start()
+        self._wake()
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+        self._wake()
+
+    def _wake(self):
+        with contextlib.suppress(OSError):
+            self._wake_w.send(b"\0")
+
+    def run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while True:
+                with self._lock:
+                    if self._stopping:
+                        return
+                    added, self._added = self._added, []
+
+                for proc, group in added:
+                    self._track(proc, group, selector)
+
+                for key, _ in selector.select(self._timeout()):
+                    if key.data is None:
+                        with contextlib.suppress(OSError):
+                            self._wake_r.recv(4096)
+                        continue
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    self._exited(key.data)
+
+                for proc in [proc for proc in self.polled if proc.poll() is not None]:
+                    self.polled.discard(proc)
+                    self._exited(proc)
+
+                if self._sampling() and self.telemetry is not None and self.telemetry.due(time.monotonic()) == 0:
+                    self._sample()
+        finally:
+            for key in list(selector.get_map().values()):
+                if key.data is not None:
+                    os.close(key.fd)
+            selector.close()
+
+    def _sampling(self) -> bool:
+        """Whether a process of a group has to be sampled"""
+        return self.telemetry is not None and bool(self.groups) and self.telemetry.tracking
+
+    def _timeout(self) -> float | None:
+        # Blocks until a process exits or the monitor is woken, unless something has to be polled or sampled
+        timeout = POLL_INTERVAL if self.polled else None
+        if self._sampling() and self.telemetry is not None:
+            due = self.telemetry.due(time.monotonic())
+            timeout = due if timeout is None else min(timeout, due)
+        return timeout
+
+    def _sample(self):
+        assert self.telemetry is not None
+        self.telemetry.sample()
+        for group, procs in self.groups.items():
+            group.usage_changed.emit(self.telemetry.usage([proc.pid for proc in procs]))
+
+    def _track(self, proc: Popen, group: ProcessGroup, selector: selectors.BaseSelector):
+        procs = self.groups.setdefault(group, set())
+        procs.add(proc)
+        self.owners[proc] = group
+        if len(procs) == 1:
+            group.started.emit()
+        group.count_changed.emit(len(procs))
+
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None:
+            try:
+                fd = pidfd_open(proc.pid)
+            except ProcessLookupError:
+                # Already gone
+                self._exited(proc)
+                return
+            except OSError as e:
+                logging.debug(f"pidfd_open is not usable, polling process {proc.pid}: {e}")
+            else:
+                selector.register(fd, selectors.EVENT_READ, proc)
+                return
+
+        self.polled.add(proc)
+
+    def _exited(self, proc: Popen):
+        # Reaps the process
+        returncode = proc.wait()
+        group = self.owners.pop(proc)
+        procs = self.groups[group]
+        procs.discard(proc)
+        if self.telemetry is not None:
+            self.telemetry.finish(proc.pid, returncode)
+        group.exited.emit(proc.pid, returncode)
+        if procs:
+            group.count_changed.emit(len(procs))
+        else:
+            del self.groups[group]
+            group.finished.emit()
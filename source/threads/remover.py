@@ -1,32 +1,51 @@
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from shutil import rmtree
 
-from modules.task import Task
+from modules.lazy_import import lazy_import
+from modules.task import Task, TaskCancelledError, TaskPriority
 from PyQt5.QtCore import pyqtSignal
-from send2trash import send2trash
+
+send2trash = lazy_import("send2trash")
 
 
 @dataclass
 class RemovalTask(Task):
+    priority = TaskPriority.BACKGROUND
     path: Path
     trash: bool = True
+    # 0 once removed, 1 if it failed or was cancelled
     finished = pyqtSignal(bool)
 
     def run(self):
         try:
             if self.trash:
-                send2trash(str(self.path))
+                send2trash.send2trash(str(self.path))
             else:
                 if self.path.is_dir():
-                    rmtree(self.path.as_posix())
+                    self._rmtree(self.path)
                 else:
                     self.path.unlink()
 
             self.finished.emit(0)
-        except OSError:
+        except (OSError, TaskCancelledError):
+            # Listeners waiting to remove the build put it back instead
             self.finished.emit(1)
             raise
 
+    def _rmtree(self, path: Path):
+        """rmtree, checking for cancellation between every directory"""
+        for root, dirs, files in os.walk(path, topdown=False):
+            self.check_cancelled()
+            for name in files:
+                Path(root, name).unlink()
+            for name in dirs:
+                p = Path(root, name)
+                if p.is_symlink():
+                    p.unlink()
+                else:
+                    p.rmdir()
+        path.rmdir()
+
     def __str__(self):
         return f"Remove {self.path}"
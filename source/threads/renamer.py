@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-from modules.task import Task
+from modules.task import Task, TaskPriority
 from PyQt5.QtCore import pyqtSignal
 
 
 @dataclass(frozen=True)
 class RenameTask(Task):
+    priority = TaskPriority.INTERACTIVE
     src: Path
     dst_name: str
 
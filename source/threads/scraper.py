@@ -11,9 +11,6 @@ from pathlib import Path, PurePosixPath
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 
-import dateparser
-import distro
-from bs4 import BeautifulSoup, SoupStrainer
 from modules._platform import (
     bfa_cache_path,
     get_architecture,
@@ -27,6 +24,7 @@ from modules.bl_api_manager import (
     update_stable_builds_cache,
 )
 from modules.build_info import BuildInfo, parse_blender_ver
+from modules.lazy_import import lazy_import
 from modules.scraper_cache import ScraperCache
 from modules.settings import (
     get_minimum_blender_stable_version,
@@ -40,10 +38,17 @@ from modules.settings import (
 )
 from PyQt5.QtCore import QThread, pyqtSignal
 from semver import Version
-from webdav4.client import Client
 
 if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
     from modules.connection_manager import ConnectionManager
+    from webdav4.client import Client
+
+# Only needed once the scraper runs
+bs4 = lazy_import("bs4")
+dateparser = lazy_import("dateparser")
+distro = lazy_import("distro")
+webdav4_client = lazy_import("webdav4.client")
 
 logger = logging.getLogger()
 
@@ -201,6 +206,7 @@ class Scraper(QThread):
 
         self.b3d_link = re.compile(regex_filter, re.IGNORECASE)
         self.hash = re.compile(r"\w{12}")
+        self.sha256_link = re.compile(r"\.sha256$", re.IGNORECASE)
         self.subversion = re.compile(r"-\d\.[a-zA-Z0-9.]+-")
         self.bfa_package_file_name_regex = re.compile(bfa_regex_filter, re.IGNORECASE)
 
@@ -328,18 +334,42 @@ class Scraper(QThread):
 
         content = r.data
 
-        soup_stainer = SoupStrainer("a", href=True)
-        soup = BeautifulSoup(content, "lxml", parse_only=soup_stainer)
+        soup_stainer = bs4.SoupStrainer("a", href=True)
+        soup = bs4.BeautifulSoup(content, "lxml", parse_only=soup_stainer)
+
+        checksums = {}
+        if branch_type == "stable":
+            checksums = self.scrap_checksums(soup, url)
 
         for tag in soup.find_all(limit=_limit, href=self.b3d_link):
             build_info = self.new_blender_build(tag, url, branch_type)
-
             if build_info is not None:
+                build_info.checksum = checksums.get(PurePosixPath(build_info.link).name)
                 yield build_info
 
         r.release_conn()
         r.close()
 
+    def scrap_checksums(self, soup: BeautifulSoup, url: str) -> dict[str, str]:
+        """Reads the .sha256 files of a release folder, returning {file name: sha256 digest}"""
+        checksums: dict[str, str] = {}
+        for tag in soup.find_all(href=self.sha256_link):
+            r = self.manager.request("GET", urljoin(url, tag["href"]))
+            if r is None:
+                continue
+
+            if r.status == 200:
+                for line in r.data.decode("utf-8", errors="replace").splitlines():
+                    # Format of sha256sum: "<digest>  <file name>"
+                    parts = line.split()
+                    if len(parts) == 2:
+                        checksums[parts[1].lstrip("*")] = parts[0].lower()
+
+            r.release_conn()
+            r.close()
+
+        return checksums
+
     def new_blender_build(self, tag, url, branch_type):
         link = urljoin(url, tag["href"]).rstrip("/")
         r = self.manager.request("HEAD", link)
@@ -393,7 +423,7 @@ class Scraper(QThread):
             return
 
         content = r.data
-        soup = BeautifulSoup(content, "lxml")
+        soup = bs4.BeautifulSoup(content, "lxml")
 
         b3d_link = re.compile(r"Blender(\d+\.\d+)")
 
@@ -433,7 +463,7 @@ class Scraper(QThread):
                         else:
                             folder = self.cache[ver]
 
-                        if folder.modified_date != modified_date:
+                        if folder.modified_date != modified_date or not folder.checksums_scraped:
                             folder.assets.clear()
                             for build in self.scrap_download_links(urljoin(url, href), "stable"):
                                 folder.assets.append(build)
@@ -441,6 +471,7 @@ class Scraper(QThread):
 
                             logger.debug(f"Caching {href}: {modified_date} (previous was {folder.modified_date})")
                             folder.modified_date = modified_date
+                            folder.checksums_scraped = True
                             cache_modified = True
                         else:
                             logger.debug(f"Skipping {href}: {modified_date}")
@@ -459,7 +490,7 @@ class Scraper(QThread):
         r.close()
 
     def scrape_bfa_releases(self):
-        client = Client(BFA_NC_WEBDAV_URL, auth=(BFA_NC_WEBDAV_SHARE_TOKEN, ""))
+        client = webdav4_client.Client(BFA_NC_WEBDAV_URL, auth=(BFA_NC_WEBDAV_SHARE_TOKEN, ""))
         cache_modified = False
         for entry in client.ls("", detail=True, allow_listing_resource=True):
             if isinstance(entry, str):
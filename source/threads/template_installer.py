@@ -1,14 +1,23 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 from pathlib import Path
 from re import match
-from shutil import copytree
+from shutil import copy2, copytree
+from typing import TYPE_CHECKING
 
+from modules.progress import ProgressReporter
 from modules.settings import get_library_folder
-from modules.task import Task
+from modules.task import Task, TaskPriority
 from PyQt5.QtCore import pyqtSignal
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
-def install_template(dist: Path):
+def install_template(dist: Path, progress_callback: Callable[[int, int], None] | None = None):
+    """Copies the library template into the config folder of the build at `dist`.
+    `progress_callback` is called after every file, and may raise to stop copying."""
     library_folder = Path(get_library_folder())
     template = library_folder / "template"
 
@@ -16,22 +25,54 @@ def install_template(dist: Path):
 
     for directory in dist.iterdir():
         if match(r"\d+\.\d+.*", directory.name) is not None:
-            copytree(
-                src=template.as_posix(),
-                dst=directory.as_posix(),
-                dirs_exist_ok=True,
-            )
-            return
+            break
+    else:
+        return
+
+    copy_function = copy2
+    if progress_callback is not None:
+        total = sum(f.stat().st_size for f in template.rglob("*") if f.is_file())
+        copied = 0
+        progress_callback(0, total)
+
+        def copy_function(src, dst, *, follow_symlinks=True):
+            nonlocal copied
+            result = copy2(src, dst, follow_symlinks=follow_symlinks)
+            copied += Path(src).stat().st_size
+            progress_callback(copied, total)
+            return result
+
+    copytree(
+        src=template.as_posix(),
+        dst=directory.as_posix(),
+        dirs_exist_ok=True,
+        copy_function=copy_function,
+    )
 
 
 @dataclass(frozen=True)
 class TemplateTask(Task):
+    priority = TaskPriority.BULK_IO
     destination: Path
 
+    progress = pyqtSignal(int, int)
+    rate = pyqtSignal(float, float)  # bytes per second, seconds left
     finished = pyqtSignal()
 
     def run(self):
-        install_template(self.destination)
+        reporter = ProgressReporter(self.progress.emit, self.rate.emit)
+
+        copied = 0
+
+        def progress(obtained: int, total: int):
+            nonlocal copied
+            self.check_cancelled()
+            copied = obtained
+            reporter(obtained, total)
+
+        install_template(self.destination, progress)
+        reporter.flush()
+        self.report_bytes(copied)
         self.finished.emit()
 
     def __str__(self):
@@ -6,8 +6,7 @@ from pathlib import PurePosixPath
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QAction, QWidget
-from threads.scraper import BFA_NC_WEBDAV_SHARE_TOKEN, BFA_NC_WEBDAV_URL, get_bfa_nc_https_download_url
-from webdav4.client import Client
+from threads.scraper import BFA_NC_WEBDAV_SHARE_TOKEN, BFA_NC_WEBDAV_URL, get_bfa_nc_https_download_url, webdav4_client
 from widgets.base_menu_widget import BaseMenuWidget
 
 
@@ -43,7 +42,7 @@ class BaseBuildWidget(QWidget):
             webbrowser.open(f"https://www.blender.org/download/lts/#lts-release-{v}")
         elif self.build_info.branch == "bforartists":
             ver = self.build_info.semversion
-            client = Client(BFA_NC_WEBDAV_URL, auth=(BFA_NC_WEBDAV_SHARE_TOKEN, ""))
+            client = webdav4_client.Client(BFA_NC_WEBDAV_URL, auth=(BFA_NC_WEBDAV_SHARE_TOKEN, ""))
             try:
                 entries = client.ls(
                     f"/Bforartists {ver.major}.{ver.minor}.{ver.patch}", detail=True, allow_listing_resource=True
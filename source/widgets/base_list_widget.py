@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from PyQt5.QtCore import Qt
+from modules.build_info import BuildIndex
+from modules.build_search import BuildSearchIndex
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFontMetrics
 from PyQt5.QtWidgets import QAbstractItemView, QListWidget
 
@@ -18,7 +20,15 @@ class BaseListWidget(QListWidget):
         self.parent: BasePageWidget | None = parent
 
         self.widgets = set()
+        # Widgets by build, library widgets join it once their build is read
+        self.index: BuildIndex[BaseBuildWidget] = BuildIndex()
+        self.search_index: BuildSearchIndex[BaseBuildWidget] = BuildSearchIndex()
+        self.search_query = ""
         self.metrics = QFontMetrics(self.font())
+        # Builds drawn in a row are sorted once
+        self.sort_timer = QTimer(self)
+        self.sort_timer.setSingleShot(True)
+        self.sort_timer.timeout.connect(self.sortItems)
 
         self.setFrameShape(QListWidget.NoFrame)
         self.setSortingEnabled(True)
@@ -30,32 +40,51 @@ class BaseListWidget(QListWidget):
             self.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
     def add_item(self, item, widget):
+        item.set_sorting_type(self.parent.sorting_type.name)
         item.setSizeHint(widget.sizeHint())
         self.addItem(item)
         self.setItemWidget(item, widget)
         self.count_changed()
         self.widgets.add(widget)
+        self.index_widget(widget)
 
     def insert_item(self, item, widget, index=0):
+        item.set_sorting_type(self.parent.sorting_type.name)
         item.setSizeHint(widget.sizeHint())
         self.insertItem(index, item)
         self.setItemWidget(item, widget)
         self.count_changed()
         self.widgets.add(widget)
+        self.index_widget(widget)
 
     def remove_item(self, item):
-        self.widgets.remove(self.itemWidget(item))
+        widget = self.itemWidget(item)
+        self.widgets.remove(widget)
+        self.index.remove(widget)
+        self.search_index.remove(widget)
         row = self.row(item)
         self.takeItem(row)
         self.count_changed()
 
+    def sort_soon(self):
+        self.sort_timer.start(0)
+
+    def sortItems(self, order=Qt.SortOrder.AscendingOrder):
+        self.sort_timer.stop()
+        sorting_type = self.parent.sorting_type.name
+        for i in range(self.count()):
+            self.item(i).set_sorting_type(sorting_type)
+        super().sortItems(order)
+
     def count_changed(self):
         if self.count() > 0:
             self.show()
+            self.parent.SearchEdit.show()
             self.parent.HeaderWidget.show()
             self.parent.PlaceholderWidget.hide()
         else:
             self.hide()
+            self.parent.SearchEdit.hide()
             self.parent.HeaderWidget.hide()
             self.parent.PlaceholderWidget.show()
 
@@ -68,16 +97,40 @@ class BaseListWidget(QListWidget):
 
         return items
 
+    def index_widget(self, widget):
+        """Files `widget` under its current build, to be called whenever its build changes"""
+        if widget not in self.widgets:
+            return
+        if getattr(widget, "build_info", None) is not None:
+            self.index.add(widget.build_info, widget)
+            self.search_index.add(widget.build_info, widget)
+        else:
+            self.index.remove(widget)
+            self.search_index.remove(widget)
+
+        if self.search_query:
+            self.set_hidden(widget, not self.search_index.matches(widget, self.search_query))
+
+    def filter_items(self, query: str):
+        """Hides the builds that do not match every word of `query`"""
+        self.search_query = query
+        matches = self.search_index.search(query)
+        for widget in self.widgets:
+            self.set_hidden(widget, matches is not None and widget not in matches)
+
+    def set_hidden(self, widget, hidden: bool):
+        if widget.item.isHidden() != hidden:
+            widget.item.setHidden(hidden)
+
     def contains_build_info(self, build_info):
-        return any(build_info == widget.build_info for widget in self.widgets)
+        return build_info in self.index
 
     def widget_with_blinfo(self, build_info: BuildInfo) -> BaseBuildWidget | None:
-        try:
-            return next(widget for widget in self.widgets if build_info == widget.build_info)
-        except StopIteration:
-            return None
+        return self.index.find(build_info)
 
     def clear_(self):
         self.clear()
         self.widgets.clear()
+        self.index.clear()
+        self.search_index.clear()
         self.count_changed()
@@ -6,11 +6,13 @@ from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import (
     QHBoxLayout,
     QLabel,
+    QLineEdit,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 from widgets.base_list_widget import BaseListWidget
+from widgets.build_list_view import BuildListView
 
 
 class SortingType(Enum):
@@ -19,7 +21,16 @@ class SortingType(Enum):
 
 
 class BasePageWidget(QWidget):
-    def __init__(self, parent, page_name, time_label, info_text, show_reload=False, extended_selection=False):
+    def __init__(
+        self,
+        parent,
+        page_name,
+        time_label,
+        info_text,
+        show_reload=False,
+        extended_selection=False,
+        virtual_list=False,
+    ):
         super().__init__(parent)
         self.name = page_name
 
@@ -46,7 +57,11 @@ class BasePageWidget(QWidget):
         self.InfoLabel = QLabel(info_text)
         self.InfoLabelLayout.addWidget(self.InfoLabel)
 
-        self.list_widget = BaseListWidget(self, extended_selection=extended_selection)
+        # Pages of downloadable builds can hold thousands of rows, their widgets are created on demand
+        if virtual_list is True:
+            self.list_widget = BuildListView(parent, self, extended_selection=extended_selection)
+        else:
+            self.list_widget = BaseListWidget(self, extended_selection=extended_selection)
         self.list_widget.hide()
 
         self.InfoLayout = QHBoxLayout()
@@ -74,6 +89,13 @@ class BasePageWidget(QWidget):
 
         self.PlaceholderLayout.addStretch()
 
+        # Search Widget
+        self.SearchEdit = QLineEdit()
+        self.SearchEdit.hide()
+        self.SearchEdit.setPlaceholderText("Search by version, branch, hash or name")
+        self.SearchEdit.setClearButtonEnabled(True)
+        self.SearchEdit.textChanged.connect(self.list_widget.filter_items)
+
         # Header Widget
         self.HeaderWidget = QWidget()
         self.HeaderWidget.hide()
@@ -112,6 +134,7 @@ class BasePageWidget(QWidget):
         self.HeaderLayout.addSpacing(34)
 
         # Final layout
+        self.layout.addWidget(self.SearchEdit)
         self.layout.addWidget(self.HeaderWidget)
         self.layout.addWidget(self.PlaceholderWidget)
         self.layout.addWidget(self.list_widget)
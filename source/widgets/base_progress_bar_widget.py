@@ -4,12 +4,20 @@ from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QProgressBar
 
 
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+    return f"{seconds // 60}:{seconds % 60:02}"
+
+
 class BaseProgressBarWidget(QProgressBar):
     progress_updated = pyqtSignal(int, int)
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.title = ""
+        self.last_rate: tuple[float, float] | None = None
 
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setMinimum(0)
@@ -17,7 +25,8 @@ class BaseProgressBarWidget(QProgressBar):
 
     def set_title(self, title: str):
         self.title = title
-        self.setFormat(f"{self.title}: {self.last_progress[0]:.1f} of {self.last_progress[1]:.1f} MB")
+        self.last_rate = None
+        self.update_format()
 
     @pyqtSlot(int, int)
     def set_progress(self, obtained: int | float, total: int | float, title: str | None = None):
@@ -31,8 +40,25 @@ class BaseProgressBarWidget(QProgressBar):
         # Convert bytes to megabytes
         obtained = obtained / 1048576
         total = total / 1048576
+        self.last_progress = (obtained, total)
 
         # Repaint and call signal
-        self.setFormat(f"{self.title}: {obtained:.1f} of {total:.1f} MB")
+        self.update_format()
         self.progress_updated.emit(obtained, total)
-        self.last_progress = (obtained, total)
+
+    @pyqtSlot(float, float)
+    def set_rate(self, rate: float, eta: float):
+        """Shows the transfer rate (bytes per second) and remaining time (seconds, -1 if unknown)"""
+        self.last_rate = (rate, eta)
+        self.update_format()
+
+    def update_format(self):
+        obtained, total = self.last_progress
+        fmt = f"{self.title}: {obtained:.1f} of {total:.1f} MB"
+        if self.last_rate is not None and self.last_rate[0] > 0:
+            rate, eta = self.last_rate
+            fmt += f" ({rate / 1048576:.1f} MB/s"
+            if eta >= 0:
+                fmt += f", {format_eta(eta)} left"
+            fmt += ")"
+        self.setFormat(fmt)
@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+from modules.build_info import BuildIndex
+from modules.build_search import BuildSearchIndex
+from PyQt5.QtCore import QAbstractListModel, QEvent, QItemSelectionModel, QModelIndex, QRect, QSize, Qt, QTimer
+from PyQt5.QtGui import QPalette
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QListView,
+    QPushButton,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
+)
+from widgets.datetime_widget import DateTimeWidget
+from widgets.download_widget import DownloadState, DownloadWidget
+
+if TYPE_CHECKING:
+    from items.build_list_item import BuildListItem
+    from modules.build_info import BuildInfo
+    from widgets.base_page_widget import BasePageWidget
+    from windows.main_window import BlenderLauncher
+
+# Data role of the BuildListItem of a row
+ItemRole = Qt.ItemDataRole.UserRole + 1
+
+
+class BuildListModel(QAbstractListModel):
+    """Every build of a list in sort order, of which the rows are the ones passing the filter"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items: list[BuildListItem] = []
+        self.rows: list[BuildListItem] = []
+        self.positions: dict[BuildListItem, int] = {}
+        self.links: dict[str, BuildListItem] = {}
+        # None shows everything
+        self.matches: set[BuildListItem] | None = None
+
+    def rowCount(self, parent=QModelIndex()):  # noqa: B008
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.rows[index.row()]
+        if role == ItemRole:
+            return item
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item.build_info.display_version
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return str(item.build_info.semversion)
+        return None
+
+    def index_of(self, item: BuildListItem) -> QModelIndex:
+        row = self.positions.get(item)
+        if row is None:
+            return QModelIndex()
+        return self.index(row)
+
+    def shown(self, item: BuildListItem) -> bool:
+        return self.matches is None or item in self.matches
+
+    def shown_items(self) -> list[BuildListItem]:
+        if self.matches is None:
+            return list(self.items)
+        return list(filter(self.matches.__contains__, self.items))
+
+    def append(self, item: BuildListItem):
+        self.items.append(item)
+        self.links[item.build_info.link] = item
+        if not self.shown(item):
+            return
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(item)
+        self.positions[item] = row
+        self.endInsertRows()
+
+    def remove(self, item: BuildListItem):
+        self.items.remove(item)
+        if self.links.get(item.build_info.link) is item:
+            del self.links[item.build_info.link]
+        if self.matches is not None:
+            self.matches.discard(item)
+        row = self.positions.get(item)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        del self.positions[item]
+        # Only the rows after the removed one move up
+        for i in range(row, len(self.rows)):
+            self.positions[self.rows[i]] = i
+        self.endRemoveRows()
+
+    def remove_many(self, items: set[BuildListItem]):
+        # Removing rows one by one moves the rows after each of them, the rows are rebuilt once instead
+        self.items = [item for item in self.items if item not in items]
+        for item in items:
+            if self.links.get(item.build_info.link) is item:
+                del self.links[item.build_info.link]
+        if self.matches is not None:
+            self.matches -= items
+        if not any(item in self.positions for item in items):
+            return
+        self.beginResetModel()
+        self.rows = self.shown_items()
+        self.positions = {item: i for i, item in enumerate(self.rows)}
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.items.clear()
+        self.rows.clear()
+        self.positions.clear()
+        self.links.clear()
+        self.endResetModel()
+
+    def sort_rows(self, key, reverse: bool):
+        self.items.sort(key=key, reverse=reverse)
+        self.layoutAboutToBeChanged.emit()
+        # Index widgets follow their rows through the persistent indexes
+        persistent = self.persistentIndexList()
+        moved = [self.rows[index.row()] for index in persistent]
+        self.rows = self.shown_items()
+        self.positions = {item: i for i, item in enumerate(self.rows)}
+        self.changePersistentIndexList(persistent, [self.index(self.positions[item]) for item in moved])
+        self.layoutChanged.emit()
+
+    def set_filter(self, matches: set[BuildListItem] | None):
+        # Hiding rows of the view one by one does not scale, the rows are rebuilt instead
+        self.beginResetModel()
+        self.matches = matches
+        self.rows = self.shown_items()
+        self.positions = {item: i for i, item in enumerate(self.rows)}
+        self.endResetModel()
+
+
+class BuildRowDelegate(QStyledItemDelegate):
+    """Paints a row the way its DownloadWidget looks, for the rows that have none"""
+
+    def __init__(self, view: BuildListView):
+        super().__init__(view)
+        self.view = view
+        # Never shown, they only carry the style sheet of the real buttons
+        self.downloadButton = self.StyleButton("Download", "LaunchButton")
+        self.installedButton = self.StyleButton("Installed", "InstalledButton")
+        self.row_height = max(self.downloadButton.sizeHint().height(), 24) + 4
+
+    def StyleButton(self, text, prop):
+        button = QPushButton(text, self.view)
+        button.setProperty(prop, True)
+        button.setFixedWidth(85)
+        button.hide()
+        button.ensurePolished()
+        return button
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.row_height)
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = self.view.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, opt, painter, self.view)
+
+        if self.view.indexWidget(index) is not None:
+            return
+
+        item: BuildListItem = index.data(ItemRole)
+        # Same geometry as the layout of DownloadWidget
+        rect = option.rect.adjusted(2, 2, 0, -2)
+        button = self.installedButton if item.installed else self.downloadButton
+        button_opt = QStyleOptionButton()
+        button.initStyleOption(button_opt)
+        button_opt.rect = QRect(rect.left(), rect.top(), 85, rect.height())
+        button.style().drawControl(QStyle.ControlElement.CE_PushButton, button_opt, painter, button)
+
+        painter.save()
+        painter.setFont(opt.font)
+        if opt.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(opt.palette.color(QPalette.ColorRole.HighlightedText))
+        else:
+            painter.setPen(opt.palette.color(QPalette.ColorRole.Text))
+        metrics = opt.fontMetrics
+
+        left = rect.left() + 85
+        state_left = rect.right() - 28
+        time_width = metrics.horizontalAdvance(
+            f"{DateTimeWidget.left_arrow}{item.time_text}{DateTimeWidget.right_arrow}"
+        )
+        time_rect = QRect(state_left - time_width, rect.top(), time_width, rect.height())
+        version_rect = QRect(left + 20, rect.top(), 65, rect.height())
+        branch_rect = QRect(left + 85, rect.top(), time_rect.left() - left - 85, rect.height())
+
+        align = Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+        painter.drawText(version_rect, align, item.build_info.display_version)
+        branch = metrics.elidedText(item.build_info.display_label, Qt.TextElideMode.ElideRight, branch_rect.width())
+        painter.drawText(branch_rect, align, branch)
+        painter.drawText(time_rect, Qt.AlignmentFlag.AlignCenter, item.time_text)
+        painter.restore()
+
+        if item.show_new and not item.installed:
+            icon_rect = QRect(state_left, rect.center().y() - 12, 24, 24)
+            self.view.launcher.icons.filled_circle.paint(painter, icon_rect)
+
+
+class BuildListView(QListView):
+    """
+    A list of downloadable builds that scales to thousands of rows. Rows are painted by a delegate,
+    and a real DownloadWidget is only created for the rows that are hovered, selected, or have an
+    install running. Widgets are dropped again once they are idle and the row is left.
+
+    Mirrors the interface of BaseListWidget the main window uses, with BuildListItems in place of
+    the widgets.
+    """
+
+    def __init__(self, launcher: BlenderLauncher, parent: BasePageWidget, extended_selection=False):
+        super().__init__(parent)
+        self.parent: BasePageWidget = parent
+        self.launcher = launcher
+
+        self.widgets: set[BuildListItem] = set()
+        self.index: BuildIndex[BuildListItem] = BuildIndex()
+        self.search_index: BuildSearchIndex[BuildListItem] = BuildSearchIndex()
+        self.search_query = ""
+        self.live: set[BuildListItem] = set()
+        self.hovered: BuildListItem | None = None
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        self.list_model = BuildListModel(self)
+        self.setModel(self.list_model)
+        self.delegate = BuildRowDelegate(self)
+        self.setItemDelegate(self.delegate)
+
+        self.setUniformItemSizes(True)
+        # Lays out a large list in chunks instead of all at once
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setMouseTracking(True)
+        self.setFrameShape(QListView.NoFrame)
+        self.setAlternatingRowColors(True)
+        self.setProperty("HideBorder", True)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+        if extended_selection is True:
+            self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        self.entered.connect(self.row_entered)
+        self.selectionModel().selectionChanged.connect(self.update_widgets)
+
+        # Additions come in batches from the scraper, sort once per batch
+        self.sort_timer = QTimer(self)
+        self.sort_timer.setSingleShot(True)
+        self.sort_timer.timeout.connect(self.sort_rows)
+
+    def add_item(self, item: BuildListItem):
+        self.widgets.add(item)
+        self.index.add(item.build_info, item)
+        self.search_index.add(item.build_info, item)
+        matches = self.list_model.matches
+        if matches is not None and self.search_index.matches(item, self.search_query):
+            matches.add(item)
+        self.list_model.append(item)
+        self.count_changed()
+        self.sort_timer.start(0)
+        if item.build_info.link in self.launcher.installers:
+            self.update_widgets()
+
+    def remove_item(self, item: BuildListItem):
+        self.release(item)
+        self.live.discard(item)
+        self.widgets.discard(item)
+        self.index.remove(item)
+        self.search_index.remove(item)
+        if self.hovered is item:
+            self.hovered = None
+        self.list_model.remove(item)
+        self.count_changed()
+
+    def remove_items(self, items: set[BuildListItem]):
+        """Removes many builds at once, restoring the widgets and the selection the reset of the model drops"""
+        if not items:
+            return
+        selected = [index.data(ItemRole) for index in self.selectionModel().selectedIndexes()]
+        for item in self.live:
+            self.release(item)
+        self.live = set()
+        if self.hovered in items:
+            self.hovered = None
+        for item in items:
+            self.widgets.discard(item)
+            self.index.remove(item)
+            self.search_index.remove(item)
+
+        self.list_model.remove_many(items)
+        for item in selected:
+            if item not in items:
+                self.select(item)
+        self.count_changed()
+        self.update_widgets()
+
+    def count(self):
+        # Filtered out builds included
+        return len(self.list_model.items)
+
+    def count_changed(self):
+        if self.count() > 0:
+            self.show()
+            self.parent.SearchEdit.show()
+            self.parent.HeaderWidget.show()
+            self.parent.PlaceholderWidget.hide()
+        else:
+            self.hide()
+            self.parent.SearchEdit.hide()
+            self.parent.HeaderWidget.hide()
+            self.parent.PlaceholderWidget.show()
+
+    def items(self) -> list[BuildListItem]:
+        return list(self.list_model.items)
+
+    def contains_build_info(self, build_info: BuildInfo):
+        return build_info in self.index
+
+    def widget_with_blinfo(self, build_info: BuildInfo) -> BuildListItem | None:
+        return self.index.find(build_info)
+
+    def clear_(self):
+        for item in self.live:
+            self.release(item)
+        self.live.clear()
+        self.hovered = None
+        self.list_model.clear()
+        self.widgets.clear()
+        self.index.clear()
+        self.search_index.clear()
+        self.count_changed()
+
+    def filter_items(self, query: str):
+        """Hides the builds that do not match every word of `query`"""
+        self.search_query = query
+        matches = self.search_index.search(query)
+        if matches is None and self.list_model.matches is None:
+            return
+
+        # Resetting the model drops the widgets and the selection, they are restored after
+        selected = [index.data(ItemRole) for index in self.selectionModel().selectedIndexes()]
+        for item in self.live:
+            self.release(item)
+        self.live = set()
+        self.hovered = None
+
+        self.list_model.set_filter(matches)
+        for item in selected:
+            self.select(item)
+        self.update_widgets()
+
+    def sortItems(self, order: Qt.SortOrder | None = None):
+        if order is not None:
+            self.sort_order = order
+        self.sort_rows()
+
+    def sort_rows(self):
+        self.sort_timer.stop()
+        # Ascending lists the newest builds first, like BaseListWidgetItem
+        reverse = self.sort_order == Qt.SortOrder.AscendingOrder
+        if self.parent.sorting_type.name == "VERSION":
+            self.list_model.sort_rows(attrgetter("version_key"), reverse)
+        else:
+            self.list_model.sort_rows(attrgetter("date_key"), reverse)
+
+    def select(self, item: BuildListItem, selected=True):
+        index = self.list_model.index_of(item)
+        if not index.isValid():
+            return
+        if not selected:
+            self.selectionModel().select(index, QItemSelectionModel.SelectionFlag.Deselect)
+        elif self.selectionMode() == QAbstractItemView.ExtendedSelection:
+            self.selectionModel().select(index, QItemSelectionModel.SelectionFlag.Select)
+        else:
+            self.selectionModel().setCurrentIndex(index, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
+    def row_changed(self, item: BuildListItem):
+        index = self.list_model.index_of(item)
+        if index.isValid():
+            self.update(index)
+
+    def row_entered(self, index: QModelIndex):
+        self.hovered = index.data(ItemRole)
+        self.update_widgets()
+
+    def viewportEvent(self, event):
+        # Entering the widget of a row does not leave the viewport, only leaving the list does
+        if event.type() == QEvent.Type.Leave and self.hovered is not None:
+            self.hovered = None
+            self.update_widgets()
+        return super().viewportEvent(event)
+
+    def wanted(self) -> set[BuildListItem]:
+        wanted = {item for item in self.live if item.state != DownloadState.IDLE}
+        if self.hovered is not None:
+            wanted.add(self.hovered)
+        for index in self.selectionModel().selectedIndexes():
+            wanted.add(index.data(ItemRole))
+        for link in self.launcher.installers:
+            if (item := self.list_model.links.get(link)) is not None:
+                wanted.add(item)
+        return wanted
+
+    def update_widgets(self):
+        wanted = self.wanted()
+        for item in self.live - wanted:
+            self.release(item)
+        for item in wanted - self.live:
+            self.materialize(item)
+        # Filtered out rows get no widget
+        self.live = {item for item in wanted if item.widget is not None}
+
+    def materialize(self, item: BuildListItem):
+        index = self.list_model.index_of(item)
+        if not index.isValid():
+            return
+        widget = DownloadWidget(
+            self.launcher,
+            self,
+            item,
+            item.build_info,
+            installed=item.installed,
+            show_new=item.show_new,
+        )
+        widget.focus_installed_widget.connect(self.launcher.focus_widget)
+        item.attach_widget(widget)
+        self.setIndexWidget(index, widget)
+
+    def release(self, item: BuildListItem):
+        if item.widget is None:
+            return
+        item.release_widget()
+        index = self.list_model.index_of(item)
+        if index.isValid():
+            # Deletes the widget
+            self.setIndexWidget(index, None)
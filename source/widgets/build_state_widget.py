@@ -1,5 +1,8 @@
+from __future__ import annotations
+
 import time
 
+from modules.process_telemetry import format_usage
 from PyQt5.QtCore import QEasingCurve, QPropertyAnimation, QRect, QSize
 from PyQt5.QtWidgets import QHBoxLayout, QPushButton, QWidget
 
@@ -59,6 +62,13 @@ class BuildStateWidget(QWidget):
             self.fakeIcon.show()
             self.active_icon = self.fakeIcon
 
+    def setUsage(self, usage: dict | None):
+        """Shows the resource usage of the running processes in the tooltip of the count"""
+        if usage is None or not usage["count"]:
+            self.setToolTip("")
+        else:
+            self.setToolTip(format_usage(usage))
+
     def setNewBuild(self, show=True):
         if show:
             self.active_icon.hide()
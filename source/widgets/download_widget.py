@@ -2,19 +2,11 @@ from __future__ import annotations
 
 import re
 from enum import Enum
-from pathlib import Path
 from typing import TYPE_CHECKING, Literal
 
-from modules.build_info import BuildInfo, ReadBuildTask, parse_blender_ver
-from modules.enums import MessageType
-from modules.settings import get_install_template, get_library_folder
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QHBoxLayout, QLabel, QPushButton, QVBoxLayout
-from semver import Version
-from threads.downloader import DownloadTask
-from threads.extractor import ExtractTask
-from threads.renamer import RenameTask
-from threads.template_installer import TemplateTask
+from threads.installer import BuildInstaller
 from widgets.base_build_widget import BaseBuildWidget
 from widgets.base_progress_bar_widget import BaseProgressBarWidget
 from widgets.build_state_widget import BuildStateWidget
@@ -22,6 +14,7 @@ from widgets.datetime_widget import DateTimeWidget
 from widgets.elided_text_label import ElidedTextLabel
 
 if TYPE_CHECKING:
+    from modules.build_info import BuildInfo
     from widgets.base_page_widget import BasePageWidget
     from widgets.library_widget import LibraryWidget
     from windows.main_window import BlenderLauncher
@@ -33,6 +26,7 @@ class DownloadState(Enum):
     EXTRACTING = 3
     READING = 4
     RENAMING = 5
+    QUEUED = 6
 
 
 class DownloadWidget(BaseBuildWidget):
@@ -47,8 +41,7 @@ class DownloadWidget(BaseBuildWidget):
         self.show_new = show_new
         self.installed: LibraryWidget | None = None
         self.state = DownloadState.IDLE
-        self.build_dir = None
-        self.source_file = None
+        self.installer: BuildInstaller | None = None
 
         self.progressBar = BaseProgressBarWidget()
         self.progressBar.setFont(self.parent.font_8)
@@ -120,6 +113,9 @@ class DownloadWidget(BaseBuildWidget):
             self.setInstalled(installed)
         else:
             self.installedButton.hide()
+            # Still running from before the list was drawn, or resumed from the install journal
+            if (installer := self.parent.installers.get(self.build_info.link)) is not None:
+                self.attach(installer)
 
         if self.build_info.branch in "stable lts":
             self.menu.addAction(self.showReleaseNotesAction)
@@ -130,8 +126,6 @@ class DownloadWidget(BaseBuildWidget):
                 self.showReleaseNotesAction.setText("Show Patch Details")
                 self.menu.addAction(self.showReleaseNotesAction)
 
-        self.list_widget.sortItems()
-
     def context_menu(self):
         if self.installed:
             self.installed.context_menu()
@@ -140,7 +134,7 @@ class DownloadWidget(BaseBuildWidget):
         self.menu.trigger()
 
     def mouseDoubleClickEvent(self, _event):
-        if self.state != DownloadState.DOWNLOADING and not self.installed:
+        if self.state not in (DownloadState.DOWNLOADING, DownloadState.QUEUED) and not self.installed:
             self.init_downloader()
         elif self.installed:
             self.focus_installed()
@@ -162,14 +156,47 @@ class DownloadWidget(BaseBuildWidget):
             self.show_new = False
 
         assert self.parent.manager is not None
-        self.set_state(DownloadState.DOWNLOADING)
-        self.dl_task = DownloadTask(
-            manager=self.parent.manager,
-            link=self.build_info.link,
-        )
-        self.dl_task.progress.connect(self.progressBar.set_progress)
-        self.dl_task.finished.connect(self.init_extractor)
-        self.parent.task_queue.append(self.dl_task)
+        installer = BuildInstaller(self.parent, self.build_info)
+        self.attach(installer)
+        installer.start()
+
+    def attach(self, installer: BuildInstaller):
+        """Shows the progress of `installer`, which may have been running before this widget was drawn"""
+        self.installer = installer
+        installer.download_started.connect(self.download_started)
+        installer.progress.connect(self.progressBar.set_progress)
+        installer.rate.connect(self.progressBar.set_rate)
+        installer.stage_started.connect(self.stage_started)
+        installer.stage_finished.connect(self.stage_finished)
+        installer.installed.connect(self.download_finished)
+        installer.failed.connect(self.download_failed)
+
+        self.set_state(DownloadState.QUEUED)
+        if installer.transferring:
+            self.download_started()
+        elif installer.stage not in (None, "download"):
+            self.stage_started(installer.stage)
+
+    @pyqtSlot(str)
+    def stage_started(self, stage: str):
+        if stage == "extract":
+            self.set_state(DownloadState.EXTRACTING)
+        elif stage == "template":
+            self.progressBar.set_title("Copying data...")
+        elif stage == "probe":
+            self.set_state(DownloadState.READING)
+        elif stage == "rename":
+            self.set_state(DownloadState.RENAMING)
+
+    @pyqtSlot(str, float)
+    def stage_finished(self, stage: str, _seconds: float):
+        if stage == "extract":
+            self.build_state_widget.setExtract(False)
+
+    @pyqtSlot()
+    def download_started(self):
+        if self.state == DownloadState.QUEUED:
+            self.set_state(DownloadState.DOWNLOADING)
 
     def set_state(self, state: DownloadState):
         self.state = state
@@ -178,7 +205,15 @@ class DownloadWidget(BaseBuildWidget):
             self.cancelButton.hide()
             self.build_state_widget.setDownload(False)
             self.build_state_widget.setExtract(False)
-        if state == DownloadState.DOWNLOADING:
+        if state == DownloadState.QUEUED:
+            self.progressBar.set_progress(0, 0)
+            self.progressBar.set_title("Queued")
+            self.progressBar.show()
+            self.cancelButton.show()
+            self.cancelButton.setEnabled(True)
+            self.downloadButton.hide()
+            self.build_state_widget.setDownload()
+        elif state == DownloadState.DOWNLOADING:
             self.progressBar.set_title("Downloading")
             self.progressBar.show()
             self.cancelButton.show()
@@ -194,122 +229,30 @@ class DownloadWidget(BaseBuildWidget):
             self.progressBar.show()
         # elif state == DownloadState.RENAMING:
 
-    def init_extractor(self, source):
-        self.set_state(DownloadState.EXTRACTING)
-
-        library_folder = Path(get_library_folder())
-
-        if self.build_info.branch in ("stable", "lts"):
-            dist = library_folder / "stable"
-        elif self.build_info.branch == "daily":
-            dist = library_folder / "daily"
-        elif self.build_info.branch == "bforartists":
-            dist = library_folder / "bforartists"
-        else:
-            dist = library_folder / "experimental"
-
-        self.source_file = source
-        a = ExtractTask(file=source, destination=dist)
-        a.progress.connect(self.progressBar.set_progress)
-        a.finished.connect(self.init_template_installer)
-        self.parent.task_queue.append(a)
-
-    def init_template_installer(self, dist: Path):
-        self.build_state_widget.setExtract(False)
-        self.build_dir = dist
-
-        if get_install_template():
-            self.progressBar.set_title("Copying data...")
-            t = TemplateTask(destination=self.build_dir)
-            t.finished.connect(self.download_get_info)
-            self.parent.task_queue.append(t)
-        else:
-            self.download_get_info()
-
     def download_cancelled(self):
         self.item.setSelected(True)
         self.set_state(DownloadState.IDLE)
         self.cancelButton.hide()
         self.downloadButton.show()
-        if not self.parent.kill_thread_with_task(self.dl_task):  # killing failed
-            if self.dl_task in self.parent.task_queue:
-                self.parent.task_queue.remove(self.dl_task)
-            else:
-                # Task does not exist / finished in the
-                # microsecond between this function starting and now
-                ...
+        if self.installer is not None:
+            self.installer.cancel()
+            self.installer = None
 
         self.build_state_widget.setDownload(False)
 
-    def download_get_info(self):
-        self.set_state(DownloadState.READING)
-        if self.parent.platform == "Linux":
-            archive_name = Path(self.build_info.link).with_suffix("").stem
-        else:
-            archive_name = Path(self.build_info.link).stem
-
-        assert self.build_dir is not None
-
-        # If the returned version from the executable is invalid it might break loading.
-        ver_ = parse_blender_ver(self.build_dir.name, search=True)
-        ver = Version(
-            ver_.major,
-            ver_.minor,
-            ver_.patch,
-            prerelease=ver_.prerelease,
-        )
-
-        a = ReadBuildTask(
-            self.build_dir,
-            info=BuildInfo(
-                str(self.build_dir),
-                subversion=str(ver),
-                build_hash=None,
-                commit_time=self.build_info.commit_time,
-                branch=self.build_info.branch,
-                custom_executable=self.build_info.custom_executable,
-            ),
-            archive_name=archive_name,
-        )
-        a.finished.connect(self.download_rename)
-        a.failure.connect(lambda: print("Reading failed"))
-        self.parent.task_queue.append(a)
-
-    def download_rename(self, build_info: BuildInfo):
-        self.set_state(DownloadState.RENAMING)
-        new_name = f"blender-{build_info.full_semversion}"
-        assert self.build_dir is not None
-        t = RenameTask(
-            src=self.build_dir,
-            dst_name=new_name,
-        )
-        t.finished.connect(self.download_finished)
-        t.failure.connect(lambda: print("Renaming failed"))
-        self.parent.task_queue.append(t)
-
-    def download_finished(self, path):
+    @pyqtSlot(str, Exception)
+    def download_failed(self, _stage: str, _error: Exception):
+        # The worker reports the error itself, only reset the widget here
+        self.installer = None
         self.set_state(DownloadState.IDLE)
+        self.downloadButton.show()
 
-        if path is None:
-            path = self.build_dir
-
-        if path is not None:
-            widget = self.parent.draw_to_library(path, True)
-
-            assert self.source_file is not None
-            self.parent.clear_temp(self.source_file)
-
-            if self.build_info.branch == "bforartists":
-                message = f"Bforartists {self.subversionLabel.text()} {self.build_info.commit_time}"
-            else:
-                name = f"{self.subversionLabel.text()} {self.branchLabel.text} {self.build_info.commit_time}"
-                message = f"Blender {name}"
-            message += " download finished!"
-
-            self.parent.show_message(
-                message,
-                message_type=MessageType.DOWNLOADFINISHED,
-            )
+    @pyqtSlot(object)
+    def download_finished(self, widget: BaseBuildWidget | None):
+        # The installer draws the build to the library and notifies about it
+        self.installer = None
+        self.set_state(DownloadState.IDLE)
+        if widget is not None:
             self.setInstalled(widget)
 
     def setInstalled(self, build_widget: BaseBuildWidget):
@@ -32,6 +32,7 @@ class UnrecoBuildWidget(BaseBuildWidget):
             False,
             None,
         )
+        self.item.set_version(self.build_info.semversion)
 
         self.init_button = QPushButton("Initialize")
         self.init_button.setFixedWidth(85)
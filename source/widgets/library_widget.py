@@ -19,6 +19,7 @@ from modules.build_info import (
     WriteBuildTask,
     launch_build,
 )
+from modules.process_telemetry import build_record_info
 from modules.settings import (
     get_favorite_path,
     get_library_folder,
@@ -35,7 +36,7 @@ from PyQt5.QtGui import (
     QHoverEvent,
 )
 from PyQt5.QtWidgets import QAction, QApplication, QHBoxLayout, QLabel, QWidget
-from threads.observer import Observer
+from threads.process_monitor import ProcessGroup
 from threads.register import Register
 from threads.remover import RemovalTask
 from threads.template_installer import TemplateTask
@@ -66,6 +67,7 @@ class LibraryWidget(BaseBuildWidget):
         list_widget,
         show_new=False,
         parent_widget=None,
+        build_info: BuildInfo | None = None,
     ):
         super().__init__(parent=parent)
         self.setAcceptDrops(True)
@@ -80,7 +82,7 @@ class LibraryWidget(BaseBuildWidget):
         self.link = link
         self.list_widget = list_widget
         self.show_new = show_new
-        self.observer = None
+        self.processes: ProcessGroup | None = None
         self.build_info: BuildInfo | None = None
         self.child_widget = None
         self.parent_widget = parent_widget
@@ -102,7 +104,17 @@ class LibraryWidget(BaseBuildWidget):
         self.outer_layout.addWidget(self.layout_widget)
         self.setLayout(self.outer_layout)
 
-        if self.parent_widget is None:
+        if self.parent_widget is None and build_info is not None:
+            # Drawn from the startup snapshot, reading the build only checks that it did not change since
+            self.draw(build_info)
+
+            a = ReadBuildTask(link)
+            a.finished.connect(self.validate)
+            a.failure.connect(self.invalidate)
+
+            self.parent.task_queue.append(a)
+
+        elif self.parent_widget is None:
             self.setEnabled(False)
             self.infoLabel = QLabel("Loading build information...")
             self.infoLabel.setWordWrap(True)
@@ -131,6 +143,40 @@ class LibraryWidget(BaseBuildWidget):
         self.setEnabled(True)
         self.is_damaged = True
 
+    @pyqtSlot(BuildInfo)
+    def validate(self, build_info: BuildInfo):
+        if self.list_widget is None or self not in self.list_widget.widgets:
+            return
+        if self.build_info is not None and build_info.to_dict() == self.build_info.to_dict():
+            return
+        self.redraw(build_info)
+
+    @pyqtSlot()
+    def invalidate(self):
+        if self.list_widget is None or self not in self.list_widget.widgets:
+            return
+        if not Path(self.link).exists():
+            # Deleted since the snapshot was taken
+            self.parent.restored_library.pop(Path(self.link).as_posix(), None)
+            self.remove_from_list()
+            return
+        # Drawn again the usual way, which shows it as damaged
+        self.redraw()
+
+    def redraw(self, build_info: BuildInfo | None = None):
+        self.remove_from_list()
+        widget = self.parent.draw_to_library(Path(self.link), build_info=build_info)
+        # Until the library is scanned, the replacement stands in for this widget
+        key = Path(self.link).as_posix()
+        if widget is not None and key in self.parent.restored_library:
+            self.parent.restored_library[key] = widget
+
+    def remove_from_list(self):
+        if self.child_widget is not None:
+            self.parent.UserFavoritesListWidget.remove_item(self.child_widget.item)
+            self.child_widget = None
+        self.list_widget.remove_item(self.item)
+
     def draw(self, build_info: BuildInfo):
         if self.parent_widget is None:
             for i in reversed(range(self.layout.count())):
@@ -138,7 +184,8 @@ class LibraryWidget(BaseBuildWidget):
 
         self.build_info = build_info
         self.branch = self.build_info.branch
-        self.item.date = build_info.commit_time
+        self.item.set_build_info(build_info)
+        self.list_widget.index_widget(self)
 
         self.launchButton = LeftIconButtonWidget("Launch", parent=self)
         self.launchButton.setFixedWidth(85)
@@ -309,7 +356,7 @@ class LibraryWidget(BaseBuildWidget):
             self.add_to_quick_launch()
 
         self.setEnabled(True)
-        self.list_widget.sortItems()
+        self.list_widget.sort_soon()
 
         if self.build_info.is_favorite and self.parent_widget is None:
             self.add_to_favorites()
@@ -457,14 +504,15 @@ class LibraryWidget(BaseBuildWidget):
         proc = launch_build(self.build_info, exe, launch_mode=launch_mode)
 
         assert proc is not None
-        if self.observer is None:
-            self.observer = Observer(self)
-            self.observer.count_changed.connect(self.proc_count_changed)
-            self.observer.started.connect(self.observer_started)
-            self.observer.finished.connect(self.observer_finished)
-            self.observer.start()
+        if self.processes is None:
+            # Not parented, the monitor may still report on it while this widget is being deleted
+            self.processes = ProcessGroup()
+            self.processes.count_changed.connect(self.proc_count_changed)
+            self.processes.started.connect(self.observer_started)
+            self.processes.finished.connect(self.observer_finished)
+            self.processes.usage_changed.connect(self.usage_changed)
 
-        self.observer.append_proc.emit(proc)
+        self.parent.process_monitor.watch(proc, self.processes, str(self.link), build_record_info(self.build_info))
 
     def proc_count_changed(self, count):
         self.build_state_widget.setCount(count)
@@ -472,6 +520,12 @@ class LibraryWidget(BaseBuildWidget):
         if self.child_widget is not None:
             self.child_widget.proc_count_changed(count)
 
+    def usage_changed(self, usage: dict):
+        self.build_state_widget.setUsage(usage)
+
+        if self.child_widget is not None:
+            self.child_widget.usage_changed(usage)
+
     def observer_started(self):
         self.deleteAction.setEnabled(False)
         self.installTemplateAction.setEnabled(False)
@@ -480,8 +534,8 @@ class LibraryWidget(BaseBuildWidget):
             self.child_widget.observer_started()
 
     def observer_finished(self):
-        self.observer = None
         self.build_state_widget.setCount(0)
+        self.build_state_widget.setUsage(None)
         self.deleteAction.setEnabled(True)
         self.installTemplateAction.setEnabled(True)
 
@@ -502,9 +556,15 @@ class LibraryWidget(BaseBuildWidget):
         name = self.lineEdit.text().strip()
 
         if name:
-            self.branchLabel.set_text(name)
             self.build_info.custom_name = name
             self.write_build_info()
+            # The build is searchable by its custom name, in the favorites as well
+            for widget in (self, self.parent_widget, self.child_widget):
+                if widget is not None and widget.build_info is not None:
+                    widget.build_info.custom_name = name
+                    widget.branchLabel.set_text(name)
+                    if widget.list_widget is not None:
+                        widget.list_widget.index_widget(widget)
 
         self.branchLabel.show()
 
@@ -1,4 +1,8 @@
 from modules.settings import (
+    get_archive_cache_size,
+    get_archive_mirror,
+    get_download_bandwidth_limit,
+    get_max_concurrent_downloads,
     get_proxy_host,
     get_proxy_password,
     get_proxy_port,
@@ -7,6 +11,10 @@ from modules.settings import (
     get_use_custom_tls_certificates,
     get_user_id,
     proxy_types,
+    set_archive_cache_size,
+    set_archive_mirror,
+    set_download_bandwidth_limit,
+    set_max_concurrent_downloads,
     set_proxy_host,
     set_proxy_password,
     set_proxy_port,
@@ -17,7 +25,16 @@ from modules.settings import (
 )
 from PyQt5 import QtGui
 from PyQt5.QtCore import QRegExp, Qt
-from PyQt5.QtWidgets import QCheckBox, QComboBox, QFormLayout, QGridLayout, QHBoxLayout, QLabel, QLineEdit
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QFormLayout,
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QSpinBox,
+)
 from widgets.settings_form_widget import SettingsFormWidget
 
 from .settings_group import SettingsGroup
@@ -26,6 +43,7 @@ from .settings_group import SettingsGroup
 class ConnectionTabWidget(SettingsFormWidget):
     def __init__(self, parent=None):
         super().__init__(parent=parent)
+        self.parent = parent
 
         # Proxy Settings
         self.proxy_settings = SettingsGroup("Proxy", parent=self)
@@ -123,6 +141,66 @@ class ConnectionTabWidget(SettingsFormWidget):
         self.connection_authentication_layout.addWidget(self.UserIDLineEdit, 0, 1, 1, 1)
         self.connection_authentication_settings.setLayout(self.connection_authentication_layout)
 
+        # Downloads
+        self.downloads_settings = SettingsGroup("Downloads", parent=self)
+
+        # Max concurrent downloads
+        self.MaxConcurrentDownloadsSpinBox = QSpinBox()
+        self.MaxConcurrentDownloadsSpinBox.setToolTip(
+            "How many builds can be downloaded at the same time, the rest wait in line\
+            \nDEFAULT: 2"
+        )
+        self.MaxConcurrentDownloadsSpinBox.setRange(1, 16)
+        self.MaxConcurrentDownloadsSpinBox.setValue(get_max_concurrent_downloads())
+        self.MaxConcurrentDownloadsSpinBox.editingFinished.connect(self.update_max_concurrent_downloads)
+
+        # Bandwidth limit
+        self.BandwidthLimitSpinBox = QSpinBox()
+        self.BandwidthLimitSpinBox.setToolTip(
+            "Total download speed shared between all downloads, 0 is unlimited\
+            \nDEFAULT: 0"
+        )
+        self.BandwidthLimitSpinBox.setRange(0, 10_000_000)
+        self.BandwidthLimitSpinBox.setSuffix(" KiB/s")
+        self.BandwidthLimitSpinBox.setSpecialValueText("Unlimited")
+        self.BandwidthLimitSpinBox.setValue(get_download_bandwidth_limit())
+        self.BandwidthLimitSpinBox.editingFinished.connect(self.update_download_bandwidth_limit)
+
+        # Archive cache
+        self.ArchiveCacheSizeSpinBox = QSpinBox()
+        self.ArchiveCacheSizeSpinBox.setToolTip(
+            "Downloaded archives are kept up to this size, so reinstalling a build does not download it again\
+            \nDEFAULT: 2048 MiB"
+        )
+        self.ArchiveCacheSizeSpinBox.setRange(0, 1_000_000)
+        self.ArchiveCacheSizeSpinBox.setSuffix(" MiB")
+        self.ArchiveCacheSizeSpinBox.setSpecialValueText("Disabled")
+        self.ArchiveCacheSizeSpinBox.setValue(get_archive_cache_size())
+        self.ArchiveCacheSizeSpinBox.editingFinished.connect(self.update_archive_cache_size)
+
+        # Mirror
+        self.ArchiveMirrorLineEdit = QLineEdit()
+        self.ArchiveMirrorLineEdit.setText(get_archive_mirror())
+        self.ArchiveMirrorLineEdit.setPlaceholderText("Shared folder or http://host:port")
+        self.ArchiveMirrorLineEdit.setToolTip(
+            "A shared folder or HTTP server checked for archives before downloading them from the internet.\
+            \nArchives downloaded from the internet are copied to a shared folder mirror.\
+            \nDEFAULT: None"
+        )
+        self.ArchiveMirrorLineEdit.setContextMenuPolicy(Qt.ContextMenuPolicy.NoContextMenu)
+        self.ArchiveMirrorLineEdit.editingFinished.connect(self.update_archive_mirror)
+
+        self.downloads_layout = QGridLayout()
+        self.downloads_layout.addWidget(QLabel("Max Concurrent Downloads"), 0, 0, 1, 1)
+        self.downloads_layout.addWidget(self.MaxConcurrentDownloadsSpinBox, 0, 1, 1, 1)
+        self.downloads_layout.addWidget(QLabel("Bandwidth Limit"), 1, 0, 1, 1)
+        self.downloads_layout.addWidget(self.BandwidthLimitSpinBox, 1, 1, 1, 1)
+        self.downloads_layout.addWidget(QLabel("Archive Cache Size"), 2, 0, 1, 1)
+        self.downloads_layout.addWidget(self.ArchiveCacheSizeSpinBox, 2, 1, 1, 1)
+        self.downloads_layout.addWidget(QLabel("Mirror"), 3, 0, 1, 1)
+        self.downloads_layout.addWidget(self.ArchiveMirrorLineEdit, 3, 1, 1, 1)
+        self.downloads_settings.setLayout(self.downloads_layout)
+
         # Layout
         layout = QFormLayout()
         layout.addRow(self.UseCustomCertificatesCheckBox)
@@ -139,6 +217,7 @@ class ConnectionTabWidget(SettingsFormWidget):
 
         self.proxy_settings.setLayout(layout)
         self.addRow(self.proxy_settings)
+        self.addRow(self.downloads_settings)
 
     def toggle_use_custom_tls_certificates(self, is_checked):
         set_use_custom_tls_certificates(is_checked)
@@ -165,3 +244,21 @@ class ConnectionTabWidget(SettingsFormWidget):
     def update_user_id(self):
         user_id = self.UserIDLineEdit.text()
         set_user_id(user_id)
+
+    def update_max_concurrent_downloads(self):
+        v = self.MaxConcurrentDownloadsSpinBox.value()
+        set_max_concurrent_downloads(v)
+        self.parent.download_governor.set_max_concurrent(v)
+
+    def update_download_bandwidth_limit(self):
+        v = self.BandwidthLimitSpinBox.value()
+        set_download_bandwidth_limit(v)
+        self.parent.download_governor.set_bandwidth_limit(v * 1024)
+
+    def update_archive_cache_size(self):
+        v = self.ArchiveCacheSizeSpinBox.value()
+        set_archive_cache_size(v)
+        self.parent.archive_cache.set_budget(v * 1024 * 1024)
+
+    def update_archive_mirror(self):
+        set_archive_mirror(self.ArchiveMirrorLineEdit.text())
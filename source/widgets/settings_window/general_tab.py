@@ -1,26 +1,31 @@
 from __future__ import annotations
 
-import os
 import sys
 from pathlib import Path
 
+from modules._platform import process_telemetry_path
+from modules.process_telemetry import export_telemetry_csv
 from modules.settings import (
     get_actual_library_folder,
     get_config_file,
     get_cwd,
+    get_extract_in_process,
     get_launch_minimized_to_tray,
     get_launch_timer_duration,
     get_launch_when_system_starts,
     get_library_folder,
     get_platform,
+    get_record_process_telemetry,
     get_show_tray_icon,
     get_use_pre_release_builds,
     get_worker_thread_count,
     migrate_config,
+    set_extract_in_process,
     set_launch_minimized_to_tray,
     set_launch_timer_duration,
     set_launch_when_system_starts,
     set_library_folder,
+    set_record_process_telemetry,
     set_show_tray_icon,
     set_use_pre_release_builds,
     set_worker_thread_count,
@@ -95,27 +100,39 @@ class GeneralTabWidget(SettingsFormWidget):
 
         # Worker thread count
         self.WorkerThreadCountBox = QLabel()
-        self.WorkerThreadCountBox.setText("Worker Thread Count")
+        self.WorkerThreadCountBox.setText("Max Worker Threads")
         self.WorkerThreadCount = QSpinBox()
         self.WorkerThreadCount.setToolTip(
             "Determines how many IO operations can be done at once, ex. Downloading, deleting, and extracting files\
+            \nThreads are started when needed and stopped once idle, CPU heavy work never uses more threads than the CPU count\
             \nDEFAULT: cpu_count * (3/4)"
         )
         self.WorkerThreadCount.editingFinished.connect(self.set_worker_thread_count)
         self.WorkerThreadCount.setMinimum(1)
         self.WorkerThreadCount.setValue(get_worker_thread_count())
 
-        # Warn if thread count exceeds cpu count
-        cpu_count = os.cpu_count()
-        if cpu_count is not None:
-
-            def warn_values_above_cpu(v: int):
-                if v > cpu_count:
-                    self.WorkerThreadCount.setSuffix(f" (warning: value above {cpu_count} (cpu count) !!)")
-                else:
-                    self.WorkerThreadCount.setSuffix("")
+        # Extract in a separate process
+        self.ExtractInProcessCheckBox = QCheckBox()
+        self.ExtractInProcessCheckBox.setText("Extract Builds in a Separate Process")
+        self.ExtractInProcessCheckBox.setChecked(get_extract_in_process())
+        self.ExtractInProcessCheckBox.clicked.connect(self.toggle_extract_in_process)
+        self.ExtractInProcessCheckBox.setToolTip(
+            "Decompress downloaded builds in a background process, so the window stays responsive while installing\
+            \nDEFAULT: On"
+        )
 
-            self.WorkerThreadCount.valueChanged.connect(warn_values_above_cpu)
+        # Resource usage of launched builds
+        self.RecordTelemetryCheckBox = QCheckBox()
+        self.RecordTelemetryCheckBox.setText("Record Resource Usage of Launched Builds")
+        self.RecordTelemetryCheckBox.setChecked(get_record_process_telemetry())
+        self.RecordTelemetryCheckBox.clicked.connect(self.toggle_record_process_telemetry)
+        self.RecordTelemetryCheckBox.setToolTip(
+            "Sample the CPU, memory and disk usage of running builds, shown when hovering their process count\
+            \nA summary of every session is logged, and can be exported to compare builds\
+            \nDEFAULT: On"
+        )
+        self.ExportTelemetryButton = QPushButton("Export Resource Usage Log")
+        self.ExportTelemetryButton.clicked.connect(self.export_telemetry)
 
         # Pre-release builds
         self.PreReleaseBuildsCheckBox = QCheckBox()
@@ -138,7 +155,10 @@ class GeneralTabWidget(SettingsFormWidget):
         self.application_layout.addWidget(self.LaunchMinimizedToTrayCheckBox, 4, 0, 1, 1)
         self.application_layout.addWidget(self.WorkerThreadCountBox, 5, 0, 1, 1)
         self.application_layout.addWidget(self.WorkerThreadCount, 5, 1, 1, 2)
-        self.application_layout.addWidget(self.PreReleaseBuildsCheckBox, 6, 0, 1, 1)
+        self.application_layout.addWidget(self.ExtractInProcessCheckBox, 6, 0, 1, 1)
+        self.application_layout.addWidget(self.RecordTelemetryCheckBox, 7, 0, 1, 1)
+        self.application_layout.addWidget(self.ExportTelemetryButton, 7, 1, 1, 2)
+        self.application_layout.addWidget(self.PreReleaseBuildsCheckBox, 8, 0, 1, 1)
         self.application_settings.setLayout(self.application_layout)
 
         self.addRow(self.application_settings)
@@ -247,6 +267,20 @@ class GeneralTabWidget(SettingsFormWidget):
     def set_worker_thread_count(self):
         set_worker_thread_count(self.WorkerThreadCount.value())
 
+    def toggle_extract_in_process(self, is_checked):
+        set_extract_in_process(is_checked)
+
+    def toggle_record_process_telemetry(self, is_checked):
+        set_record_process_telemetry(is_checked)
+        self.parent.process_telemetry.enabled = is_checked
+
+    def export_telemetry(self):
+        file_place = FileDialogWindow().get_save_filename(
+            parent=self, title="Export resource usage log", directory=str(Path.home() / "blender_usage.csv")
+        )
+        if file_place[0]:
+            export_telemetry_csv(process_telemetry_path(), Path(file_place[0]))
+
     def set_launch_timer_duration(self):
         if self.launch_timer_duration.value() == -1:
             self.launch_timer_duration.setSuffix(" (Disabled)")
@@ -36,6 +36,8 @@ from windows.base_window import BaseWindow
 if TYPE_CHECKING:
     from datetime import datetime
 
+    from semver import Version
+
 logger = logging.getLogger()
 
 
@@ -64,9 +66,17 @@ class LaunchingWindow(BaseWindow):
         self.open_last = open_last
 
         # Get all available versions of Blender
+        # Keyed by link, copies of a build share their BBI
         self.builds: dict[str, BuildInfo] = {}
-        self.list_items: dict[BBI, EnablableListWidgetItem] = {}
-        self.label_elements: dict[BBI, tuple[str, str, str, str]] = {}
+        self.list_items: dict[str, EnablableListWidgetItem] = {}
+        self.label_elements: dict[str, tuple[str, str, str, str]] = {}
+        self.basic_infos: dict[str, BBI] = {}
+        # Built once the builds are read, and again if more are found
+        self.matcher: BInfoMatcher | None = None
+        self.builds_by_version: dict[Version, list[str]] = {}
+        self.query_matches: dict[VersionSearchQuery, tuple[BBI, ...]] = {}
+        self.enabled_versions: set[Version] = set()
+        self.label_widths: dict[str, float] = {}
         self.drawing_task = DrawLibraryTask()
         self.drawing_task.found.connect(self._build_found)
         self.drawing_task.finished.connect(self.search_finished)
@@ -218,7 +228,7 @@ class LaunchingWindow(BaseWindow):
     def update_query_boxes(self, query: VersionSearchQuery):
         logger.debug("Updating query boxes...")
 
-        self.version_query_edit.setText(f"{query.major}.{query.minor}.{query.patch}")
+        self.version_query_edit.setText(f"{query.major}.{query.minor}.{query.patch}{query.bounds_str()}")
         self.branch_edit.setText(query.branch or "")
         self.build_hash_edit.setText(query.build_hash or "")
         if query.commit_time == "^":
@@ -231,8 +241,7 @@ class LaunchingWindow(BaseWindow):
     def set_query_from_selected_build(self):
         items = self.builds_list.selectedItems()
         if len(items) == 1:  # get build info from the item and set it as the query
-            text = items[0].text()
-            build = self.builds[text]
+            build = items[0].build
             version = build.full_semversion
 
             vsq = VersionSearchQuery(
@@ -266,11 +275,12 @@ class LaunchingWindow(BaseWindow):
                     parent=self.builds_list,
                 )
                 item.setText(combined_url)
-                basic_info = BBI.from_buildinfo(info)
 
-                self.builds[combined_url] = info
-                self.list_items[basic_info] = item
-                self.label_elements[basic_info] = semversion
+                self.builds[info.link] = info
+                self.list_items[info.link] = item
+                self.label_elements[info.link] = semversion
+                self.basic_infos[info.link] = BBI.from_buildinfo(info)
+                self.matcher = None
 
     @staticmethod
     def __version_url(info: BuildInfo) -> tuple[str, str, str, str]:
@@ -309,12 +319,15 @@ class LaunchingWindow(BaseWindow):
         target_dtime = 0
         metrics = QFontMetricsF(self.__disabled_font)
 
+        # Builds share most of their labels, each is only measured once
         def sizeof(s):
-            return metrics.size(Qt.TextFlag.TextSingleLine, s).width()
+            width = self.label_widths.get(s)
+            if width is None:
+                width = self.label_widths[s] = metrics.size(Qt.TextFlag.TextSingleLine, s).width()
+            return width
 
         size_of_space = sizeof(" ")
-        for build in self.list_items:
-            p, v, b, dtime = self.label_elements[build]
+        for p, v, b, dtime in self.label_elements.values():
             target_p_len = max(target_p_len, sizeof(p))
             target_v_len = max(target_v_len, sizeof(v))
             target_b_len = max(target_b_len, sizeof(b))
@@ -329,17 +342,8 @@ class LaunchingWindow(BaseWindow):
             num_of_spaces_d = int(max(0, target_dtime - sizeof(dtime)) // size_of_space)
             return f"{p}{' ' * num_of_spaces_p} {v}{' ' * num_of_spaces_v} {b}{' ' * num_of_spaces_b} {dtime}{' ' * num_of_spaces_d}"
 
-        # rebuild the dictionaries and format the text
-        for build, item in self.list_items.copy().items():
-            build = self.builds.pop(item.text())
-            basic_info = BBI.from_buildinfo(build)
-
-            p, v, b, dtime = self.label_elements.pop(basic_info)
-
-            new_text = formatter(p, v, b, dtime)
-            item.setText(new_text)
-            self.builds[new_text] = build
-            self.label_elements[basic_info] = (p, v, b, dtime)
+        for link, item in self.list_items.items():
+            item.setText(formatter(*self.label_elements[link]))
 
     @pyqtSlot()
     def search_finished(self):
@@ -348,13 +352,15 @@ class LaunchingWindow(BaseWindow):
         self.repad_list()
 
         # Use quick launch if it exists
-        if self.version_query is None and self.blendfile is None and (path := get_favorite_path()):
-            for build in self.builds.values():
-                if build.link == path:
-                    self.list_items[BBI.from_buildinfo(build)].setSelected(True)
-                    self.set_query_from_selected_build()
+        if (
+            self.version_query is None
+            and self.blendfile is None
+            and (item := self.list_items.get(get_favorite_path())) is not None
+        ):
+            item.setSelected(True)
+            self.set_query_from_selected_build()
 
-        self.matcher = self.make_matcher()
+        self.index_builds()
 
         all_queries = get_version_specific_queries()
 
@@ -392,39 +398,62 @@ class LaunchingWindow(BaseWindow):
         if self.launch_timer_duration != -1 and len(matches) == 1:
             self.ready = True
             build = builds[0]
-            self.list_items[BBI.from_buildinfo(build)].setSelected(True)
+            self.list_items[build.link].setSelected(True)
 
             if self.launch_timer_duration == 0:  # launch immediately
                 self.actually_launch(build)
             else:
                 self.prepare_launch(build)
 
-    def make_matcher(self):
-        return BInfoMatcher(tuple(map(BBI.from_buildinfo, self.builds.values())))
+    def index_builds(self):
+        """Builds the matcher and the lookups every search uses, once for the builds found"""
+        self.matcher = BInfoMatcher(tuple(self.basic_infos.values()))
+        self.builds_by_version = {}
+        for link, basic_info in self.basic_infos.items():
+            self.builds_by_version.setdefault(basic_info.version, []).append(link)
+        self.query_matches.clear()
+        # Every item starts enabled
+        self.enabled_versions = set(self.builds_by_version)
+        for item in self.list_items.values():
+            item.enabled = True
+        self.builds_list.sortItems(Qt.SortOrder.DescendingOrder)
 
     def update_search(self) -> tuple[tuple[BBI, ...], list[BuildInfo]]:
         """Updates the visibility of each item in the list depending on the search query. returns matches"""
         assert self.version_query is not None
         logger.debug(f"QUERY: {self.version_query!r}")
-        matcher = self.make_matcher()
-        matches = matcher.match(self.version_query)
+        if not self.builds:
+            self.launch_button.setEnabled(False)
+            return (), []
+        if self.matcher is None:
+            self.index_builds()
+        assert self.matcher is not None
+
+        # Edits often come back to an earlier query
+        matches = self.query_matches.get(self.version_query)
+        if matches is None:
+            matches = self.matcher.match(self.version_query)
+            # Bounds relative to now match differently later
+            if not self.version_query.is_relative:
+                self.query_matches[self.version_query] = matches
         versions = {b.version for b in matches}
 
-        enabled_builds: list[BuildInfo] = []
-
-        for build in self.builds.values():
-            item = self.list_items[BBI.from_buildinfo(build)]
+        # Only the items of the versions that changed are touched
+        changed = versions ^ self.enabled_versions
+        for version in changed:
+            for link in self.builds_by_version[version]:
+                self.list_items[link].enabled = version in versions
+        self.enabled_versions = versions
 
-            item.enabled = build.full_semversion in versions
-            if item.enabled:
-                enabled_builds.append(build)
+        enabled_builds = [self.builds[link] for v in versions for link in self.builds_by_version[v]]
 
         if len(versions) != 1:
             self.launch_button.setEnabled(False)
         else:
             self.launch_button.setEnabled(True)
 
-        self.builds_list.sortItems(Qt.SortOrder.DescendingOrder)
+        if changed:
+            self.builds_list.sortItems(Qt.SortOrder.DescendingOrder)
 
         return matches, enabled_builds
 
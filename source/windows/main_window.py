@@ -9,24 +9,43 @@ import sys
 import webbrowser
 from datetime import datetime, timezone
 from enum import Enum
-from functools import partial
+from functools import cache, partial
 from pathlib import Path
 from platform import version
 from time import localtime, mktime, strftime
 from typing import TYPE_CHECKING
 
 from items.base_list_widget_item import BaseListWidgetItem
-from modules._platform import _popen, get_cwd, get_launcher_name, get_platform, is_frozen
+from items.build_list_item import BuildListItem
+from modules._platform import (
+    _popen,
+    archive_cache_path,
+    get_cwd,
+    get_launcher_name,
+    get_platform,
+    install_journal_path,
+    is_frozen,
+    process_telemetry_path,
+    startup_snapshot_path,
+    task_metrics_path,
+)
 from modules._resources_rc import RESOURCES_AVAILABLE
+from modules.archive_cache import ArchiveCache
+from modules.build_info import BuildIndex
 from modules.connection_manager import ConnectionManager
+from modules.download_governor import DownloadGovernor
 from modules.enums import MessageType
+from modules.install_journal import InstallJournal
+from modules.process_telemetry import ProcessTelemetry
 from modules.settings import (
     create_library_folders,
+    get_archive_cache_size,
     get_check_for_new_builds_on_startup,
     get_default_downloads_page,
     get_default_library_page,
     get_default_tab,
     get_dont_show_resource_warning,
+    get_download_bandwidth_limit,
     get_enable_download_notifications,
     get_enable_new_builds_notifications,
     get_enable_quick_launch_key_seq,
@@ -34,8 +53,10 @@ from modules.settings import (
     get_launch_minimized_to_tray,
     get_library_folder,
     get_make_error_popup,
+    get_max_concurrent_downloads,
     get_proxy_type,
     get_quick_launch_key_seq,
+    get_record_process_telemetry,
     get_scrape_automated_builds,
     get_scrape_bfa_builds,
     get_scrape_stable_builds,
@@ -51,8 +72,9 @@ from modules.settings import (
     set_library_folder,
     set_tray_icon_notified,
 )
+from modules.startup_snapshot import StartupSnapshot, read_snapshot, write_snapshot
 from modules.tasks import Task, TaskQueue, TaskWorker
-from PyQt5.QtCore import QSize, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QSize, Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtNetwork import QLocalServer
 from PyQt5.QtWidgets import (
     QAction,
@@ -67,14 +89,16 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 from semver import Version
+from threads.installer import BuildInstaller
 from threads.library_drawer import DrawLibraryTask
+from threads.process_monitor import ProcessMonitor
 from threads.remover import RemovalTask
 from threads.scraper import Scraper
 from widgets.base_menu_widget import BaseMenuWidget
 from widgets.base_page_widget import BasePageWidget
 from widgets.base_tool_box_widget import BaseToolBoxWidget
 from widgets.datetime_widget import DATETIME_FORMAT
-from widgets.download_widget import DownloadState, DownloadWidget
+from widgets.download_widget import DownloadState
 from widgets.foreign_build_widget import UnrecoBuildWidget
 from widgets.header import WHeaderButton, WindowHeader
 from widgets.library_widget import LibraryWidget
@@ -83,13 +107,16 @@ from windows.dialog_window import DialogIcon, DialogWindow
 from windows.file_dialog_window import FileDialogWindow
 from windows.settings_window import SettingsWindow
 
-try:
-    from pynput import keyboard
 
-    HOTKEYS_AVAILABLE = True
-except Exception as e:
-    logging.error(f"Error importing pynput: {e}\nGlobal hotkeys not supported.")
-    HOTKEYS_AVAILABLE = False
+@cache
+def hotkeys_module():
+    """pynput.keyboard, imported when global hotkeys are first set up. None if it cannot be used"""
+    try:
+        from pynput import keyboard
+    except Exception as e:
+        logging.error(f"Error importing pynput: {e}\nGlobal hotkeys not supported.")
+        return None
+    return keyboard
 
 
 if TYPE_CHECKING:
@@ -103,6 +130,9 @@ if get_platform() == "Windows":
 
 logger = logging.getLogger()
 
+# Builds of the startup snapshot drawn per turn of the event loop
+RESTORE_BATCH_SIZE = 20
+
 
 class AppState(Enum):
     IDLE = 1
@@ -135,11 +165,27 @@ class BlenderLauncher(BaseWindow):
         # task queue
         self.task_queue = TaskQueue(
             worker_count=get_worker_thread_count(),
+            # The pool grows on demand, and shrinks back once idle
+            min_workers=1,
             parent=self,
             on_spawn=self.on_worker_creation,
         )
         self.task_queue.start()
         self.quit_signal.connect(self.task_queue.fullstop)
+        self.download_governor = DownloadGovernor(
+            self.task_queue,
+            max_concurrent=get_max_concurrent_downloads(),
+            bandwidth_limit=get_download_bandwidth_limit() * 1024,
+            parent=self,
+        )
+        self.archive_cache = ArchiveCache(archive_cache_path(), get_archive_cache_size() * 1024 * 1024)
+        self.install_journal = InstallJournal(install_journal_path())
+        # Watches every launched build, started on the first launch
+        self.process_telemetry = ProcessTelemetry(process_telemetry_path(), enabled=get_record_process_telemetry())
+        self.process_monitor = ProcessMonitor(self.process_telemetry, parent=self)
+        self.quit_signal.connect(self.process_monitor.stop)
+        # link -> running install, DownloadWidgets attach to these when drawn
+        self.installers: dict[str, BuildInstaller] = {}
 
         # Global scope
         self.app = app
@@ -149,7 +195,7 @@ class BlenderLauncher(BaseWindow):
         self.status = "Unknown"
         self.is_force_check_on = False
         self.app_state = AppState.IDLE
-        self.cashed_builds = []
+        self.cashed_builds: BuildIndex[BuildInfo] = BuildIndex()
         self.notification_pool = []
         self.windows = [self]
         self.timer = None
@@ -160,6 +206,16 @@ class BlenderLauncher(BaseWindow):
         self.settings_window = None
         self.hk_listener = None
         self.last_time_checked = get_last_time_checked_utc()
+        # Drawn by the first draw of the library
+        self.startup_snapshot = read_snapshot(startup_snapshot_path())
+        # Build folder -> build of the snapshot still to be drawn, newest first
+        self.unrestored_library: dict[str, BuildInfo] = {}
+        # Build folder -> widget drawn from the snapshot, until the library drawer finds the folder
+        self.restored_library: dict[str, LibraryWidget] = {}
+        self.restored_downloads = False
+        # Build folders drawn since the library was last cleared. A reload joining a running drawer gets
+        # the builds it already found replayed, and some of them may still be queued to arrive
+        self.drawn_library: set[str] = set()
 
         if self.platform == "macOS":
             self.app.aboutToQuit.connect(self._aboutToQuit)
@@ -376,6 +432,7 @@ class BlenderLauncher(BaseWindow):
             page_name="DownloadsStableListWidget",
             time_label="Upload Time",
             info_text="No new builds available",
+            virtual_list=True,
         )
         self.DownloadsStableListWidget = self.DownloadsToolBox.add_page_widget(self.DownloadsStablePageWidget, "Stable")
 
@@ -384,6 +441,7 @@ class BlenderLauncher(BaseWindow):
             page_name="DownloadsDailyListWidget",
             time_label="Upload Time",
             info_text="No new builds available",
+            virtual_list=True,
         )
         self.DownloadsDailyListWidget = self.DownloadsToolBox.add_page_widget(self.DownloadsDailyPageWidget, "Daily")
 
@@ -392,6 +450,7 @@ class BlenderLauncher(BaseWindow):
             page_name="DownloadsExperimentalListWidget",
             time_label="Upload Time",
             info_text="No new builds available",
+            virtual_list=True,
         )
         self.DownloadsExperimentalListWidget = self.DownloadsToolBox.add_page_widget(
             self.DownloadsExperimentalPageWidget, "Experimental"
@@ -402,6 +461,7 @@ class BlenderLauncher(BaseWindow):
             page_name="DownloadsBFAListWidget",
             time_label="Upload Time",
             info_text="No new builds available",
+            virtual_list=True,
         )
         self.DownloadsBFAListWidget = self.DownloadsToolBox.add_page_widget(self.DownloadsBFAPageWidget, "Bforartists")
 
@@ -454,6 +514,7 @@ class BlenderLauncher(BaseWindow):
 
         # Draw library
         self.draw_library()
+        self.resume_installs()
 
         # Setup tray icon context Menu
         quit_action = QAction("Quit", self)
@@ -518,7 +579,8 @@ class BlenderLauncher(BaseWindow):
     def setup_global_hotkeys_listener(self):
         if self.hk_listener is not None:
             self.hk_listener.stop()
-        if HOTKEYS_AVAILABLE:
+        keyboard = hotkeys_module()
+        if keyboard is not None:
             key_seq = get_quick_launch_key_seq()
             keys = key_seq.split("+")
 
@@ -705,11 +767,12 @@ class BlenderLauncher(BaseWindow):
 
     def kill_thread_with_task(self, task: Task):
         """
-        Kills a thread listener using the current action.
+        Cancels a task, whether it is still queued or already running.
+        A running task stops at its next cancellation point and its worker stays alive.
 
         Parameters
         ----------
-        action : Action
+        task : Task
 
 
         Returns
@@ -717,14 +780,12 @@ class BlenderLauncher(BaseWindow):
         bool
             success.
         """
-        thread = self.task_queue.thread_with_task(task)
-        if thread is not None:
-            thread.fullstop()
-            return True
-        return False
+        return self.task_queue.cancel(task)
 
     def destroy(self):
+        self.save_snapshot()
         self.quit_signal.emit()
+        self.task_queue.metrics.dump(task_metrics_path())
 
         if self.timer is not None:
             self.timer.cancel()
@@ -758,22 +819,88 @@ class BlenderLauncher(BaseWindow):
         self.LibraryExperimentalListWidget.clear_()
         self.LibraryBFAListWidget.clear_()
         self.UserCustomListWidget.clear_()
+        self.unrestored_library.clear()
+        self.restored_library.clear()
+        self.drawn_library.clear()
+
+        snapshot, self.startup_snapshot = self.startup_snapshot, None
+        if snapshot is not None and not clear:
+            self.restore_snapshot(snapshot)
 
         self.library_drawer = DrawLibraryTask()
-        self.library_drawer.found.connect(self.draw_to_library)
+        self.library_drawer.found.connect(self.draw_found)
         self.library_drawer.unrecognized.connect(self.draw_unrecognized)
+        self.library_drawer.finished.connect(self.library_drawn)
         if not self.offline:
             self.library_drawer.finished.connect(self.draw_downloads)
 
-        self.task_queue.append(self.library_drawer)
+        # Every drawer is wired to the same slots, a reload pressed again before the last one started merges into it
+        self.library_drawer = self.task_queue.append(self.library_drawer, attach=False)
+
+    def restore_snapshot(self, snapshot: StartupSnapshot):
+        """Draws the library and downloads as they were when the launcher quit, until they are read and scraped again"""
+        if snapshot.library_folder != Path(get_library_folder()).as_posix():
+            return
+
+        builds = sorted(snapshot.library_builds(), key=lambda b: b[1].commit_time, reverse=True)
+        self.unrestored_library = {path.as_posix(): build_info for path, build_info in builds}
+        self.restore_library_batch()
+
+        if not self.offline:
+            for build_info in snapshot.download_builds():
+                self.draw_to_downloads(build_info)
+            self.restored_downloads = True
+
+    def restore_library_batch(self):
+        # Large libraries are drawn a few builds at a time, the window stays responsive in between
+        for key in list(self.unrestored_library)[:RESTORE_BATCH_SIZE]:
+            build_info = self.unrestored_library.pop(key)
+            widget = self.draw_to_library(Path(key), build_info=build_info)
+            if widget is not None:
+                self.restored_library[key] = widget
+
+        if self.unrestored_library:
+            QTimer.singleShot(0, self.restore_library_batch)
+
+    def save_snapshot(self):
+        if is_library_folder_valid() is False or not hasattr(self, "LibraryToolBox"):
+            return
+
+        snapshot = StartupSnapshot(Path(get_library_folder()).as_posix())
+        for list_widget in self.LibraryToolBox.list_widgets:
+            for widget in list_widget.widgets:
+                if isinstance(widget, LibraryWidget) and widget.build_info is not None and not widget.is_damaged:
+                    snapshot.add_library_build(widget.link, widget.build_info)
+        for list_widget in self.DownloadsToolBox.list_widgets:
+            for item in list_widget.items():
+                snapshot.add_download(item.build_info)
+        write_snapshot(startup_snapshot_path(), snapshot)
+
+    def draw_found(self, path: Path):
+        key = Path(path).as_posix()
+        if key in self.drawn_library:
+            return
+        self.drawn_library.add(key)
+        # Builds drawn from the snapshot check themselves against the disk
+        if self.restored_library.pop(key, None) is None:
+            self.draw_to_library(path, build_info=self.unrestored_library.pop(key, None))
+
+    def library_drawn(self):
+        # Whatever is left of the snapshot is no longer in the library
+        self.unrestored_library.clear()
+        for widget in self.restored_library.values():
+            if widget.list_widget is not None and widget in widget.list_widget.widgets:
+                widget.remove_from_list()
+        self.restored_library.clear()
 
     def reload_custom_builds(self):
         self.UserCustomListWidget.clear_()
+        self.drawn_library = {key for key in self.drawn_library if Path(key).parent.name != "custom"}
 
         self.library_drawer = DrawLibraryTask(["custom"])
-        self.library_drawer.found.connect(self.draw_to_library)
+        self.library_drawer.found.connect(self.draw_found)
         self.library_drawer.unrecognized.connect(self.draw_unrecognized)
-        self.task_queue.append(self.library_drawer)
+        self.library_drawer = self.task_queue.append(self.library_drawer, attach=False)
 
     def draw_downloads(self):
         if get_check_for_new_builds_on_startup():
@@ -835,10 +962,13 @@ class BlenderLauncher(BaseWindow):
             self.DownloadsBFAPageWidget.set_info_label_text("Checking for Bforartists builds is disabled")
 
         # Sometimes these builds end up being invalid, particularly when new builds are available, which, there usually
-        # are at least once every two days. They are so easily gathered there's little loss here
-        self.DownloadsDailyListWidget.clear_()
-        self.DownloadsExperimentalListWidget.clear_()
-        self.DownloadsBFAListWidget.clear_()
+        # are at least once every two days. They are so easily gathered there's little loss here.
+        # Builds drawn from the snapshot stay up while checking, those the scraper does not find are removed after
+        if not self.restored_downloads:
+            self.DownloadsDailyListWidget.clear_()
+            self.DownloadsExperimentalListWidget.clear_()
+            self.DownloadsBFAListWidget.clear_()
+        self.restored_downloads = False
 
         self.cashed_builds.clear()
         self.new_downloads = False
@@ -854,10 +984,12 @@ class BlenderLauncher(BaseWindow):
         if self.new_downloads:
             self.show_message("New builds of Blender are available!", message_type=MessageType.NEWBUILDS)
 
-        for list_widget in self.DownloadsToolBox.list_widgets:
-            for widget in list_widget.widgets.copy():
-                if widget.build_info not in self.cashed_builds:
-                    widget.destroy()
+        # Unless the check failed, then what is drawn is the best there is
+        if self.app_state == AppState.CHECKINGBUILDS:
+            for list_widget in self.DownloadsToolBox.list_widgets:
+                list_widget.remove_items(
+                    {widget for widget in list_widget.widgets if widget.build_info not in self.cashed_builds}
+                )
 
         utcnow = localtime()
         dt = datetime.fromtimestamp(mktime(utcnow)).astimezone()
@@ -878,10 +1010,9 @@ class BlenderLauncher(BaseWindow):
 
     def draw_from_cashed(self, build_info):
         if self.app_state == AppState.IDLE:
-            for cashed_build in self.cashed_builds:
-                if build_info == cashed_build:
-                    self.draw_to_downloads(cashed_build)
-                    return
+            cashed_build = self.cashed_builds.find(build_info)
+            if cashed_build is not None:
+                self.draw_to_downloads(cashed_build)
 
     def draw_to_downloads(self, build_info: BuildInfo):
         if self.started and build_info.commit_time < self.last_time_checked:
@@ -890,7 +1021,7 @@ class BlenderLauncher(BaseWindow):
             is_new = True
 
         if build_info not in self.cashed_builds:
-            self.cashed_builds.append(build_info)
+            self.cashed_builds.add(build_info)
 
         branch = build_info.branch
 
@@ -907,23 +1038,23 @@ class BlenderLauncher(BaseWindow):
             downloads_list_widget = self.DownloadsExperimentalListWidget
             library_list_widget = self.LibraryExperimentalListWidget
 
-        if not downloads_list_widget.contains_build_info(build_info):
+        drawn = downloads_list_widget.widget_with_blinfo(build_info)
+        if drawn is not None and drawn.build_info.link != build_info.link and drawn.state == DownloadState.IDLE:
+            # Drawn from the snapshot, and moved since
+            drawn.destroy()
+            drawn = None
+
+        if drawn is None:
             installed = library_list_widget.widget_with_blinfo(build_info)
-            item = BaseListWidgetItem(build_info.commit_time)
-            widget = DownloadWidget(
-                self,
-                downloads_list_widget,
-                item,
-                build_info,
-                installed=installed,
-                show_new=is_new,
-            )
-            widget.focus_installed_widget.connect(self.focus_widget)
-            downloads_list_widget.add_item(item, widget)
+            item = BuildListItem(downloads_list_widget, build_info, installed=installed, show_new=is_new)
+            downloads_list_widget.add_item(item)
             if is_new:
                 self.new_downloads = True
 
-    def draw_to_library(self, path: Path, show_new=False):
+    def draw_to_library(self, path: Path, show_new=False, build_info: BuildInfo | None = None):
+        if self.install_journal.claims(Path(path)):
+            return None
+
         branch = Path(path).parent.name
 
         if branch in ("stable", "lts"):
@@ -945,21 +1076,31 @@ class BlenderLauncher(BaseWindow):
             return None
 
         item = BaseListWidgetItem()
-        widget = LibraryWidget(self, item, path, library, show_new)
+        widget = LibraryWidget(self, item, path, library, show_new, build_info=build_info)
 
         if download is not None:
 
             def _initialized():
-                dlw: DownloadWidget | None = download.widget_with_blinfo(widget.build_info)
+                dlw: BuildListItem | None = download.widget_with_blinfo(widget.build_info)
                 if dlw is not None and not dlw.installed:
                     dlw.setInstalled(widget)
 
             widget.initialized.connect(_initialized)
+            if widget.build_info is not None:
+                # Drawn from a known build, it was initialized before it could be connected
+                _initialized()
 
         library.insert_item(item, widget)
         return widget
 
     def draw_unrecognized(self, path):
+        if self.install_journal.claims(Path(path)):
+            return
+        key = Path(path).as_posix()
+        if key in self.drawn_library:
+            return
+        self.drawn_library.add(key)
+
         branch = Path(path).parent.name
 
         if branch in ("stable", "lts"):
@@ -1030,6 +1171,13 @@ class BlenderLauncher(BaseWindow):
     def show_settings_window(self):
         self.settings_window = SettingsWindow(parent=self)
 
+    def resume_installs(self):
+        """Picks up the installs the launcher was stopped in the middle of, or rolls them back"""
+        for entry in self.install_journal.pending():
+            installer = BuildInstaller.resume(self, entry)
+            if installer is not None:
+                installer.start()
+
     def clear_temp(self, path=None):
         if path is None:
             path = Path(get_library_folder()) / ".temp"
@@ -4,8 +4,8 @@ import json
 import os
 from typing import TypedDict
 
-import distro
 from modules._platform import _popen, get_cwd, get_platform
+from modules.lazy_import import lazy_import
 from modules.tasks import TaskQueue
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
@@ -15,6 +15,8 @@ from threads.scraper import get_release_tag
 from widgets.base_progress_bar_widget import BaseProgressBarWidget
 from windows.base_window import BaseWindow
 
+distro = lazy_import("distro")
+
 release_link = "https://github.com/Victor-IX/Blender-Launcher-V2/releases/download/{0}/Blender_Launcher_{0}_{1}_x64.zip"
 api_link = "https://api.github.com/repos/Victor-IX/Blender-Launcher-V2/releases/tags/{}"
 
@@ -115,6 +117,7 @@ class BlenderLauncherUpdater(BaseWindow):
         self.ProgressBar.set_title("Downloading")
         a = DownloadTask(self.manager, link)
         a.progress.connect(self.ProgressBar.set_progress)
+        a.rate.connect(self.ProgressBar.set_rate)
         a.finished.connect(self.extract)
         self.queue.append(a)
 
@@ -122,6 +125,7 @@ class BlenderLauncherUpdater(BaseWindow):
         self.ProgressBar.set_title("Extracting")
         a = ExtractTask(source, self.cwd)
         a.progress.connect(self.ProgressBar.set_progress)
+        a.rate.connect(self.ProgressBar.set_rate)
         a.finished.connect(self.finish)
         self.queue.append(a)
 